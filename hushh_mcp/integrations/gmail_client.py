@@ -6,7 +6,12 @@ Provides real data access replacing mock data functionality
 import asyncio
 import logging
 import base64
+import multiprocessing
+import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from email.utils import parsedate_to_datetime
@@ -16,9 +21,192 @@ try:
 except ImportError:
     aiohttp = None
 
+try:
+    from ciso8601 import parse_datetime as _parse_datetime
+except ImportError:
+    if sys.version_info >= (3, 11):
+        # fromisoformat accepts the trailing 'Z' natively from 3.11
+        _parse_datetime = datetime.fromisoformat
+    else:
+        def _parse_datetime(value: str) -> datetime:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
 logger = logging.getLogger(__name__)
 
-class GmailClient:
+# Gmail system labels mapped to our categories, in precedence order
+_LABEL_CATEGORIES = {
+    "CATEGORY_SOCIAL": "social",
+    "CATEGORY_PROMOTIONS": "marketing",
+    "CATEGORY_UPDATES": "updates",
+    "CATEGORY_FORUMS": "forums",
+    "IMPORTANT": "important",
+    "STARRED": "starred",
+}
+_LABEL_PRECEDENCE = {label: rank for rank, label in enumerate(_LABEL_CATEGORIES)}
+
+# Mailboxes at least this large decode bodies in worker processes
+_PROCESS_POOL_THRESHOLD = 200
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared process pool used for CPU-bound email decoding.
+    Workers are spawned rather than forked, since forking a multi-threaded
+    server process can deadlock the child on locks held by other threads.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+    return _process_pool
+
+
+def shutdown_process_pool(wait: bool = True) -> None:
+    """Shut down the shared email decoding pool (e.g. on application shutdown); it is recreated on next use"""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=wait)
+        _process_pool = None
+
+
+async def _collect_pooled_emails(emails: List[Any], raw_emails: List[Dict[str, Any]], include_body: bool) -> List[Dict[str, Any]]:
+    """
+    Await worker results in message order. A message the pool failed on (broken
+    pool, pickling error) is decoded inline instead of failing the whole fetch.
+    """
+    processed = []
+    for email, email_data in zip(emails, raw_emails):
+        if isinstance(email, asyncio.Future):
+            try:
+                email = await email
+            except Exception as e:
+                logger.warning(f"Email worker failed, decoding inline: {e}")
+                if isinstance(e, BrokenProcessPool):
+                    shutdown_process_pool(wait=False)
+                email = _process_email_data(email_data, include_body)
+        processed.append(email)
+    return processed
+
+
+def _process_email_data(email_data: Dict[str, Any], include_body: bool = True) -> Dict[str, Any]:
+    """Process raw Gmail API response into standardized format"""
+    try:
+        payload = email_data.get("payload", {})
+        headers = payload.get("headers", [])
+
+        # Extract headers
+        header_dict = {h["name"].lower(): h["value"] for h in headers}
+
+        # Get email body; header-only callers fall back to the snippet
+        body = _extract_email_body(payload) if include_body else email_data.get("snippet", "")
+
+        # Parse date
+        date_str = header_dict.get("date", "")
+        try:
+            # Gmail date format parsing
+            date_obj = parsedate_to_datetime(date_str)
+            formatted_date = date_obj.isoformat()
+        except:
+            formatted_date = datetime.now().isoformat()
+
+        return {
+            "id": email_data["id"],
+            "thread_id": email_data.get("threadId", ""),
+            "subject": header_dict.get("subject", "No Subject"),
+            "sender": header_dict.get("from", "Unknown Sender"),
+            "recipient": header_dict.get("to", ""),
+            "date": formatted_date,
+            "body": body,
+            "content": body,  # Add content field for AI processing compatibility
+            "snippet": email_data.get("snippet", ""),
+            "labels": email_data.get("labelIds", []),
+            "size_estimate": email_data.get("sizeEstimate", 0),
+            "unread": "UNREAD" in email_data.get("labelIds", []),
+            "important": "IMPORTANT" in email_data.get("labelIds", []),
+            "category": _determine_category_from_labels(email_data.get("labelIds", [])),
+            "source": "gmail_api"
+        }
+
+    except Exception as e:
+        logger.error(f"Error processing email data: {e}")
+        return {
+            "id": email_data.get("id", "unknown"),
+            "subject": "Error processing email",
+            "sender": "unknown",
+            "date": datetime.now().isoformat(),
+            "body": "Failed to process email content",
+            "content": "Failed to process email content",  # Add content field for compatibility
+            "source": "gmail_api"
+        }
+
+
+def _extract_email_body(payload: Dict[str, Any]) -> str:
+    """Extract email body from Gmail payload"""
+    try:
+        # Handle multipart messages
+        if payload.get("parts"):
+            for part in payload["parts"]:
+                if part.get("mimeType") == "text/plain":
+                    body_data = part.get("body", {}).get("data", "")
+                    if body_data:
+                        return base64.urlsafe_b64decode(body_data + "===").decode('utf-8', errors='ignore')
+                elif part.get("mimeType") == "text/html":
+                    body_data = part.get("body", {}).get("data", "")
+                    if body_data:
+                        html_content = base64.urlsafe_b64decode(body_data + "===").decode('utf-8', errors='ignore')
+                        # Simple HTML to text conversion
+                        return re.sub('<[^<]+?>', '', html_content)
+
+        # Handle single part messages
+        elif payload.get("body", {}).get("data"):
+            body_data = payload["body"]["data"]
+            return base64.urlsafe_b64decode(body_data + "===").decode('utf-8', errors='ignore')
+
+        return ""
+
+    except Exception as e:
+        logger.error(f"Error extracting email body: {e}")
+        return "Failed to extract email content"
+
+
+def _determine_category_from_labels(labels: List[str]) -> str:
+    """Determine email category from Gmail labels"""
+    # Single pass over the labels; keep the highest-precedence match
+    best_rank = len(_LABEL_PRECEDENCE)
+    best_label = None
+    for label in labels:
+        rank = _LABEL_PRECEDENCE.get(label)
+        if rank is not None and rank < best_rank:
+            best_rank = rank
+            best_label = label
+            if rank == 0:
+                break
+    return _LABEL_CATEGORIES[best_label] if best_label else "primary"
+
+
+class _GoogleAPIClient:
+    """Shared keep-alive HTTP session handling for Google API clients"""
+    
+    _session: Optional["aiohttp.ClientSession"] = None
+    
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """Return this client's pooled session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            # Bounded timeouts so a stalled connection cannot hang the caller
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=60, connect=10, sock_read=30)
+            )
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the underlying HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class GmailClient(_GoogleAPIClient):
     """Gmail API client for fetching real email data"""
     
     def __init__(self, access_token: str, refresh_token: Optional[str] = None):
@@ -35,30 +223,32 @@ class GmailClient:
             url = f"{self.base_url}/profile"
             headers = {"Authorization": f"Bearer {self.access_token}"}
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    elif response.status == 401:
-                        raise Exception("Invalid or expired access token")
-                    elif response.status == 403:
-                        error_text = await response.text()
-                        raise Exception(f"Gmail API access forbidden: {error_text}. Check: 1) Gmail API enabled in Google Cloud Console, 2) OAuth token has gmail.readonly scope, 3) User granted Gmail permissions")
-                    else:
-                        error_text = await response.text()
-                        raise Exception(f"Gmail API error: {response.status} - {error_text}")
-                        
+            session = self._get_session()
+            async with session.get(url, headers=headers) as response:
+                if response.status == 200:
+                    return await response.json()
+                elif response.status == 401:
+                    raise Exception("Invalid or expired access token")
+                elif response.status == 403:
+                    error_text = await response.text()
+                    raise Exception(f"Gmail API access forbidden: {error_text}. Check: 1) Gmail API enabled in Google Cloud Console, 2) OAuth token has gmail.readonly scope, 3) User granted Gmail permissions")
+                else:
+                    error_text = await response.text()
+                    raise Exception(f"Gmail API error: {response.status} - {error_text}")
+                    
         except Exception as e:
             logger.error(f"Failed to get user profile: {e}")
             raise e
     
-    async def fetch_emails(self, days_back: int = 30, max_results: int = None) -> List[Dict[str, Any]]:
+    async def fetch_emails(self, days_back: int = 30, max_results: int = None, include_body: bool = True) -> List[Dict[str, Any]]:
         """
         Fetch real emails from user's Gmail account with pagination support.
         
         Args:
             days_back: Number of days to look back for emails
             max_results: Maximum number of emails to fetch (None for unlimited)
+            include_body: Decode full message bodies; when False only headers are
+                fetched and body/content hold the Gmail snippet
             
         Returns:
             List of email data dictionaries
@@ -79,178 +269,155 @@ class GmailClient:
             next_page_token = None
             page_size = 500  # Gmail API max per page
             
-            async with aiohttp.ClientSession() as session:
-                # Get all message IDs with pagination
-                while True:
-                    messages_url = f"{self.base_url}/messages"
-                    headers = {"Authorization": f"Bearer {self.access_token}"}
-                    params = {
-                        "q": query,
-                        "maxResults": page_size
-                    }
-                    
-                    if next_page_token:
-                        params["pageToken"] = next_page_token
-                    
-                    async with session.get(messages_url, headers=headers, params=params) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            messages = data.get("messages", [])
-                            message_ids = [msg["id"] for msg in messages]
-                            all_message_ids.extend(message_ids)
-                            
-                            # Check if there are more pages
-                            next_page_token = data.get("nextPageToken")
-                            if not next_page_token:
-                                break
-                                
-                            # Apply max_results limit if specified
-                            if max_results and len(all_message_ids) >= max_results:
-                                all_message_ids = all_message_ids[:max_results]
-                                break
-                                
-                        elif response.status == 401:
-                            raise Exception("Invalid or expired access token")
-                        elif response.status == 403:
-                            error_text = await response.text()
-                            raise Exception(f"Gmail API access forbidden: {error_text}")
-                        else:
-                            error_text = await response.text()
-                            raise Exception(f"Gmail API error: {response.status} - {error_text}")
+            session = self._get_session()
+            # Get all message IDs with pagination
+            while True:
+                messages_url = f"{self.base_url}/messages"
+                headers = {"Authorization": f"Bearer {self.access_token}"}
+                params = {
+                    "q": query,
+                    "maxResults": page_size
+                }
                 
-                logger.info(f"📧 Found {len(all_message_ids)} emails to process")
+                if next_page_token:
+                    params["pageToken"] = next_page_token
                 
-                # Fetch full email details for each message
-                emails = []
-                for i, msg_id in enumerate(all_message_ids):
-                    try:
-                        msg_url = f"{self.base_url}/messages/{msg_id}"
-                        async with session.get(msg_url, headers=headers) as msg_response:
-                            if msg_response.status == 200:
-                                email_data = await msg_response.json()
-                                processed_email = self._process_email_data(email_data)
-                                emails.append(processed_email)
+                async with session.get(messages_url, headers=headers, params=params) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        messages = data.get("messages", [])
+                        message_ids = [msg["id"] for msg in messages]
+                        all_message_ids.extend(message_ids)
+                        
+                        # Check if there are more pages
+                        next_page_token = data.get("nextPageToken")
+                        if not next_page_token:
+                            break
+                            
+                        # Apply max_results limit if specified
+                        if max_results and len(all_message_ids) >= max_results:
+                            all_message_ids = all_message_ids[:max_results]
+                            break
+                            
+                    elif response.status == 401:
+                        raise Exception("Invalid or expired access token")
+                    elif response.status == 403:
+                        error_text = await response.text()
+                        raise Exception(f"Gmail API access forbidden: {error_text}")
+                    else:
+                        error_text = await response.text()
+                        raise Exception(f"Gmail API error: {response.status} - {error_text}")
+            
+            logger.info(f"📧 Found {len(all_message_ids)} emails to process")
+            
+            # Header-only fetches skip downloading and decoding message bodies
+            msg_params = {"format": "full" if include_body else "metadata"}
+            
+            # Large mailboxes decode bodies in worker processes so the
+            # CPU-bound work overlaps with the remaining network fetches
+            loop = asyncio.get_running_loop()
+            pool = _get_process_pool() if include_body and len(all_message_ids) >= _PROCESS_POOL_THRESHOLD else None
+            pooled = pool is not None
+            
+            # Fetch full email details for each message; raw responses are kept
+            # while a pool is in use so failed workers can be decoded inline
+            emails = []
+            raw_emails = []
+            for i, msg_id in enumerate(all_message_ids):
+                try:
+                    msg_url = f"{self.base_url}/messages/{msg_id}"
+                    async with session.get(msg_url, headers=headers, params=msg_params) as msg_response:
+                        if msg_response.status == 200:
+                            email_data = await msg_response.json()
+                            email = None
+                            if pool is not None:
+                                try:
+                                    email = loop.run_in_executor(pool, _process_email_data, email_data, include_body)
+                                except (BrokenProcessPool, RuntimeError) as e:
+                                    logger.warning(f"Email worker pool unavailable, decoding inline: {e}")
+                                    shutdown_process_pool(wait=False)
+                                    pool = None
+                            if pooled:
+                                raw_emails.append(email_data)
+                            emails.append(email if email is not None else _process_email_data(email_data, include_body))
+                            
+                            # Add small delay to avoid rate limiting
+                            if i % 10 == 0:
+                                await asyncio.sleep(0.1)
                                 
-                                # Add small delay to avoid rate limiting
-                                if i % 10 == 0:
-                                    await asyncio.sleep(0.1)
-                                    
-                                # Progress logging for large batches
-                                if (i + 1) % 50 == 0:
-                                    logger.info(f"📧 Processed {i + 1}/{len(all_message_ids)} emails...")
-                                    
-                            else:
-                                logger.warning(f"Failed to fetch message {msg_id}: {msg_response.status}")
+                            # Progress logging for large batches
+                            if (i + 1) % 50 == 0:
+                                logger.info(f"📧 Processed {i + 1}/{len(all_message_ids)} emails...")
                                 
-                    except Exception as e:
-                        logger.warning(f"Error processing message {msg_id}: {e}")
-                        continue
-                
-                logger.info(f"Successfully fetched {len(emails)} emails from Gmail API")
-                return emails
-                
+                        else:
+                            logger.warning(f"Failed to fetch message {msg_id}: {msg_response.status}")
+                            
+                except Exception as e:
+                    logger.warning(f"Error processing message {msg_id}: {e}")
+                    continue
+            
+            if pooled:
+                emails = await _collect_pooled_emails(emails, raw_emails, include_body)
+            
+            logger.info(f"Successfully fetched {len(emails)} emails from Gmail API")
+            return emails
+            
         except Exception as e:
             logger.error(f"Failed to fetch emails: {e}")
             raise e
     
-    def _process_email_data(self, email_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process raw Gmail API response into standardized format"""
-        try:
-            payload = email_data.get("payload", {})
-            headers = payload.get("headers", [])
-            
-            # Extract headers
-            header_dict = {h["name"].lower(): h["value"] for h in headers}
-            
-            # Get email body
-            body = self._extract_email_body(payload)
-            
-            # Parse date
-            date_str = header_dict.get("date", "")
-            try:
-                # Gmail date format parsing
-                date_obj = parsedate_to_datetime(date_str)
-                formatted_date = date_obj.isoformat()
-            except:
-                formatted_date = datetime.now().isoformat()
+    async def get_label_counts(self, labels: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Get per-label message totals without fetching any messages.
+        
+        Use this instead of fetch_emails when only category counts are
+        needed (e.g. dashboard stats): it costs one labels.get request per
+        label, issued in parallel, rather than one request per message.
+        
+        Args:
+            labels: Gmail label IDs to count (defaults to the system category labels)
             
-            return {
-                "id": email_data["id"],
-                "thread_id": email_data.get("threadId", ""),
-                "subject": header_dict.get("subject", "No Subject"),
-                "sender": header_dict.get("from", "Unknown Sender"),
-                "recipient": header_dict.get("to", ""),
-                "date": formatted_date,
-                "body": body,
-                "content": body,  # Add content field for AI processing compatibility
-                "snippet": email_data.get("snippet", ""),
-                "labels": email_data.get("labelIds", []),
-                "size_estimate": email_data.get("sizeEstimate", 0),
-                "unread": "UNREAD" in email_data.get("labelIds", []),
-                "important": "IMPORTANT" in email_data.get("labelIds", []),
-                "category": self._determine_category_from_labels(email_data.get("labelIds", [])),
-                "source": "gmail_api"
-            }
+        Returns:
+            Dictionary mapping label ID to its messagesTotal
+        """
+        label_ids = labels or ["INBOX", "UNREAD", *_LABEL_CATEGORIES]
+        headers = {"Authorization": f"Bearer {self.access_token}"}
+        
+        async def fetch_label(session, label_id: str) -> int:
+            async with session.get(f"{self.base_url}/labels/{label_id}", headers=headers) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return data.get("messagesTotal", 0)
+                elif response.status == 401:
+                    raise Exception("Invalid or expired access token")
+                elif response.status == 404:
+                    return 0
+                else:
+                    error_text = await response.text()
+                    raise Exception(f"Gmail API error: {response.status} - {error_text}")
+        
+        try:
+            session = self._get_session()
+            totals = await asyncio.gather(*(fetch_label(session, label_id) for label_id in label_ids))
+            return dict(zip(label_ids, totals))
             
         except Exception as e:
-            logger.error(f"Error processing email data: {e}")
-            return {
-                "id": email_data.get("id", "unknown"),
-                "subject": "Error processing email",
-                "sender": "unknown",
-                "date": datetime.now().isoformat(),
-                "body": "Failed to process email content",
-                "content": "Failed to process email content",  # Add content field for compatibility
-                "source": "gmail_api"
-            }
+            logger.error(f"Failed to get label counts: {e}")
+            raise e
+    
+    def _process_email_data(self, email_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Process raw Gmail API response into standardized format"""
+        return _process_email_data(email_data)
     
     def _extract_email_body(self, payload: Dict[str, Any]) -> str:
         """Extract email body from Gmail payload"""
-        try:
-            # Handle multipart messages
-            if payload.get("parts"):
-                for part in payload["parts"]:
-                    if part.get("mimeType") == "text/plain":
-                        body_data = part.get("body", {}).get("data", "")
-                        if body_data:
-                            return base64.urlsafe_b64decode(body_data + "===").decode('utf-8', errors='ignore')
-                    elif part.get("mimeType") == "text/html":
-                        body_data = part.get("body", {}).get("data", "")
-                        if body_data:
-                            html_content = base64.urlsafe_b64decode(body_data + "===").decode('utf-8', errors='ignore')
-                            # Simple HTML to text conversion
-                            return re.sub('<[^<]+?>', '', html_content)
-            
-            # Handle single part messages
-            elif payload.get("body", {}).get("data"):
-                body_data = payload["body"]["data"]
-                return base64.urlsafe_b64decode(body_data + "===").decode('utf-8', errors='ignore')
-            
-            return ""
-            
-        except Exception as e:
-            logger.error(f"Error extracting email body: {e}")
-            return "Failed to extract email content"
+        return _extract_email_body(payload)
     
     def _determine_category_from_labels(self, labels: List[str]) -> str:
         """Determine email category from Gmail labels"""
-        if "CATEGORY_SOCIAL" in labels:
-            return "social"
-        elif "CATEGORY_PROMOTIONS" in labels:
-            return "marketing"
-        elif "CATEGORY_UPDATES" in labels:
-            return "updates"
-        elif "CATEGORY_FORUMS" in labels:
-            return "forums"
-        elif "IMPORTANT" in labels:
-            return "important"
-        elif "STARRED" in labels:
-            return "starred"
-        else:
-            return "primary"
-
-
-class GoogleCalendarClient:
+        return _determine_category_from_labels(labels)
+
+class GoogleCalendarClient(_GoogleAPIClient):
     """Google Calendar API client for fetching real calendar data"""
     
     def __init__(self, access_token: str, refresh_token: Optional[str] = None):
@@ -265,15 +432,15 @@ class GoogleCalendarClient:
         self, 
         days_back: int = 30, 
         days_forward: int = 30,
-        max_results: int = 250
+        max_results: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
-        Fetch real calendar events from user's Google Calendar.
+        Fetch real calendar events from user's Google Calendar with pagination support.
         
         Args:
             days_back: Number of days to look back
             days_forward: Number of days to look forward
-            max_results: Maximum number of events to fetch
+            max_results: Maximum number of events to fetch (None for unlimited)
             
         Returns:
             List of calendar event dictionaries
@@ -289,21 +456,38 @@ class GoogleCalendarClient:
             
             url = f"{self.base_url}/calendars/primary/events"
             headers = {"Authorization": f"Bearer {self.access_token}"}
-            params = {
-                "timeMin": time_min,
-                "timeMax": time_max,
-                "maxResults": max_results,
-                "singleEvents": True,
-                "orderBy": "startTime"
-            }
+            page_size = 2500  # Calendar API max per page
+            events = []
+            next_page_token = None
             
-            async with aiohttp.ClientSession() as session:
+            session = self._get_session()
+            while True:
+                params = {
+                    "timeMin": time_min,
+                    "timeMax": time_max,
+                    "maxResults": min(page_size, max_results - len(events)) if max_results else page_size,
+                    "singleEvents": "true",
+                    "orderBy": "startTime"
+                }
+                
+                if next_page_token:
+                    params["pageToken"] = next_page_token
+                
                 async with session.get(url, headers=headers, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
-                        events = [self._process_calendar_event(event) for event in data.get("items", [])]
-                        logger.info(f"Successfully fetched {len(events)} calendar events")
-                        return events
+                        events.extend(self._process_calendar_event(event) for event in data.get("items", []))
+                        
+                        # Check if there are more pages
+                        next_page_token = data.get("nextPageToken")
+                        if not next_page_token:
+                            break
+                        
+                        # Apply max_results limit if specified
+                        if max_results and len(events) >= max_results:
+                            events = events[:max_results]
+                            break
+                            
                     elif response.status == 401:
                         raise Exception("Invalid or expired access token")
                     elif response.status == 403:
@@ -312,6 +496,9 @@ class GoogleCalendarClient:
                     else:
                         error_text = await response.text()
                         raise Exception(f"Calendar API error: {response.status} - {error_text}")
+            
+            logger.info(f"Successfully fetched {len(events)} calendar events")
+            return events
                         
         except Exception as e:
             logger.error(f"Failed to fetch calendar events: {e}")
@@ -327,11 +514,13 @@ class GoogleCalendarClient:
             start_time = start.get("dateTime", start.get("date", ""))
             end_time = end.get("dateTime", end.get("date", ""))
             
+            attendees = event_data.get("attendees")
+            
             # Calculate duration
             try:
                 if "T" in start_time and "T" in end_time:
-                    start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                    end_dt = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
+                    start_dt = _parse_datetime(start_time)
+                    end_dt = _parse_datetime(end_time)
                     duration = int((end_dt - start_dt).total_seconds() / 60)  # minutes
                 else:
                     duration = 1440  # All day event = 1440 minutes
@@ -346,10 +535,7 @@ class GoogleCalendarClient:
                 "end_time": end_time,
                 "duration_minutes": duration,
                 "location": event_data.get("location", ""),
-                "attendees": [
-                    attendee.get("email", "") 
-                    for attendee in event_data.get("attendees", [])
-                ],
+                "attendees": tuple(attendee.get("email", "") for attendee in attendees) if attendees else (),
                 "organizer": event_data.get("organizer", {}).get("email", ""),
                 "status": event_data.get("status", "confirmed"),
                 "visibility": event_data.get("visibility", "default"),
@@ -381,7 +567,8 @@ async def create_gmail_client_from_token(access_token: str, refresh_token: Optio
         refresh_token: Optional refresh token
         
     Returns:
-        Initialized and validated Gmail client
+        Initialized and validated Gmail client. Use its fetch_emails for full
+        message data, or get_label_counts when only per-category totals are needed.
     """
     client = GmailClient(access_token, refresh_token)
     
@@ -393,6 +580,7 @@ async def create_gmail_client_from_token(access_token: str, refresh_token: Optio
         
     except Exception as e:
         logger.error(f"Failed to initialize Gmail client: {e}")
+        await client.close()
         raise e
 
 
@@ -1,36 +1,530 @@
 # hushh_mcp/operons/categorize_content.py
 # Enhanced LLM-powered content categorization operon with smart fallbacks
 
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Tuple, Union
 import os
 import json
 import re
+import sys
 import asyncio
+import copy
 import hashlib
+import heapq
+import inspect
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
 from datetime import datetime
-
-# Simple in-memory cache for categorization results
-_categorization_cache = {}
+from functools import lru_cache, wraps
+from itertools import islice
+from operator import itemgetter
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # enables HTTP/2 in httpx
+except ImportError:
+    h2 = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:
+    Tokenizer = None
+
+# orjson parses bytes straight from the socket buffer and its JSONDecodeError
+# subclasses json.JSONDecodeError, so callers handle both parsers the same way
+if orjson is not None:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+else:
+    _json_loads = json.loads
+    _json_dumps = lambda obj: json.dumps(obj).encode('utf-8')
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# In-memory LRU cache for categorization results
+_categorization_cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
 _cache_max_size = 1000
+_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'provider_hits': 0, 'provider_misses': 0}
+
+# Items per Ollama batch prompt, and how many batch prompts may run at once
+OLLAMA_BATCH_SIZE = 10
+OLLAMA_BATCH_CONCURRENCY = 4
+
+# Upper bound on a single Ollama categorization before the rule-based result is used
+OLLAMA_TIMEOUT_SECONDS = float(os.getenv("OLLAMA_TIMEOUT", "30"))
+
+# Indicator confidence at which the rules are trusted without asking any LLM;
+# only content with two or more strong indicators can reach the default
+RULE_FASTPATH_CONFIDENCE = float(os.getenv("RULE_FASTPATH_CONFIDENCE", "0.75"))
+
+# Shared HTTP session and cached Ollama availability probe
+_HTTP_POOL_LIMIT = 100
+_HTTP_POOL_LIMIT_PER_HOST = 32
+# Largest provider response body we are willing to buffer; categorization
+# answers are a few hundred bytes, batched ones a few KB
+_MAX_RESPONSE_BYTES = 1024 * 1024
+# Streamed Groq completions are capped by max_tokens; this guards against endpoints ignoring it
+_MAX_STREAM_CHARS = 4096
+
+# Cloud providers (Groq, Hugging Face) go over one multiplexed HTTP/2 connection
+# when httpx and h2 are installed; CATEGORIZE_HTTP2=0 forces the aiohttp pool.
+# Ollama is local HTTP/1.1 and always uses aiohttp
+_USE_HTTP2 = httpx is not None and h2 is not None and os.getenv("CATEGORIZE_HTTP2", "1") != "0"
+_http2_client = None
+_http2_client_loop = None
+_http_session = None
+_http_session_loop = None
+_OLLAMA_PROBE_TTL = 60.0
+_ollama_probe_cache = {'checked_at': float('-inf'), 'available': False}
+
+# Per-provider response cache (LRU + TTL) in front of each LLM API call, plus the
+# futures of calls currently in flight so concurrent duplicates share one request
+_PROVIDER_CACHE_MAX_SIZE = 10_000
+_PROVIDER_CACHE_TTL = 3600.0
+_CATEGORIZE_CACHE: "OrderedDict[tuple, Tuple[float, Any]]" = OrderedDict()
+_provider_inflight: Dict[tuple, "asyncio.Future"] = {}
+
+# Boilerplate that makes otherwise identical messages miss the provider cache:
+# a signature block after a line holding exactly the "-- " delimiter, an
+# "On ... wrote:" line followed by ">" quoted lines, and a "Sent from my ..."
+# footer line. Every alternative spans whole lines so prose that merely
+# mentions these phrases is kept
+_BOILERPLATE_RE = re.compile(
+    r'^-- $[\s\S]*'
+    r'|^On [^\n]{0,200} wrote:[ \t]*\n(?:>[^\n]*(?:\n|$))+'
+    r'|^Sent from my [^\n]*$',
+    re.MULTILINE
+)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Token budgets for provider inputs. The character caps stay in place; the token
+# cap only bites for dense text (CJK, code) where 500 characters can exceed
+# the budget. Opt-in: set CATEGORIZE_TOKENIZER to a Hub tokenizer matching the
+# Groq model (needs the optional tokenizers package); unset, only the character
+# caps apply. Loaded once in a worker thread, started by start_tokenizer_load
+_TOKENIZER_NAME = os.getenv("CATEGORIZE_TOKENIZER")
+_GROQ_CONTENT_TOKENS = 200
+_HF_CONTENT_TOKENS = 400
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+_tokenizer_load: "Optional[asyncio.Future]" = None
+
+def _get_content_hash(content: str, content_type: str, existing_categories: List[str] = None) -> int:
+    """
+    Create a fast non-cryptographic hash for content to use as cache key.
+    Existing categories are part of the key because they change the LLM's answer.
+    """
+    key = content_type.encode('ascii', 'ignore') + b':' + content[:500].encode('utf-8', 'ignore')
+    if existing_categories:
+        key += b'\x00' + '\x1f'.join(sorted(set(existing_categories))).encode('utf-8', 'ignore')
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(key)
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'big')
+
+def _cache_result(content: str, content_type: str, result: Dict[str, Any], existing_categories: List[str] = None) -> None:
+    """Cache a categorization result, evicting the least recently used entries"""
+    cache_key = _get_content_hash(content, content_type, existing_categories)
+    _categorization_cache[cache_key] = result
+    _categorization_cache.move_to_end(cache_key)
+    while len(_categorization_cache) > _cache_max_size:
+        _categorization_cache.popitem(last=False)
+        _cache_stats['evictions'] += 1
 
-def _get_content_hash(content: str, content_type: str) -> str:
-    """Create a hash for content to use as cache key"""
-    return hashlib.md5(f"{content_type}:{content[:500]}".encode()).hexdigest()
+def _get_cached_result(content: str, content_type: str, existing_categories: List[str] = None) -> Optional[Dict[str, Any]]:
+    """Get cached categorization result if available"""
+    cache_key = _get_content_hash(content, content_type, existing_categories)
+    result = _categorization_cache.get(cache_key)
+    if result is not None:
+        _categorization_cache.move_to_end(cache_key)
+        _cache_stats['hits'] += 1
+    else:
+        _cache_stats['misses'] += 1
+    return result
 
-def _cache_result(content: str, content_type: str, result: Dict[str, Any]) -> None:
-    """Cache a categorization result"""
-    global _categorization_cache
-    if len(_categorization_cache) >= _cache_max_size:
-        # Clear old entries if cache is full
-        _categorization_cache.clear()
+def _canonicalize_content(content: str) -> str:
+    """
+    Strip signatures, quoted reply chains and mobile footers and collapse whitespace,
+    so near-duplicate messages share one provider cache entry and one request.
+    Only used to build cache keys; providers always see the original content.
+    """
+    canonical = _WHITESPACE_RE.sub(' ', _BOILERPLATE_RE.sub('', content)).strip()
+    return canonical or content
+
+def _load_tokenizer_blocking() -> None:
+    """Load the tokenizer once; a failed load is remembered as False and not retried"""
+    global _tokenizer
+    with _tokenizer_lock:
+        if _tokenizer is not None:
+            return
+        _tokenizer = False
+        if Tokenizer is None or not _TOKENIZER_NAME:
+            return
+        try:
+            _tokenizer = Tokenizer.from_pretrained(_TOKENIZER_NAME)
+        except Exception as e:
+            print(f"⚠️ Tokenizer unavailable, using character caps only: {str(e)}")
+
+def start_tokenizer_load() -> "Optional[asyncio.Future]":
+    """
+    Start loading the token-budget tokenizer in a worker thread without waiting
+    for it, so neither startup nor a request ever blocks on the Hub download.
+    Returns the pending load, or None when there is nothing to load.
+    """
+    global _tokenizer_load
+    if _tokenizer_load is not None and not _tokenizer_load.done():
+        return _tokenizer_load
+    if _tokenizer is not None or not _TOKENIZER_NAME or Tokenizer is None:
+        return None
+    _tokenizer_load = asyncio.get_running_loop().run_in_executor(None, _load_tokenizer_blocking)
+    return _tokenizer_load
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text to at most max_tokens tokens, keeping it unchanged when it already fits.
+    Never loads the tokenizer itself: until start_tokenizer_load has finished (or when
+    it is not configured, not installed or failed to load) the text is returned as is.
+    """
+    if not _tokenizer:
+        return text
     
-    cache_key = _get_content_hash(content, content_type)
-    _categorization_cache[cache_key] = result
+    encoding = _tokenizer.encode(text, add_special_tokens=False)
+    if len(encoding.ids) <= max_tokens:
+        return text
+    # Cut at the character offset of the first dropped token so no character is split
+    return text[:encoding.offsets[max_tokens][0]].rstrip()
 
-def _get_cached_result(content: str, content_type: str) -> Optional[Dict[str, Any]]:
-    """Get cached categorization result if available"""
-    cache_key = _get_content_hash(content, content_type)
-    return _categorization_cache.get(cache_key)
+def _bind_provider_call(provider: str, signature: inspect.Signature, args: tuple, kwargs: dict) -> Tuple[tuple, inspect.BoundArguments]:
+    """
+    Bind a provider call unchanged, and key it on the lowercased canonical
+    content plus every other argument except the API key.
+    """
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    canonical = _canonicalize_content(bound.arguments['content'])
+    digest = hashlib.blake2b(canonical.lower().encode('utf-8', 'ignore'), digest_size=16).digest()
+    options = tuple(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in bound.arguments.items()
+        if name not in ('content', 'api_key')
+    )
+    return (provider, digest, options), bound
+
+def _provider_cache_get(key: tuple) -> Any:
+    """Return a deep copy of a fresh cached provider response, or None"""
+    entry = _CATEGORIZE_CACHE.get(key)
+    if entry is None or entry[0] < time.monotonic():
+        if entry is not None:
+            del _CATEGORIZE_CACHE[key]
+        _cache_stats['provider_misses'] += 1
+        return None
+    _CATEGORIZE_CACHE.move_to_end(key)
+    _cache_stats['provider_hits'] += 1
+    # Deep copy so callers mutating nested category lists can't corrupt the entry
+    return copy.deepcopy(entry[1])
+
+def _provider_cache_put(key: tuple, result: Any) -> None:
+    """Store a provider response unless it is a rule-based fallback from a failed call"""
+    if isinstance(result, dict) and result.get("processing_method") in _RULE_FALLBACK_METHODS:
+        return
+    _CATEGORIZE_CACHE[key] = (time.monotonic() + _PROVIDER_CACHE_TTL, copy.deepcopy(result))
+    _CATEGORIZE_CACHE.move_to_end(key)
+    while len(_CATEGORIZE_CACHE) > _PROVIDER_CACHE_MAX_SIZE:
+        _CATEGORIZE_CACHE.popitem(last=False)
+
+def _cached_provider_call(provider: str):
+    """
+    Cache a provider categorizer's responses and collapse concurrent duplicate calls.
+    Coroutine functions get single-flight behaviour: callers that arrive while an
+    identical request is running await its result instead of issuing their own.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        
+        if not asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                key, bound = _bind_provider_call(provider, signature, args, kwargs)
+                cached = _provider_cache_get(key)
+                if cached is not None:
+                    return cached
+                result = func(*bound.args, **bound.kwargs)
+                _provider_cache_put(key, result)
+                return result
+            return sync_wrapper
+        
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            key, bound = _bind_provider_call(provider, signature, args, kwargs)
+            cached = _provider_cache_get(key)
+            if cached is not None:
+                return cached
+            
+            inflight = _provider_inflight.get(key)
+            if inflight is not None:
+                try:
+                    return copy.deepcopy(await asyncio.shield(inflight))
+                except asyncio.CancelledError:
+                    # The leading call was cancelled (e.g. it lost a provider race);
+                    # only propagate if this caller was the one cancelled
+                    if not inflight.cancelled():
+                        raise
+                    return await func(*bound.args, **bound.kwargs)
+            
+            future = asyncio.get_running_loop().create_future()
+            _provider_inflight[key] = future
+            try:
+                result = await func(*bound.args, **bound.kwargs)
+            except BaseException:
+                future.cancel()
+                raise
+            finally:
+                _provider_inflight.pop(key, None)
+            _provider_cache_put(key, result)
+            # Waiters copy from a snapshot the leading caller can't mutate
+            future.set_result(copy.deepcopy(result))
+            return result
+        return wrapper
+    return decorator
+
+def get_cache_stats() -> Dict[str, int]:
+    """Return hit/miss/eviction counters and current size of the categorization and provider caches"""
+    return {
+        **_cache_stats,
+        'size': len(_categorization_cache),
+        'max_size': _cache_max_size,
+        'provider_size': len(_CATEGORIZE_CACHE)
+    }
+
+def clear_categorization_cache() -> None:
+    """Drop all cached categorization and provider results and reset the counters"""
+    _categorization_cache.clear()
+    _CATEGORIZE_CACHE.clear()
+    for key in _cache_stats:
+        _cache_stats[key] = 0
+
+
+# Theme detection patterns, compiled once at import. They run on a lowercased
+# copy: sre loses its literal-prefix fast path under re.IGNORECASE, which makes
+# case-insensitive scans slower than a single lower() of the preview
+_THEME_PATTERNS = (
+    # Time-related patterns
+    (('time_sensitive', 'scheduling'), [
+        re.compile(r'\b\d{1,2}[:/]\d{1,2}(?:[:/]\d{1,2})?\s*(?:am|pm)?\b'),
+        re.compile(r'\b(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b'),
+        re.compile(r'\b(?:january|february|march|april|may|june|july|august|september|october|november|december)\b'),
+        re.compile(r'\b(?:tomorrow|today|yesterday|next week|last week)\b')
+    ]),
+    # Financial patterns
+    (('financial',), [
+        re.compile(r'\$\d+(?:\.\d{2})?'),
+        re.compile(r'\b\d+(?:\.\d{2})?\s*(?:dollars?|usd|eur|gbp)\b'),
+        re.compile(r'\b(?:payment|invoice|billing|subscription|refund|charge)\b')
+    ]),
+    # Professional patterns
+    (('professional',), [
+        re.compile(r'\b(?:meeting|conference|presentation|project|deadline|client|colleague)\b'),
+        re.compile(r'\b(?:manager|director|ceo|team|department|office)\b')
+    ]),
+    # Personal patterns
+    (('personal',), [
+        re.compile(r'\b(?:family|friend|birthday|anniversary|personal|home)\b'),
+        re.compile(r'\b(?:mom|dad|wife|husband|children|kids|parents)\b')
+    ]),
+    # Health patterns
+    (('health_related',), [
+        re.compile(r'\b(?:doctor|appointment|medical|prescription|hospital|clinic)\b'),
+        re.compile(r'\b(?:exercise|gym|fitness|diet|wellness|therapy)\b')
+    ]),
+)
+
+# Entity patterns are case-sensitive and run on the original content
+_ENTITY_PATTERNS = (
+    re.compile(r'\b[A-Z][a-z]+ [A-Z][a-z]+\b'),  # Proper names
+    re.compile(r'\b[A-Z][a-z]+(?:\s+Inc\.|Corp\.|LLC|Ltd\.)\b'),  # Companies
+    re.compile(r'\b(?:Amazon|Google|Microsoft|Apple|Facebook|Netflix)\b')  # Known entities
+)
+_MAX_ENTITIES_PER_PATTERN = 5
+_MAX_ENTITIES = 10
+
+# Fallback structure patterns; the regexes only run when a digit is present
+_DIGITS = frozenset('0123456789')
+_STRUCTURE_TIME_RE = re.compile(r'\b\d{1,2}[:/]\d{1,2}\b')
+_STRUCTURE_AMOUNT_RE = re.compile(r'\$\d+|\d+\.\d{2}')
+_STRUCTURE_FINANCE_WORDS = ('payment', 'invoice', 'bill')
+
+# Enhanced category mapping with weighted keywords; patterns compiled once at import
+_CATEGORY_DEFINITIONS = {
+    "work": {
+        "keywords": ["meeting", "deadline", "project", "office", "colleague", "client", "business", "presentation", "report", "manager", "team", "conference", "proposal", "contract"],
+        "patterns": [re.compile(r"\b(q[1-4]|quarter|fiscal|budget|kpi|roi)\b"), re.compile(r"\bmeet(ing)?\s+(at|on|tomorrow|next)\b")],
+        "weight": 1.0
+    },
+    "finance": {
+        "keywords": ["money", "payment", "invoice", "budget", "expense", "income", "bank", "credit", "debit", "purchase", "transaction", "billing", "receipt", "refund", "subscription"],
+        "patterns": [re.compile(r"\$\d+"), re.compile(r"\d+\.\d{2}"), re.compile(r"\b(paid|owe|due|charge|bill)\b")],
+        "weight": 1.2
+    },
+    "health": {
+        "keywords": ["doctor", "appointment", "medication", "exercise", "gym", "diet", "wellness", "medical", "hospital", "prescription", "therapy", "checkup", "symptoms"],
+        "patterns": [re.compile(r"\b(dr\.|doctor|physician|clinic)\b"), re.compile(r"\b(dosage|mg|ml|prescription)\b")],
+        "weight": 1.1
+    },
+    "personal": {
+        "keywords": ["family", "friend", "birthday", "anniversary", "personal", "hobby", "weekend", "vacation", "relationship", "home", "kids", "children"],
+        "patterns": [re.compile(r"\b(mom|dad|wife|husband|sister|brother)\b"), re.compile(r"\b(happy birthday|anniversary)\b")],
+        "weight": 0.9
+    },
+    "travel": {
+        "keywords": ["flight", "hotel", "vacation", "trip", "booking", "travel", "destination", "passport", "luggage", "airport", "reservation", "itinerary"],
+        "patterns": [re.compile(r"\b(flight|booking)\s+#?\w+"), re.compile(r"\b(check.in|departure|arrival)\b")],
+        "weight": 1.1
+    },
+    "education": {
+        "keywords": ["learn", "course", "study", "book", "lecture", "assignment", "exam", "research", "university", "college", "tutorial", "webinar", "certification"],
+        "patterns": [re.compile(r"\b(grade|score|semester|syllabus)\b"), re.compile(r"\b(professor|instructor|student)\b")],
+        "weight": 1.0
+    },
+    "shopping": {
+        "keywords": ["buy", "purchase", "order", "shop", "delivery", "product", "item", "cart", "amazon", "ebay", "sale", "discount", "coupon", "shipping"],
+        "patterns": [re.compile(r"\border\s+#?\w+"), re.compile(r"\b(shipped|delivered|tracking)\b"), re.compile(r"\b\d+%\s+off\b")],
+        "weight": 1.1
+    },
+    "entertainment": {
+        "keywords": ["movie", "music", "game", "concert", "show", "party", "fun", "entertainment", "netflix", "spotify", "youtube", "streaming"],
+        "patterns": [re.compile(r"\b(watch|stream|listen|play)\b"), re.compile(r"\b(episode|season|album|track)\b")],
+        "weight": 0.8
+    },
+    "social": {
+        "keywords": ["social", "community", "network", "group", "event", "gathering", "meetup", "facebook", "twitter", "instagram", "linkedin"],
+        "patterns": [re.compile(r"\b(follow|like|share|comment)\b"), re.compile(r"\b(post|tweet|update)\b")],
+        "weight": 0.9
+    },
+    "communication": {
+        "keywords": ["email", "message", "call", "text", "chat", "notification", "contact", "phone", "whatsapp", "telegram", "zoom", "teams"],
+        "patterns": [re.compile(r"\b(call|text|message)\s+(me|you|us)\b"), re.compile(r"\b(zoom|meet|hangout)\s+link\b")],
+        "weight": 0.7
+    }
+}
+
+# Rule-based analysis only scans this much of the content; the classification
+# signal sits at the start, and huge bodies would otherwise dominate regex time
+_RULE_SCAN_LIMIT = 4096
+
+# Category order, weights and patterns frozen into parallel tuples for the scoring loop
+_CATEGORY_NAMES = tuple(_CATEGORY_DEFINITIONS)
+_CATEGORY_WEIGHTS = tuple(definition["weight"] for definition in _CATEGORY_DEFINITIONS.values())
+_CATEGORY_PATTERNS = tuple(tuple(definition["patterns"]) for definition in _CATEGORY_DEFINITIONS.values())
+
+# One alternation per category so its keywords are counted in a single scan
+# (longest first, so no keyword is shadowed by a shorter prefix)
+_CATEGORY_KEYWORD_RES = {
+    category: re.compile('|'.join(map(re.escape, sorted(definition["keywords"], key=len, reverse=True))))
+    for category, definition in _CATEGORY_DEFINITIONS.items()
+}
+
+# Keyword -> categories index; a keyword such as "purchase" can feed several
+_KEYWORD_CATEGORIES: Dict[str, tuple] = {}
+for _category, _definition in _CATEGORY_DEFINITIONS.items():
+    for _keyword in _definition["keywords"]:
+        _KEYWORD_CATEGORIES[_keyword] = _KEYWORD_CATEGORIES.get(_keyword, ()) + (_category,)
+
+# Single automaton over every category keyword when pyahocorasick is installed
+_KEYWORD_AUTOMATON = None
+if ahocorasick is not None:
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _keyword, _categories in _KEYWORD_CATEGORIES.items():
+        _KEYWORD_AUTOMATON.add_word(_keyword, _categories)
+    _KEYWORD_AUTOMATON.make_automaton()
+
+
+# Indicator keywords for get_category_confidence, strongest tier first
+_CONFIDENCE_INDICATORS = {
+    "work": {
+        "strong": ["meeting", "deadline", "project", "client", "presentation", "proposal"],
+        "medium": ["office", "colleague", "business", "manager", "team"],
+        "weak": ["work", "job", "career"]
+    },
+    "finance": {
+        "strong": ["payment", "invoice", "budget", "expense", "transaction"],
+        "medium": ["money", "bank", "credit", "debit", "billing"],
+        "weak": ["cost", "price", "financial"]
+    },
+    "health": {
+        "strong": ["doctor", "appointment", "prescription", "medical"],
+        "medium": ["exercise", "gym", "wellness", "therapy"],
+        "weak": ["health", "fitness", "diet"]
+    }
+    # Add more categories as needed
+}
+
+# Keyword -> ((category, tier index), ...) with tiers 0=strong, 1=medium, 2=weak
+_CONFIDENCE_KEYWORDS: Dict[str, tuple] = {}
+for _category, _tiers in _CONFIDENCE_INDICATORS.items():
+    for _tier, _tier_name in enumerate(("strong", "medium", "weak")):
+        for _keyword in _tiers[_tier_name]:
+            _CONFIDENCE_KEYWORDS[_keyword] = _CONFIDENCE_KEYWORDS.get(_keyword, ()) + ((_category, _tier),)
+
+# (cap, base) confidence per evidence level: strong (max 80%), good (70%), weak (60%)
+_CONFIDENCE_LEVELS = ((0.80, 0.45), (0.70, 0.35), (0.60, 0.25))
+
+_CONFIDENCE_AUTOMATON = None
+if ahocorasick is not None:
+    _CONFIDENCE_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in _CONFIDENCE_KEYWORDS:
+        _CONFIDENCE_AUTOMATON.add_word(_keyword, _keyword)
+    _CONFIDENCE_AUTOMATON.make_automaton()
+
+def _count_category_keywords(text: str) -> Counter:
+    """
+    Count keyword occurrences per category in the text.
+    The text must already be lowercased; callers share one lowered copy
+    across keyword counting and pattern matching.
+    """
+    if _KEYWORD_AUTOMATON is not None:
+        # One linear pass yields every keyword hit across all categories
+        return Counter(category for _, categories in _KEYWORD_AUTOMATON.iter(text) for category in categories)
+    # Substring checks are far cheaper than a regex scan, so only categories
+    # with a keyword present run their keyword regex
+    counts = Counter()
+    for category, definition in _CATEGORY_DEFINITIONS.items():
+        if any(keyword in text for keyword in definition["keywords"]):
+            counts[category] = len(_CATEGORY_KEYWORD_RES[category].findall(text))
+    return counts
 
 
 
@@ -66,12 +560,15 @@ CATEGORIZATION INSTRUCTIONS:
 
     # Add existing categories context if provided
     if existing_categories and len(existing_categories) > 0:
-        unique_categories = list(set(existing_categories))
+        # dict.fromkeys keeps first-seen order, so the prompt is stable across calls
+        unique_categories = list(dict.fromkeys(existing_categories))
+        shown_categories = unique_categories[:15]
+        hidden_count = len(unique_categories) - len(shown_categories)
         base_prompt += f"""
 
 EXISTING CATEGORIES IN SYSTEM:
-Current categories: {', '.join(unique_categories[:15])}
-{'(and ' + str(len(unique_categories) - 15) + ' more...)' if len(unique_categories) > 15 else ''}
+Current categories: {', '.join(shown_categories)}
+{'(and ' + str(hidden_count) + ' more...)' if hidden_count else ''}
 
 CATEGORY REUSE GUIDELINES:
 - **MANDATORY**: Always try to fit content into existing categories first
@@ -114,84 +611,50 @@ def _analyze_content_themes(content: str) -> Dict[str, List[str]]:
     """
     Analyze content to extract key themes and entities for dynamic categorization.
     """
-    content_lower = content.lower()
-    
+    themes, entities = _analyze_content_themes_cached(content)
+    return {'themes': list(themes), 'entities': list(entities)}
+
+
+@lru_cache(maxsize=2048)
+def _analyze_content_themes_cached(content: str) -> tuple:
+    """Memoized theme/entity sweep; returns hashable (themes, entities) tuples"""
     # Detect themes through semantic patterns
     themes = []
     entities = []
     
-    # Time-related patterns
-    time_patterns = [
-        r'\b\d{1,2}[:/]\d{1,2}(?:[:/]\d{1,2})?\s*(?:am|pm)?\b',
-        r'\b(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b',
-        r'\b(?:january|february|march|april|may|june|july|august|september|october|november|december)\b',
-        r'\b(?:tomorrow|today|yesterday|next week|last week)\b'
-    ]
-    
-    if any(re.search(pattern, content_lower) for pattern in time_patterns):
-        themes.append('time_sensitive')
-        themes.append('scheduling')
-    
-    # Financial patterns
-    financial_patterns = [
-        r'\$\d+(?:\.\d{2})?',
-        r'\b\d+(?:\.\d{2})?\s*(?:dollars?|usd|eur|gbp)\b',
-        r'\b(?:payment|invoice|billing|subscription|refund|charge)\b'
-    ]
-    
-    if any(re.search(pattern, content_lower) for pattern in financial_patterns):
-        themes.append('financial')
-    
-    # Professional patterns
-    professional_patterns = [
-        r'\b(?:meeting|conference|presentation|project|deadline|client|colleague)\b',
-        r'\b(?:manager|director|ceo|team|department|office)\b'
-    ]
-    
-    if any(re.search(pattern, content_lower) for pattern in professional_patterns):
-        themes.append('professional')
-    
-    # Personal patterns
-    personal_patterns = [
-        r'\b(?:family|friend|birthday|anniversary|personal|home)\b',
-        r'\b(?:mom|dad|wife|husband|children|kids|parents)\b'
-    ]
-    
-    if any(re.search(pattern, content_lower) for pattern in personal_patterns):
-        themes.append('personal')
-    
-    # Health patterns
-    health_patterns = [
-        r'\b(?:doctor|appointment|medical|prescription|hospital|clinic)\b',
-        r'\b(?:exercise|gym|fitness|diet|wellness|therapy)\b'
-    ]
-    
-    if any(re.search(pattern, content_lower) for pattern in health_patterns):
-        themes.append('health_related')
-    
-    # Extract entities (companies, people, places)
-    entity_patterns = [
-        r'\b[A-Z][a-z]+ [A-Z][a-z]+\b',  # Proper names
-        r'\b[A-Z][a-z]+(?:\s+Inc\.|Corp\.|LLC|Ltd\.)\b',  # Companies
-        r'\b(?:Amazon|Google|Microsoft|Apple|Facebook|Netflix)\b'  # Known entities
-    ]
-    
-    for pattern in entity_patterns:
-        matches = re.findall(pattern, content)
-        entities.extend(matches[:5])  # Limit to prevent overwhelming
-    
-    return {
-        'themes': themes if themes else ['general_content'],
-        'entities': entities[:10]  # Limit entities
-    }
+    content_lower = content.lower()
+    for theme_names, patterns in _THEME_PATTERNS:
+        if any(pattern.search(content_lower) for pattern in patterns):
+            themes.extend(theme_names)
+    
+    # Extract entities (companies, people, places); finditer stops scanning
+    # after 5 matches per pattern and the sweep ends once 10 are collected
+    for pattern in _ENTITY_PATTERNS:
+        remaining = _MAX_ENTITIES - len(entities)
+        if remaining <= 0:
+            break
+        entities.extend(
+            match.group(0)
+            for match in islice(pattern.finditer(content), min(_MAX_ENTITIES_PER_PATTERN, remaining))
+        )
+    
+    return (
+        tuple(themes) if themes else ('general_content',),
+        tuple(entities)
+    )
 
 
 def _get_content_specific_guidance(content_type: str, content_analysis: Dict[str, List[str]]) -> str:
     """
     Generate content-type specific guidance for categorization.
     """
+    return _content_specific_guidance_cached(content_type, tuple(content_analysis.get('themes', ())))
+
+
+@lru_cache(maxsize=256)
+def _content_specific_guidance_cached(content_type: str, themes: tuple) -> str:
+    """Memoized guidance text; depends only on the content type and detected themes"""
     guidance = ""
-    themes = content_analysis.get('themes', [])
     
     if content_type == "email":
         guidance = """For emails, consider:
@@ -224,15 +687,116 @@ def _get_content_specific_guidance(content_type: str, content_analysis: Dict[str
     return guidance
 
 
+# Later providers start this long after the previous one in a provider race
+_PROVIDER_STAGGER_SECONDS = 0.2
+# Overall cap on a provider race; matches the slowest provider timeout
+_PROVIDER_RACE_TIMEOUT = 30
+# Cloud provider calls allowed in flight at once, so hedged duplicates under
+# bulk processing stay within the free-tier rate limits
+_PROVIDER_CONCURRENCY = 8
+_provider_semaphore = None
+_provider_semaphore_loop = None
+
+# Category names free-text LLM answers are matched against. One alternation scans
+# the text once; letters (not underscores) delimit names, so "work_meetings"
+# mentions work while "homework" does not
+VALID_CATEGORIES: frozenset = frozenset({
+    'work', 'personal', 'finance', 'health', 'education', 'shopping',
+    'travel', 'entertainment', 'social', 'communication', 'scheduling',
+    'documentation', 'general'
+})
+_OPENAI_CATEGORIES = VALID_CATEGORIES | {'uncategorized'}
+_VALID_CATEGORY_RE = re.compile(r'(?<![a-z])(' + '|'.join(map(re.escape, sorted(VALID_CATEGORIES))) + r')(?![a-z])')
+
+# Methods that mean a provider fell back to local rules instead of answering
+_RULE_FALLBACK_METHODS = ("enhanced_rules", "structure_analysis")
+
+
+def _get_provider_semaphore() -> asyncio.Semaphore:
+    """Return the semaphore bounding concurrent cloud provider calls on the running loop"""
+    global _provider_semaphore, _provider_semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _provider_semaphore is None or _provider_semaphore_loop is not loop:
+        _provider_semaphore = asyncio.Semaphore(_PROVIDER_CONCURRENCY)
+        _provider_semaphore_loop = loop
+    return _provider_semaphore
+
+
+async def _race_providers(provider_calls: List[Any]) -> Optional[Dict[str, Any]]:
+    """
+    Run provider coroutines as a staggered hedge and return the first real LLM answer.
+    Call i starts i * _PROVIDER_STAGGER_SECONDS after the first, so earlier
+    providers keep their preference; the remaining calls are cancelled once one
+    answers. Returns None if every provider failed or fell back to rules.
+    """
+    semaphore = _get_provider_semaphore()
+    
+    async def staggered(delay: float, call):
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            async with semaphore:
+                return await call
+        finally:
+            # Providers cancelled before their turn never started; close them quietly
+            call.close()
+    
+    pending = {
+        asyncio.create_task(staggered(index * _PROVIDER_STAGGER_SECONDS, call))
+        for index, call in enumerate(provider_calls)
+    }
+    deadline = time.monotonic() + _PROVIDER_RACE_TIMEOUT
+    try:
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    print(f"❌ LLM provider failed: {task.exception()}")
+                    continue
+                result = task.result()
+                if result.get("processing_method") not in _RULE_FALLBACK_METHODS:
+                    return result
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _categorize_with_rule_fastpath(content: str) -> Optional[Dict[str, Any]]:
+    """
+    Categorize from indicator confidence alone when it clears RULE_FASTPATH_CONFIDENCE.
+    Returns None for ambiguous content so the LLM providers are consulted.
+    """
+    scores = get_category_confidence(content, _CONFIDENCE_INDICATORS.keys())
+    best = max(scores, key=scores.get)
+    if scores[best] < RULE_FASTPATH_CONFIDENCE:
+        return None
+    
+    # Keep only categories with indicator hits, best first
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    categories = [category for category in ranked if scores[category] > _CONFIDENCE_LEVELS[2][1]]
+    return {
+        "category": best,
+        "confidence": scores[best],
+        "reasoning": f"Strong {best} indicators matched",
+        "processing_method": "rules_fastpath",
+        "categories": categories[:3]
+    }
+
+
 async def categorize_with_free_llm(content: str, content_type: str = "email", existing_categories: List[str] = None) -> Dict[str, Any]:
     """
     Enhanced main function to categorize content using free LLM alternatives with smart fallbacks.
-    Prioritizes local Ollama, then free cloud APIs, then rule-based fallback.
+    Prioritizes local Ollama, then races the configured free cloud APIs, then rule-based fallback.
     Includes caching for efficiency.
     
     Args:
         content: Text content to categorize
         content_type: Type of content (email, calendar, document)
+        existing_categories: Categories already in use, which the LLM is asked to reuse
         
     Returns:
         Dict with category, confidence, reasoning, and processing_method
@@ -247,52 +811,83 @@ async def categorize_with_free_llm(content: str, content_type: str = "email", ex
         }
     
     # Check cache first
-    cached_result = _get_cached_result(content, content_type)
+    cached_result = _get_cached_result(content, content_type, existing_categories)
     if cached_result:
-        cached_result["processing_method"] += "_cached"
-        return cached_result
+        # Copy so repeated hits don't keep appending to the cached entry
+        return {**cached_result, "processing_method": cached_result["processing_method"] + "_cached"}
+    
+    # Unambiguous content is answered by the indicator scan alone, no LLM round-trip.
+    # The scan only knows the built-in categories, so it is skipped when the caller
+    # supplies existing categories for the LLM to reuse
+    if not existing_categories:
+        fastpath_result = _categorize_with_rule_fastpath(content)
+        if fastpath_result is not None:
+            _cache_result(content, content_type, fastpath_result)
+            return fastpath_result
+    
+    # Compute the rule-based answer off the event loop while the LLMs are tried,
+    # so a failed or slow provider falls back without paying for it afterwards
+    rule_task = asyncio.get_running_loop().run_in_executor(
+        None, _categorize_with_enhanced_rules, content, content_type
+    )
     
     try:
         # Try Ollama local model first (completely free and private)
         print(f"🔍 Checking if Ollama is available for content categorization...")
         if await _check_ollama_available():
             print(f"✅ Ollama available! Using local LLM for categorization...")
-            result = await categorize_with_ollama(content, content_type, "llama3.2", existing_categories)
-            _cache_result(content, content_type, result)
+            try:
+                result = await asyncio.wait_for(
+                    categorize_with_ollama(content, content_type, "llama3.2", existing_categories),
+                    timeout=OLLAMA_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                print(f"⏱️ Ollama took longer than {OLLAMA_TIMEOUT_SECONDS}s, using rule-based result")
+                result = await rule_task
+            _cache_result(content, content_type, result, existing_categories)
             print(f"🤖 Ollama categorization successful: {result.get('category')} (confidence: {result.get('confidence', 0):.2f})")
             return result
         else:
             print(f"❌ Ollama not available, trying other LLM services...")
         
-        # Try Groq API (free tier available)
+        # Race the free cloud APIs (Groq first, Hugging Face staggered) so a slow
+        # or misconfigured provider no longer adds its full timeout
+        cloud_providers = []
         groq_key = os.getenv("GROQ_API_KEY")
         if groq_key and len(groq_key) > 10:
-            print(f"🔍 Trying Groq API...")
-            result = await categorize_with_groq(content, groq_key, content_type)
-            _cache_result(content, content_type, result)
-            return result
+            cloud_providers.append(categorize_with_groq(content, groq_key, content_type))
         else:
             print(f"❌ No Groq API key found")
         
-        # Try Hugging Face API (free tier available)
         hf_key = os.getenv("HUGGINGFACE_API_KEY")
-        if hf_key and len(hf_key) > 10:
-            print(f"🔍 Trying Hugging Face API...")
-            result = await categorize_with_huggingface(content, hf_key, content_type)
-            _cache_result(content, content_type, result)
-            return result
+        if SentenceTransformer is not None:
+            # Local embeddings need no API key
+            cloud_providers.append(categorize_with_huggingface(content, hf_key or "", content_type))
+        elif hf_key and len(hf_key) > 10:
+            cloud_providers.append(categorize_with_huggingface(content, hf_key, content_type))
         else:
             print(f"❌ No Hugging Face API key found")
         
+        if cloud_providers:
+            print(f"🔍 Trying {len(cloud_providers)} cloud LLM API(s)...")
+            result = await _race_providers(cloud_providers)
+            if result is not None:
+                _cache_result(content, content_type, result, existing_categories)
+                return result
+            print("⚠️ Cloud LLM APIs gave no result, falling back to rules")
+            result = await rule_task
+            _cache_result(content, content_type, result, existing_categories)
+            return result
+        
         print("ℹ️ No local Ollama or API keys found, using enhanced rule-based categorization")
-        result = _categorize_with_enhanced_rules(content, content_type)
-        _cache_result(content, content_type, result)
+        result = await rule_task
+        _cache_result(content, content_type, result, existing_categories)
         return result
     
     except Exception as e:
         print(f"❌ LLM categorization failed: {str(e)}")
-        result = _categorize_with_enhanced_rules(content, content_type)
-        _cache_result(content, content_type, result)
+        result = await rule_task
+        _cache_result(content, content_type, result, existing_categories)
         return result
 
 
@@ -300,121 +895,65 @@ def _categorize_with_enhanced_rules(content: str, content_type: str = "email") -
     """
     Enhanced rule-based categorization with improved semantic analysis.
     Uses weighted keyword matching and context analysis.
+    Only the first _RULE_SCAN_LIMIT characters are scanned.
     """
+    content = content[:_RULE_SCAN_LIMIT]
     content_lower = content.lower()
-    categories = []
-    confidence_scores = {}
+    keyword_counts = _count_category_keywords(content_lower)
     
-    # Enhanced category mapping with weighted keywords
-    category_definitions = {
-        "work": {
-            "keywords": ["meeting", "deadline", "project", "office", "colleague", "client", "business", "presentation", "report", "manager", "team", "conference", "proposal", "contract"],
-            "patterns": [r"\b(q[1-4]|quarter|fiscal|budget|kpi|roi)\b", r"\bmeet(ing)?\s+(at|on|tomorrow|next)\b"],
-            "weight": 1.0
-        },
-        "finance": {
-            "keywords": ["money", "payment", "invoice", "budget", "expense", "income", "bank", "credit", "debit", "purchase", "transaction", "billing", "receipt", "refund", "subscription"],
-            "patterns": [r"\$\d+", r"\d+\.\d{2}", r"\b(paid|owe|due|charge|bill)\b"],
-            "weight": 1.2
-        },
-        "health": {
-            "keywords": ["doctor", "appointment", "medication", "exercise", "gym", "diet", "wellness", "medical", "hospital", "prescription", "therapy", "checkup", "symptoms"],
-            "patterns": [r"\b(dr\.|doctor|physician|clinic)\b", r"\b(dosage|mg|ml|prescription)\b"],
-            "weight": 1.1
-        },
-        "personal": {
-            "keywords": ["family", "friend", "birthday", "anniversary", "personal", "hobby", "weekend", "vacation", "relationship", "home", "kids", "children"],
-            "patterns": [r"\b(mom|dad|wife|husband|sister|brother)\b", r"\b(happy birthday|anniversary)\b"],
-            "weight": 0.9
-        },
-        "travel": {
-            "keywords": ["flight", "hotel", "vacation", "trip", "booking", "travel", "destination", "passport", "luggage", "airport", "reservation", "itinerary"],
-            "patterns": [r"\b(flight|booking)\s+#?\w+", r"\b(check.in|departure|arrival)\b"],
-            "weight": 1.1
-        },
-        "education": {
-            "keywords": ["learn", "course", "study", "book", "lecture", "assignment", "exam", "research", "university", "college", "tutorial", "webinar", "certification"],
-            "patterns": [r"\b(grade|score|semester|syllabus)\b", r"\b(professor|instructor|student)\b"],
-            "weight": 1.0
-        },
-        "shopping": {
-            "keywords": ["buy", "purchase", "order", "shop", "delivery", "product", "item", "cart", "amazon", "ebay", "sale", "discount", "coupon", "shipping"],
-            "patterns": [r"\border\s+#?\w+", r"\b(shipped|delivered|tracking)\b", r"\b\d+%\s+off\b"],
-            "weight": 1.1
-        },
-        "entertainment": {
-            "keywords": ["movie", "music", "game", "concert", "show", "party", "fun", "entertainment", "netflix", "spotify", "youtube", "streaming"],
-            "patterns": [r"\b(watch|stream|listen|play)\b", r"\b(episode|season|album|track)\b"],
-            "weight": 0.8
-        },
-        "social": {
-            "keywords": ["social", "community", "network", "group", "event", "gathering", "meetup", "facebook", "twitter", "instagram", "linkedin"],
-            "patterns": [r"\b(follow|like|share|comment)\b", r"\b(post|tweet|update)\b"],
-            "weight": 0.9
-        },
-        "communication": {
-            "keywords": ["email", "message", "call", "text", "chat", "notification", "contact", "phone", "whatsapp", "telegram", "zoom", "teams"],
-            "patterns": [r"\b(call|text|message)\s+(me|you|us)\b", r"\b(zoom|meet|hangout)\s+link\b"],
-            "weight": 0.7
-        }
-    }
-    
-    # Calculate weighted scores for each category
-    for category, definition in category_definitions.items():
-        score = 0.0
-        matches = 0
+    # Calculate weighted scores as flat (score, matches, index) rows
+    scored = []
+    for index, category in enumerate(_CATEGORY_NAMES):
+        weight = _CATEGORY_WEIGHTS[index]
         
         # Keyword matching with frequency weighting
-        for keyword in definition["keywords"]:
-            keyword_count = content_lower.count(keyword)
-            if keyword_count > 0:
-                score += keyword_count * definition["weight"]
-                matches += keyword_count
+        matches = keyword_counts[category]
+        score = matches * weight
         
-        # Pattern matching
-        for pattern in definition.get("patterns", []):
-            pattern_matches = len(re.findall(pattern, content_lower))
+        # Pattern matching; patterns get higher weight
+        for pattern in _CATEGORY_PATTERNS[index]:
+            pattern_matches = len(pattern.findall(content_lower))
             if pattern_matches > 0:
-                score += pattern_matches * definition["weight"] * 1.5  # Patterns get higher weight
+                score += pattern_matches * weight * 1.5
                 matches += pattern_matches
         
-        # Normalize score by content length and calculate confidence
         if score > 0:
-            normalized_score = min(1.0, score / max(1, len(content.split()) / 10))
-            # More realistic confidence calculation
-            if matches >= 3:
-                confidence = min(0.85, 0.4 + normalized_score * 0.45)  # Strong match: max 85%
-            elif matches >= 2:
-                confidence = min(0.75, 0.35 + normalized_score * 0.40)  # Medium match: max 75%
-            else:
-                confidence = min(0.65, 0.25 + normalized_score * 0.40)  # Weak match: max 65%
-            
-            categories.append({
-                "category": category,
-                "score": score,
-                "confidence": confidence,
-                "matches": matches
-            })
-    
-    # Sort by score and select top categories
-    categories.sort(key=lambda x: x["score"], reverse=True)
+            scored.append((score, matches, index))
+    
+    # Only the top three are reported, so skip sorting the rest
+    top_scored = heapq.nlargest(3, scored, key=itemgetter(0))
+    
+    # Normalize score by content length and calculate confidence
+    length_norm = max(1, len(content.split()) / 10)
+    ranked = []  # (category, matches, confidence) rows; no per-category dicts
+    for score, matches, index in top_scored:
+        normalized_score = min(1.0, score / length_norm)
+        # More realistic confidence calculation
+        if matches >= 3:
+            confidence = min(0.85, 0.4 + normalized_score * 0.45)  # Strong match: max 85%
+        elif matches >= 2:
+            confidence = min(0.75, 0.35 + normalized_score * 0.40)  # Medium match: max 75%
+        else:
+            confidence = min(0.65, 0.25 + normalized_score * 0.40)  # Weak match: max 65%
+        
+        ranked.append((_CATEGORY_NAMES[index], matches, confidence))
     
-    if categories:
-        top_category = categories[0]
-        selected_categories = [cat["category"] for cat in categories[:3]]
+    if ranked:
+        top_category, top_matches, top_confidence = ranked[0]
+        selected_categories = [row[0] for row in ranked]
         
         # Generate reasoning
-        reasoning = f"Identified as '{top_category['category']}' based on {top_category['matches']} keyword/pattern matches"
-        if len(categories) > 1:
-            reasoning += f" (alternatives: {', '.join([cat['category'] for cat in categories[1:3]])})"
+        reasoning = f"Identified as '{top_category}' based on {top_matches} keyword/pattern matches"
+        if len(ranked) > 1:
+            reasoning += f" (alternatives: {', '.join(selected_categories[1:])})"
         
         return {
-            "category": top_category["category"],
-            "confidence": top_category["confidence"],
+            "category": top_category,
+            "confidence": top_confidence,
             "reasoning": reasoning,
             "processing_method": "enhanced_rules",
             "categories": selected_categories,
-            "scores": {cat["category"]: cat["confidence"] for cat in categories[:3]}
+            "scores": {category: confidence for category, _, confidence in ranked}
         }
     else:
         # Fallback analysis for unmatched content
@@ -432,24 +971,29 @@ def _analyze_content_structure(content: str, content_type: str) -> str:
     """
     Analyze content structure when keywords don't match.
     """
+    # Every numeric pattern needs a digit, so one C-level scan gates them all
+    has_digit = not _DIGITS.isdisjoint(content)
+    
     # Time-based patterns
-    if re.search(r'\b\d{1,2}[:/]\d{1,2}\b', content):
+    if has_digit and ('/' in content or ':' in content) and _STRUCTURE_TIME_RE.search(content):
         return "scheduling"
     
     # Financial patterns
-    if re.search(r'\$\d+|\d+\.\d{2}|payment|invoice|bill', content):
+    if (has_digit and _STRUCTURE_AMOUNT_RE.search(content)) or any(word in content for word in _STRUCTURE_FINANCE_WORDS):
         return "finance"
     
     # URL patterns (might be newsletters or notifications)
-    if re.search(r'https?://|www\.', content):
+    if 'http://' in content or 'https://' in content or 'www.' in content:
         return "communication"
     
+    word_count = len(content.split())
+    
     # Long text documents
-    if len(content.split()) > 100:
+    if word_count > 100:
         return "documentation"
     
     # Short messages
-    if len(content.split()) < 10:
+    if word_count < 10:
         return "communication"
     
     # Content type specific defaults
@@ -461,165 +1005,359 @@ def _analyze_content_structure(content: str, content_type: str) -> str:
         return "general"
 
 
+def _get_http_session():
+    """
+    Return the module-wide aiohttp session, reusing its connection pool across calls.
+    A new session is created if the previous one was closed or belongs to another event loop.
+    """
+    global _http_session, _http_session_loop
+    if aiohttp is None:
+        raise ImportError("aiohttp is required for LLM provider calls")
+    
+    loop = asyncio.get_running_loop()
+    if _http_session is None or _http_session.closed or _http_session_loop is not loop:
+        # One pool for Ollama, Groq and Hugging Face; DNS answers are cached
+        # so repeated provider calls skip both resolution and handshakes
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=_HTTP_POOL_LIMIT,
+                limit_per_host=_HTTP_POOL_LIMIT_PER_HOST,
+                keepalive_timeout=75,
+                ttl_dns_cache=300
+            ),
+            # Per-request timeouts below override this; it only bounds stray calls
+            timeout=aiohttp.ClientTimeout(total=30, connect=10)
+        )
+        _http_session_loop = loop
+    return _http_session
+
+
+def _get_http2_client():
+    """
+    Return the module-wide HTTP/2 httpx client for cloud providers, recreated
+    if it was closed or belongs to another event loop.
+    """
+    global _http2_client, _http2_client_loop
+    loop = asyncio.get_running_loop()
+    if _http2_client is None or _http2_client.is_closed or _http2_client_loop is not loop:
+        _http2_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=_HTTP_POOL_LIMIT, max_keepalive_connections=_HTTP_POOL_LIMIT_PER_HOST),
+            timeout=httpx.Timeout(30, connect=10)
+        )
+        _http2_client_loop = loop
+    return _http2_client
+
+
+async def _read_limited(chunks, content_length: Optional[int]) -> bytes:
+    """
+    Buffer a response body, refusing anything over _MAX_RESPONSE_BYTES
+    so a misbehaving endpoint can't make us buffer an unbounded payload.
+    """
+    if content_length is not None and content_length > _MAX_RESPONSE_BYTES:
+        raise ValueError(f"response body of {content_length} bytes exceeds {_MAX_RESPONSE_BYTES}")
+    
+    body = bytearray()
+    async for chunk in chunks:
+        body += chunk
+        if len(body) > _MAX_RESPONSE_BYTES:
+            raise ValueError(f"response body exceeds {_MAX_RESPONSE_BYTES} bytes")
+    return bytes(body)
+
+
+async def _read_response_body(response) -> bytes:
+    """Read an aiohttp response body within _MAX_RESPONSE_BYTES"""
+    return await _read_limited(response.content.iter_chunked(65536), response.content_length)
+
+
+class _LimitedStream:
+    """Async reader over an aiohttp body that enforces _MAX_RESPONSE_BYTES for ijson"""
+    
+    def __init__(self, content):
+        self._content = content
+        self._read = 0
+    
+    async def read(self, size: int = -1) -> bytes:
+        chunk = await self._content.read(size)
+        self._read += len(chunk)
+        if self._read > _MAX_RESPONSE_BYTES:
+            raise ValueError(f"response body exceeds {_MAX_RESPONSE_BYTES} bytes")
+        return chunk
+
+
+async def _read_json_field(response, field: str) -> Any:
+    """
+    Return one top-level field of an aiohttp JSON response, or None if absent.
+    With ijson the body is decoded incrementally and reading stops once the
+    field is found, so large trailing fields are never parsed.
+    """
+    if ijson is None:
+        return _json_loads(await _read_response_body(response)).get(field)
+    
+    if response.content_length is not None and response.content_length > _MAX_RESPONSE_BYTES:
+        raise ValueError(f"response body of {response.content_length} bytes exceeds {_MAX_RESPONSE_BYTES}")
+    async for value in ijson.items_async(_LimitedStream(response.content), field):
+        return value
+    return None
+
+
+async def _post_cloud_json(url: str, headers: Dict[str, str], body: bytes, timeout: float) -> Tuple[int, bytes]:
+    """
+    POST a JSON body to a cloud provider and return (status, body bytes),
+    over HTTP/2 when available and the shared aiohttp pool otherwise.
+    """
+    if _USE_HTTP2:
+        async with _get_http2_client().stream("POST", url, headers=headers, content=body, timeout=timeout) as response:
+            if response.status_code != 200:
+                return response.status_code, b""
+            declared = response.headers.get("content-length")
+            return 200, await _read_limited(response.aiter_bytes(), int(declared) if declared else None)
+    
+    async with _get_http_session().post(url, headers=headers, data=body, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        if response.status != 200:
+            return response.status, b""
+        return 200, await _read_response_body(response)
+
+
+async def _stream_cloud_completion(url: str, headers: Dict[str, str], body: bytes, timeout: float) -> Tuple[int, str]:
+    """
+    POST a streaming chat completion and return (status, streamed content),
+    over HTTP/2 when available and the shared aiohttp pool otherwise.
+    """
+    if _USE_HTTP2:
+        async with _get_http2_client().stream("POST", url, headers=headers, content=body, timeout=timeout) as response:
+            if response.status_code != 200:
+                return response.status_code, ""
+            return 200, await _read_groq_stream(line.encode('utf-8') async for line in response.aiter_lines())
+    
+    async with _get_http_session().post(url, headers=headers, data=body, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        if response.status != 200:
+            return response.status, ""
+        text = await _read_groq_stream(response.content)
+        # Consume what follows [DONE] (the chunked terminator) so aiohttp can reuse the connection
+        await response.read()
+        return 200, text
+
+
+async def close_http_session() -> None:
+    """Close the shared HTTP session and HTTP/2 client (e.g. on application shutdown)."""
+    global _http_session, _http_session_loop, _http2_client, _http2_client_loop
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    if _http2_client is not None and not _http2_client.is_closed:
+        await _http2_client.aclose()
+    _http_session = None
+    _http_session_loop = None
+    _http2_client = None
+    _http2_client_loop = None
+
+
 async def _check_ollama_available() -> bool:
     """
     Async check if Ollama is available and running locally.
+    The result is cached for _OLLAMA_PROBE_TTL seconds so bulk runs probe once.
+    """
+    now = time.monotonic()
+    if now - _ollama_probe_cache['checked_at'] < _OLLAMA_PROBE_TTL:
+        return _ollama_probe_cache['available']
+    
+    available = await _probe_ollama()
+    _ollama_probe_cache['checked_at'] = time.monotonic()
+    _ollama_probe_cache['available'] = available
+    return available
+
+
+async def _probe_ollama() -> bool:
+    """
+    Probe the local Ollama server for a suitable model.
     """
+    if aiohttp is None:
+        print("🔍 Ollama not available: aiohttp is not installed")
+        return False
+    
     try:
-        import aiohttp
-        
         ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{ollama_url}/api/tags", timeout=aiohttp.ClientTimeout(total=3)) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    models = data.get('models', [])
-                    available_models = [model.get('name', '') for model in models]
-                    
-                    # Check for suitable models
-                    preferred_models = ['llama3.2', 'llama3.1', 'llama3', 'llama2', 'mistral', 'phi3', 'qwen']
-                    has_model = any(any(pref in model for pref in preferred_models) for model in available_models)
-                    
-                    if has_model:
-                        print(f"✅ Ollama available with models: {available_models[:3]}")
-                        return True
-                    else:
-                        print(f"⚠️ Ollama running but no suitable models found. Available: {available_models}")
-                        return False
+        session = _get_http_session()
+        async with session.get(f"{ollama_url}/api/tags", timeout=aiohttp.ClientTimeout(total=3)) as response:
+            if response.status == 200:
+                data = _json_loads(await _read_response_body(response))
+                models = data.get('models', [])
+                available_models = [model.get('name', '') for model in models]
+                
+                # Check for suitable models
+                preferred_models = ['llama3.2', 'llama3.1', 'llama3', 'llama2', 'mistral', 'phi3', 'qwen']
+                has_model = any(any(pref in model for pref in preferred_models) for model in available_models)
+                
+                if has_model:
+                    print(f"✅ Ollama available with models: {available_models[:3]}")
+                    return True
                 else:
+                    print(f"⚠️ Ollama running but no suitable models found. Available: {available_models}")
                     return False
-                    
+            else:
+                return False
+                
     except Exception as e:
         print(f"🔍 Ollama not available: {str(e)}")
         return False
 
 
-def _analyze_content_themes(content: str) -> Dict[str, List[str]]:
+@_cached_provider_call("ollama")
+async def categorize_with_ollama(content: str, content_type: str = "email", model: str = "llama3.2", existing_categories: List[str] = None) -> Dict[str, Any]:
     """
-    Analyze content to extract key themes and entities for dynamic categorization.
+    Enhanced dynamic categorization using local Ollama model with smart prompting.
     """
-    content_lower = content.lower()
-    
-    # Detect themes through semantic patterns
-    themes = []
-    entities = []
-    
-    # Time-related patterns
-    time_patterns = [
-        r'\b\d{1,2}[:/]\d{1,2}(?:[:/]\d{1,2})?\s*(?:am|pm)?\b',
-        r'\b(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b',
-        r'\b(?:january|february|march|april|may|june|july|august|september|october|november|december)\b',
-        r'\b(?:tomorrow|today|yesterday|next week|last week)\b'
-    ]
+    if aiohttp is None:
+        return _categorize_with_enhanced_rules(content, content_type)
     
-    if any(re.search(pattern, content_lower) for pattern in time_patterns):
-        themes.append('time_sensitive')
-        themes.append('scheduling')
+    try:
+        ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
+        
+        # Dynamic prompt generation based on content analysis and existing categories
+        prompt = await _generate_dynamic_categorization_prompt(content, content_type, existing_categories)
+        
+        data = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+            "format": "json",
+            "options": {
+                "temperature": 0.3,  # Slightly higher for creativity in new categories
+                "top_p": 0.9,
+                "num_predict": 300  # More tokens for detailed reasoning
+            }
+        }
+        
+        session = _get_http_session()
+        async with session.post(f"{ollama_url}/api/generate", data=_json_dumps(data), headers=_JSON_HEADERS, timeout=aiohttp.ClientTimeout(total=30)) as response:
+            if response.status == 200:
+                # Ollama sends 'response' ahead of its large token 'context' array
+                response_text = (await _read_json_field(response, 'response') or '').strip()
+                
+                try:
+                    # Parse JSON response
+                    parsed_result = _json_loads(response_text)
+                    
+                    ollama_result = _normalize_ollama_result(parsed_result, model)
+                    print(f"🤖 Ollama categorization: {ollama_result['category']} (confidence: {ollama_result['confidence']:.2f})")
+                    return ollama_result
+                    
+                except json.JSONDecodeError:
+                    # Fallback parsing if JSON format fails
+                    print("⚠️ Ollama returned non-JSON, attempting text parsing")
+                    return _parse_ollama_text_response(response_text, content, content_type)
+                    
+            else:
+                print(f"❌ Ollama API error: {response.status}")
+                return _categorize_with_enhanced_rules(content, content_type)
+        
+    except Exception as e:
+        print(f"❌ Ollama categorization failed: {str(e)}")
+        return _categorize_with_enhanced_rules(content, content_type)
 
-    # Financial patterns
-    financial_patterns = [
-        r'\$\d+(?:\.\d{2})?',
-        r'\b\d+(?:\.\d{2})?\s*(?:dollars?|usd|eur|gbp)\b',
-        r'\b(?:payment|invoice|billing|subscription|refund|charge)\b'
-    ]
-    
-    if any(re.search(pattern, content_lower) for pattern in financial_patterns):
-        themes.append('financial')
-    
-    # Professional patterns
-    professional_patterns = [
-        r'\b(?:meeting|conference|presentation|project|deadline|client|colleague)\b',
-        r'\b(?:manager|director|ceo|team|department|office)\b'
-    ]
-    
-    if any(re.search(pattern, content_lower) for pattern in professional_patterns):
-        themes.append('professional')
-    
-    # Personal patterns
-    personal_patterns = [
-        r'\b(?:family|friend|birthday|anniversary|personal|home)\b',
-        r'\b(?:mom|dad|wife|husband|children|kids|parents)\b'
-    ]
-    
-    if any(re.search(pattern, content_lower) for pattern in personal_patterns):
-        themes.append('personal')
-    
-    # Health patterns
-    health_patterns = [
-        r'\b(?:doctor|appointment|medical|prescription|hospital|clinic)\b',
-        r'\b(?:exercise|gym|fitness|diet|wellness|therapy)\b'
-    ]
+
+def _normalize_category_name(name: str) -> str:
+    """Lowercase a model-supplied category into underscore_case and intern it"""
+    return sys.intern(name.lower().replace(' ', '_').replace('-', '_'))
+
+
+def _normalize_ollama_result(parsed_result: Dict[str, Any], model: str) -> Dict[str, Any]:
+    """
+    Convert a parsed Ollama JSON answer into the standard categorization result.
+    """
+    category = parsed_result.get('category', 'general')
+    confidence = float(parsed_result.get('confidence', 0.7))
+    reasoning = parsed_result.get('reasoning', 'AI categorization')
+    alternatives = parsed_result.get('alternative_categories', [])
     
-    if any(re.search(pattern, content_lower) for pattern in health_patterns):
-        themes.append('health_related')
+    # Allow dynamic categories but adjust confidence realistically
+    if confidence > 0.9:
+        confidence = 0.75 + (confidence - 0.9) * 0.5  # Cap at 85%
+    elif confidence > 0.8:
+        confidence = 0.65 + (confidence - 0.8) * 0.5  # Scale down high confidence
     
-    # Extract entities (companies, people, places)
-    entity_patterns = [
-        r'\b[A-Z][a-z]+ [A-Z][a-z]+\b',  # Proper names
-        r'\b[A-Z][a-z]+(?:\s+Inc\.|Corp\.|LLC|Ltd\.)\b',  # Companies
-        r'\b(?:Amazon|Google|Microsoft|Apple|Facebook|Netflix)\b'  # Known entities
-    ]
+    # Clean up category names; interning lets cached results share one
+    # string per category instead of a fresh copy from every model answer
+    category = _normalize_category_name(category)
+    alternatives = [_normalize_category_name(alt) for alt in alternatives if alt]
     
-    for pattern in entity_patterns:
-        matches = re.findall(pattern, content)
-        entities.extend(matches[:5])  # Limit to prevent overwhelming
+    categories = [category] + alternatives[:2]
     
     return {
-        'themes': themes if themes else ['general_content'],
-        'entities': entities[:10]  # Limit entities
+        "category": category,
+        "confidence": confidence,
+        "reasoning": reasoning,
+        "processing_method": "ollama_llm",
+        "categories": categories[:3],
+        "model_used": model
     }
 
 
-def _get_content_specific_guidance(content_type: str, content_analysis: Dict[str, List[str]]) -> str:
+async def categorize_batch_with_ollama(items: List[Tuple[str, str]], model: str = "llama3.2") -> List[Dict[str, Any]]:
     """
-    Generate content-type specific guidance for categorization.
-    """
-    guidance = ""
-    themes = content_analysis.get('themes', [])
+    Categorize many (content, content_type) items with Ollama, packing up to
+    OLLAMA_BATCH_SIZE items into each model call instead of one call per item.
     
-    if content_type == "email":
-        guidance = """For emails, consider:
-- Purpose: informational, request, confirmation, marketing, personal
-- Urgency: time-sensitive vs. general communication
-- Sender relationship: professional, personal, automated system
-- Action required: response needed, FYI, task assignment"""
+    Args:
+        items: List of (content, content_type) tuples
+        model: Ollama model name
         
-        if 'time_sensitive' in themes:
-            guidance += "\n- This appears time-sensitive, consider scheduling-related categories"
-        if 'professional' in themes:
-            guidance += "\n- Professional context detected, consider work-related subcategories"
+    Returns:
+        List of categorization results in the same order as items
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    pending = []
+    for index, (content, content_type) in enumerate(items):
+        cached_result = _get_cached_result(content, content_type)
+        if cached_result:
+            results[index] = {**cached_result, "processing_method": cached_result["processing_method"] + "_cached"}
+        else:
+            pending.append(index)
     
-    elif content_type == "calendar":
-        guidance = """For calendar events, consider:
-- Event type: meeting, appointment, deadline, reminder, personal event
-- Participants: work team, family, medical, social
-- Location: office, home, external venue, virtual
-- Frequency: one-time, recurring, series"""
-        
-        if 'health_related' in themes:
-            guidance += "\n- Health-related event detected, consider medical appointment categories"
+    # Fan batches out concurrently, bounded so the local server isn't flooded
+    semaphore = asyncio.Semaphore(OLLAMA_BATCH_CONCURRENCY)
     
-    elif content_type == "document":
-        guidance = """For documents, consider:
-- Document purpose: reference, instruction, report, communication
-- Audience: internal team, client-facing, personal use
-- Content nature: technical, administrative, creative, analytical"""
+    async def run_batch(batch_indices: List[int]) -> None:
+        async with semaphore:
+            batch_results = await _categorize_ollama_batch([items[i] for i in batch_indices], model)
+        for index, result in zip(batch_indices, batch_results):
+            content, content_type = items[index]
+            _cache_result(content, content_type, result)
+            results[index] = result
     
-    return guidance
+    await asyncio.gather(*(
+        run_batch(pending[start:start + OLLAMA_BATCH_SIZE])
+        for start in range(0, len(pending), OLLAMA_BATCH_SIZE)
+    ))
+    return results
 
 
-async def categorize_with_ollama(content: str, content_type: str = "email", model: str = "llama3.2", existing_categories: List[str] = None) -> Dict[str, Any]:
+async def _categorize_ollama_batch(items: List[Tuple[str, str]], model: str) -> List[Dict[str, Any]]:
     """
-    Enhanced dynamic categorization using local Ollama model with smart prompting.
+    Send one prompt covering several items and split the JSON answer per item.
+    Items the model did not answer fall back to rule-based categorization.
     """
     try:
-        import aiohttp
-        
         ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
         
-        # Dynamic prompt generation based on content analysis and existing categories
-        prompt = await _generate_dynamic_categorization_prompt(content, content_type, existing_categories)
+        listing = "\n\n".join(
+            f"Item {number} ({content_type}):\n{content[:800]}"
+            for number, (content, content_type) in enumerate(items, 1)
+        )
+        prompt = f"""You are an expert AI content categorization specialist. Assign each of the {len(items)} items below the most semantically meaningful category.
+Group similar content into broad underscore_case categories (e.g. "work_communication", "finance", "shopping", "job_opportunities").
+
+{listing}
+
+RESPONSE FORMAT (JSON):
+{{
+  "results": [
+    {{"item": 1, "category": "category_name", "confidence": 0.85, "reasoning": "short explanation", "alternative_categories": ["alternative1"]}}
+  ]
+}}
+
+Return exactly {len(items)} objects in "results", one per item, in the same order."""
         
         data = {
             "model": model,
@@ -627,76 +1365,44 @@ async def categorize_with_ollama(content: str, content_type: str = "email", mode
             "stream": False,
             "format": "json",
             "options": {
-                "temperature": 0.3,  # Slightly higher for creativity in new categories
+                "temperature": 0.3,
                 "top_p": 0.9,
-                "num_predict": 300  # More tokens for detailed reasoning
+                "num_predict": 120 * len(items)
             }
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(f"{ollama_url}/api/generate", json=data, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    response_text = result.get('response', '').strip()
-                    
-                    try:
-                        # Parse JSON response
-                        parsed_result = json.loads(response_text)
-                        
-                        category = parsed_result.get('category', 'general')
-                        confidence = float(parsed_result.get('confidence', 0.7))
-                        reasoning = parsed_result.get('reasoning', 'AI categorization')
-                        alternatives = parsed_result.get('alternative_categories', [])
-                        
-                        # Allow dynamic categories but adjust confidence realistically
-                        if confidence > 0.9:
-                            confidence = 0.75 + (confidence - 0.9) * 0.5  # Cap at 85%
-                        elif confidence > 0.8:
-                            confidence = 0.65 + (confidence - 0.8) * 0.5  # Scale down high confidence
-                        
-                        # Clean up category name
-                        category = category.lower().replace(' ', '_').replace('-', '_')
-                        alternatives = [alt.lower().replace(' ', '_').replace('-', '_') for alt in alternatives if alt]
-                        
-                        categories = [category] + alternatives[:2]
-                        
-                        print(f"🤖 Ollama categorization: {category} (confidence: {confidence:.2f})")
-                        
-                        return {
-                            "category": category,
-                            "confidence": confidence,
-                            "reasoning": reasoning,
-                            "processing_method": "ollama_llm",
-                            "categories": categories[:3],
-                            "model_used": model
-                        }
-                        
-                    except json.JSONDecodeError:
-                        # Fallback parsing if JSON format fails
-                        print("⚠️ Ollama returned non-JSON, attempting text parsing")
-                        return _parse_ollama_text_response(response_text, content, content_type)
-                        
-                else:
-                    print(f"❌ Ollama API error: {response.status}")
-                    return _categorize_with_enhanced_rules(content, content_type)
+        session = _get_http_session()
+        async with session.post(f"{ollama_url}/api/generate", data=_json_dumps(data), headers=_JSON_HEADERS, timeout=aiohttp.ClientTimeout(total=30 + 10 * len(items))) as response:
+            if response.status != 200:
+                print(f"❌ Ollama API error: {response.status}")
+                parsed_items = []
+            else:
+                parsed = _json_loads((await _read_json_field(response, 'response') or '').strip())
+                parsed_items = parsed.get('results', []) if isinstance(parsed, dict) else parsed
         
     except Exception as e:
-        print(f"❌ Ollama categorization failed: {str(e)}")
-        return _categorize_with_enhanced_rules(content, content_type)
+        print(f"❌ Ollama batch categorization failed: {str(e)}")
+        parsed_items = []
+    
+    results = []
+    for index, (content, content_type) in enumerate(items):
+        if index < len(parsed_items) and isinstance(parsed_items[index], dict):
+            results.append(_normalize_ollama_result(parsed_items[index], model))
+        else:
+            results.append(_categorize_with_enhanced_rules(content, content_type))
+    return results
+
+
+def _find_valid_categories(text: str) -> List[str]:
+    """Return the valid category names mentioned in text, unique and in order of first mention"""
+    return list(dict.fromkeys(_VALID_CATEGORY_RE.findall(text.lower())))
 
 
 def _parse_ollama_text_response(response_text: str, content: str, content_type: str) -> Dict[str, Any]:
     """
     Parse non-JSON Ollama responses for category extraction.
     """
-    valid_categories = [
-        'work', 'personal', 'finance', 'health', 'education', 'shopping', 
-        'travel', 'entertainment', 'social', 'communication', 'scheduling', 
-        'documentation', 'general'
-    ]
-    
-    response_lower = response_text.lower()
-    found_categories = [cat for cat in valid_categories if cat in response_lower]
+    found_categories = _find_valid_categories(response_text)
     
     if found_categories:
         category = found_categories[0]
@@ -714,13 +1420,57 @@ def _parse_ollama_text_response(response_text: str, content: str, content_type:
         return _categorize_with_enhanced_rules(content, content_type)
 
 
+async def _read_groq_stream(lines) -> str:
+    """
+    Accumulate a streamed Groq completion from its SSE lines (bytes). Once the
+    streamed text forms a complete JSON object later chunks are no longer parsed,
+    but the stream is still read to its [DONE] marker so the connection goes back
+    to the pool. A malformed chunk ends the stream; whatever arrived is parsed as usual.
+    """
+    parts = []
+    received = 0
+    complete = False
+    try:
+        async for raw_line in lines:
+            line = raw_line.strip()
+            if not line.startswith(b"data:"):
+                continue
+            payload = line[5:].strip()
+            if payload == b"[DONE]":
+                break
+            if complete:
+                continue
+            
+            delta = _json_loads(payload)['choices'][0].get('delta', {}).get('content')
+            if not delta:
+                continue
+            parts.append(delta)
+            received += len(delta)
+            if received > _MAX_STREAM_CHARS:
+                print(f"⚠️ Groq stream exceeded {_MAX_STREAM_CHARS} characters, parsing what arrived")
+                break
+            
+            # Only a closing brace can complete the object, so only then try to decode
+            if '}' in delta:
+                try:
+                    _json_loads(''.join(parts))
+                    complete = True
+                except json.JSONDecodeError:
+                    continue
+    except (ValueError, KeyError, IndexError) as e:
+        print(f"⚠️ Groq stream interrupted, parsing partial response: {str(e)}")
+    return ''.join(parts)
+
+
+@_cached_provider_call("groq")
 async def categorize_with_groq(content: str, api_key: str, content_type: str = "email") -> Dict[str, Any]:
     """
     Enhanced categorization using Groq API with better prompting.
     """
+    if aiohttp is None and not _USE_HTTP2:
+        return _categorize_with_enhanced_rules(content, content_type)
+    
     try:
-        import aiohttp
-        
         url = "https://api.groq.com/openai/v1/chat/completions"
         headers = {
             "Authorization": f"Bearer {api_key}",
@@ -735,7 +1485,8 @@ async def categorize_with_groq(content: str, api_key: str, content_type: str = "
 
 Be precise and consider context clues."""
         
-        user_prompt = f"Categorize this {content_type}: {content[:500]}"
+        start_tokenizer_load()
+        user_prompt = f"Categorize this {content_type}: {_truncate_to_tokens(content[:500], _GROQ_CONTENT_TOKENS)}"
         
         data = {
             "model": "llama3-8b-8192",
@@ -744,150 +1495,305 @@ Be precise and consider context clues."""
                 {"role": "user", "content": user_prompt}
             ],
             "max_tokens": 150,
-            "temperature": 0.2
+            "temperature": 0.2,
+            "response_format": {"type": "json_object"},
+            "stream": True
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=data, timeout=aiohttp.ClientTimeout(total=15)) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    response_text = result['choices'][0]['message']['content'].strip()
-                    
-                    try:
-                        parsed_result = json.loads(response_text)
-                        category = parsed_result.get('category', 'general')
-                        confidence = float(parsed_result.get('confidence', 0.7))
-                        reasoning = parsed_result.get('reasoning', 'AI categorization')
-                        alternatives = parsed_result.get('alternatives', [])
-                        
-                        categories = [category] + alternatives[:2]
-                        
-                        print(f"⚡ Groq categorization: {category} (confidence: {confidence:.2f})")
-                        
-                        return {
-                            "category": category,
-                            "confidence": confidence,
-                            "reasoning": reasoning,
-                            "processing_method": "groq_llm",
-                            "categories": categories[:3]
-                        }
-                        
-                    except json.JSONDecodeError:
-                        # Fallback to simple parsing
-                        categories = _extract_categories_from_text(response_text)
-                        return {
-                            "category": categories[0] if categories else "general",
-                            "confidence": 0.6,
-                            "reasoning": "Parsed from Groq text response",
-                            "processing_method": "groq_text_parsing",
-                            "categories": categories[:3]
-                        }
-                else:
-                    print(f"Groq API error: {response.status}")
-                    return _categorize_with_enhanced_rules(content, content_type)
-        
+        status, response_text = await _stream_cloud_completion(url, headers, _json_dumps(data), 15)
+        if status == 200:
+            response_text = response_text.strip()
+            
+            try:
+                parsed_result = _json_loads(response_text)
+                category = parsed_result.get('category', 'general')
+                confidence = float(parsed_result.get('confidence', 0.7))
+                reasoning = parsed_result.get('reasoning', 'AI categorization')
+                alternatives = parsed_result.get('alternatives', [])
+                
+                categories = [category] + alternatives[:2]
+                
+                print(f"⚡ Groq categorization: {category} (confidence: {confidence:.2f})")
+                
+                return {
+                    "category": category,
+                    "confidence": confidence,
+                    "reasoning": reasoning,
+                    "processing_method": "groq_llm",
+                    "categories": categories[:3]
+                }
+                
+            except json.JSONDecodeError:
+                # Fallback to simple parsing
+                categories = _extract_categories_from_text(response_text)
+                return {
+                    "category": categories[0] if categories else "general",
+                    "confidence": 0.6,
+                    "reasoning": "Parsed from Groq text response",
+                    "processing_method": "groq_text_parsing",
+                    "categories": categories[:3]
+                }
+        else:
+            print(f"Groq API error: {status}")
+            return _categorize_with_enhanced_rules(content, content_type)
+    
     except Exception as e:
         print(f"❌ Groq API failed: {str(e)}")
         return _categorize_with_enhanced_rules(content, content_type)
 
 
-async def categorize_with_huggingface(content: str, api_key: str, content_type: str = "email") -> Dict[str, Any]:
+# Zero-shot labels sent to Hugging Face and the simple category each maps back to
+_HF_ZERO_SHOT_URL = "https://api-inference.huggingface.co/models/facebook/bart-large-mnli"
+_HF_LABEL_CATEGORIES = {
+    "work and business": "work",
+    "personal and family": "personal",
+    "finance and money": "finance",
+    "health and wellness": "health",
+    "education and learning": "education",
+    "shopping and purchases": "shopping",
+    "travel and vacation": "travel",
+    "entertainment and leisure": "entertainment",
+    "social and community": "social",
+    "communication and messaging": "communication",
+    "scheduling and appointments": "scheduling",
+    "documentation and reports": "documentation",
+    "general topics": "general"
+}
+_HF_CANDIDATE_LABELS = list(_HF_LABEL_CATEGORIES)
+
+# Concurrent zero-shot calls are coalesced: inputs arriving within the window
+# share one POST, up to _HF_MAX_BATCH_SIZE inputs per request
+_HF_BATCH_WINDOW = 0.01
+_HF_MAX_BATCH_SIZE = 32
+_hf_pending_batches: Dict[str, List[Tuple[str, "asyncio.Future"]]] = {}
+# The event loop only keeps weak references to tasks; hold each batch POST
+# here until it finishes so it can't be garbage-collected mid-flight
+_hf_batch_tasks: "set[asyncio.Task]" = set()
+
+# Local zero-shot replacement for the Hugging Face API when sentence-transformers
+# is installed: cosine similarity against label embeddings computed once.
+# Similarities are divided by the temperature before the softmax so the
+# resulting confidences are comparable to the API's zero-shot scores
+_LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+_LOCAL_ZERO_SHOT_TEMPERATURE = 0.05
+# None until the first load attempt, False once loading failed
+_local_zero_shot = None
+_local_zero_shot_lock = threading.Lock()
+
+
+async def _hf_zero_shot(text: str, api_key: str) -> Any:
     """
-    Enhanced categorization using Hugging Face with zero-shot classification.
+    Queue one input for the next batched zero-shot request and await its result.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    batch = _hf_pending_batches.setdefault(api_key, [])
+    batch.append((text, future))
+    
+    if len(batch) >= _HF_MAX_BATCH_SIZE:
+        _flush_hf_batch(api_key, batch)
+    elif len(batch) == 1:
+        loop.call_later(_HF_BATCH_WINDOW, _flush_hf_batch, api_key, batch)
+    
+    return await future
+
+
+def _flush_hf_batch(api_key: str, batch: List[Tuple[str, "asyncio.Future"]]) -> None:
+    """Detach a pending batch and send it, unless it was already sent"""
+    if _hf_pending_batches.get(api_key) is batch:
+        del _hf_pending_batches[api_key]
+        # Always called inside the running loop, directly or from call_later
+        task = asyncio.get_running_loop().create_task(_post_hf_batch(api_key, batch))
+        _hf_batch_tasks.add(task)
+        task.add_done_callback(_hf_batch_tasks.discard)
+
+
+async def _post_hf_batch(api_key: str, batch: List[Tuple[str, "asyncio.Future"]]) -> None:
     """
+    POST every queued input in one request; the API answers with a list aligned to the inputs.
+    """
+    # Callers that gave up (e.g. lost a provider race) are dropped before sending
+    batch = [(text, future) for text, future in batch if not future.done()]
+    if not batch:
+        return
+    
     try:
-        import aiohttp
-        
-        url = "https://api-inference.huggingface.co/models/facebook/bart-large-mnli"
         headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
-        
-        candidate_labels = [
-            "work and business", "personal and family", "finance and money", "health and wellness", 
-            "education and learning", "shopping and purchases", "travel and vacation", 
-            "entertainment and leisure", "social and community", "communication and messaging", 
-            "scheduling and appointments", "documentation and reports", "general topics"
-        ]
-        
         data = {
-            "inputs": content[:512],
+            "inputs": [text for text, _ in batch],
             "parameters": {
-                "candidate_labels": candidate_labels
+                "candidate_labels": _HF_CANDIDATE_LABELS
             }
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=data, timeout=aiohttp.ClientTimeout(total=15)) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    
-                    if isinstance(result, dict) and 'labels' in result and 'scores' in result:
-                        # Map labels back to simple categories
-                        label_mapping = {
-                            "work and business": "work",
-                            "personal and family": "personal", 
-                            "finance and money": "finance",
-                            "health and wellness": "health",
-                            "education and learning": "education",
-                            "shopping and purchases": "shopping",
-                            "travel and vacation": "travel",
-                            "entertainment and leisure": "entertainment",
-                            "social and community": "social",
-                            "communication and messaging": "communication",
-                            "scheduling and appointments": "scheduling",
-                            "documentation and reports": "documentation",
-                            "general topics": "general"
-                        }
-                        
-                        top_label = result['labels'][0]
-                        top_score = result['scores'][0]
-                        category = label_mapping.get(top_label, "general")
-                        
-                        # Get alternative categories
-                        alternatives = []
-                        for label, score in zip(result['labels'][1:3], result['scores'][1:3]):
-                            if score > 0.2:  # Threshold for alternatives
-                                alt_category = label_mapping.get(label, "general")
-                                if alt_category != category:
-                                    alternatives.append(alt_category)
-                        
-                        categories = [category] + alternatives[:2]
-                        
-                        print(f"🤗 Hugging Face categorization: {category} (confidence: {top_score:.2f})")
-                        
-                        return {
-                            "category": category,
-                            "confidence": float(top_score),
-                            "reasoning": f"Zero-shot classification with {top_score:.2f} confidence",
-                            "processing_method": "huggingface_zero_shot",
-                            "categories": categories
-                        }
-                    else:
-                        print(f"Unexpected Hugging Face response format: {result}")
-                        return _categorize_with_enhanced_rules(content, content_type)
-                else:
-                    print(f"Hugging Face API error: {response.status}")
-                    return _categorize_with_enhanced_rules(content, content_type)
+        status, body = await _post_cloud_json(_HF_ZERO_SHOT_URL, headers, _json_dumps(data), 15)
+        if status != 200:
+            raise RuntimeError(f"Hugging Face API error: {status}")
+        result = _json_loads(body)
+        
+        if not isinstance(result, list) or len(result) != len(batch):
+            raise RuntimeError(f"Unexpected Hugging Face response format: {result}")
+        
+        for (_, future), item in zip(batch, result):
+            if not future.done():
+                future.set_result(item)
+    
+    except Exception as e:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(e)
+
+
+def _get_local_zero_shot():
+    """
+    Load the embedding model and embed the candidate labels on first use.
+    Returns None when sentence-transformers is missing or the model failed to
+    load; a failure is remembered so later calls don't retry the download.
+    """
+    global _local_zero_shot
+    if SentenceTransformer is None:
+        return None
+    with _local_zero_shot_lock:
+        if _local_zero_shot is None:
+            _local_zero_shot = False
+            try:
+                model = SentenceTransformer(_LOCAL_EMBEDDING_MODEL)
+                label_embeddings = model.encode(_HF_CANDIDATE_LABELS, normalize_embeddings=True)
+                _local_zero_shot = (model, label_embeddings)
+            except Exception as e:
+                print(f"⚠️ Local embedding model unavailable, using the Hugging Face API: {str(e)}")
+    return _local_zero_shot or None
+
+
+def _zero_shot_locally(text: str) -> Optional[Dict[str, list]]:
+    """
+    Score text against the candidate labels with local embeddings.
+    Returns the same {'labels': [...], 'scores': [...]} shape as the API, best first,
+    or None when no local model is available.
+    """
+    local_zero_shot = _get_local_zero_shot()
+    if local_zero_shot is None:
+        return None
+    model, label_embeddings = local_zero_shot
+    text_embedding = model.encode(text, normalize_embeddings=True)
+    similarities = (label_embeddings @ text_embedding).tolist()
+    
+    # Softmax over the scaled cosine similarities
+    peak = max(similarities)
+    weights = [math.exp((similarity - peak) / _LOCAL_ZERO_SHOT_TEMPERATURE) for similarity in similarities]
+    total = sum(weights)
+    ranked = sorted(zip(_HF_CANDIDATE_LABELS, weights), key=itemgetter(1), reverse=True)
+    return {
+        'labels': [label for label, _ in ranked],
+        'scores': [weight / total for _, weight in ranked]
+    }
+
+
+@_cached_provider_call("huggingface")
+async def categorize_with_huggingface(content: str, api_key: str, content_type: str = "email") -> Dict[str, Any]:
+    """
+    Enhanced categorization using Hugging Face with zero-shot classification.
+    Runs on local sentence-transformers embeddings when installed and the model
+    loads; otherwise concurrent calls are micro-batched into a single API request.
+    """
+    if SentenceTransformer is None and aiohttp is None and not _USE_HTTP2:
+        return _categorize_with_enhanced_rules(content, content_type)
+    
+    try:
+        result = None
+        if SentenceTransformer is not None:
+            # Off the event loop: loading and encoding are blocking and CPU-bound
+            result = await asyncio.get_running_loop().run_in_executor(None, _zero_shot_locally, content[:512])
+        if result is None:
+            if not api_key or (aiohttp is None and not _USE_HTTP2):
+                return _categorize_with_enhanced_rules(content, content_type)
+            start_tokenizer_load()
+            result = await _hf_zero_shot(_truncate_to_tokens(content[:512], _HF_CONTENT_TOKENS), api_key)
+        
+        if isinstance(result, dict) and 'labels' in result and 'scores' in result:
+            labels = result['labels']
+            scores = result['scores']
+            top_label, top_score = labels[0], scores[0]
+            category = _HF_LABEL_CATEGORIES.get(top_label, "general")
+            
+            # Get alternative categories
+            alternatives = []
+            for label, score in zip(islice(labels, 1, 3), islice(scores, 1, 3)):
+                if score > 0.2:  # Threshold for alternatives
+                    alt_category = _HF_LABEL_CATEGORIES.get(label, "general")
+                    if alt_category != category:
+                        alternatives.append(alt_category)
+            
+            categories = [category] + alternatives[:2]
+            
+            print(f"🤗 Hugging Face categorization: {category} (confidence: {top_score:.2f})")
+            
+            return {
+                "category": category,
+                "confidence": float(top_score),
+                "reasoning": f"Zero-shot classification with {top_score:.2f} confidence",
+                "processing_method": "huggingface_zero_shot",
+                "categories": categories
+            }
+        else:
+            print(f"Unexpected Hugging Face response format: {result}")
+            return _categorize_with_enhanced_rules(content, content_type)
         
     except Exception as e:
         print(f"❌ Hugging Face API failed: {str(e)}")
         return _categorize_with_enhanced_rules(content, content_type)
 
 
+async def categorize_batch(contents: List[str], api_key: str, provider: str = "groq", content_type: str = "email", concurrency: int = 32) -> List[Any]:
+    """
+    Categorize many contents with one provider, keeping up to `concurrency`
+    requests in flight over the shared keep-alive connection pool.
+    
+    Tune `concurrency` to the provider's rate limits (Groq tokens per minute,
+    Hugging Face inference quota). Hugging Face calls that are in flight together
+    are coalesced into batched API requests; "ollama" uses the multi-item prompt
+    batching of categorize_batch_with_ollama and ignores api_key.
+    
+    Args:
+        contents: Texts to categorize
+        api_key: API key for the provider
+        provider: "groq", "huggingface" or "ollama"
+        content_type: Type of content (email, calendar, document)
+        concurrency: Maximum concurrent provider calls
+        
+    Returns:
+        Results in the same order as contents; a failed item holds its exception
+    """
+    if provider == "ollama":
+        return await categorize_batch_with_ollama([(content, content_type) for content in contents])
+    
+    categorize = _BATCH_PROVIDERS.get(provider)
+    if categorize is None:
+        raise ValueError(f"Unknown provider '{provider}', expected one of {sorted(_BATCH_PROVIDERS) + ['ollama']}")
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def categorize_one(content: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await categorize(content, api_key, content_type)
+    
+    return await asyncio.gather(*map(categorize_one, contents), return_exceptions=True)
+
+
+_BATCH_PROVIDERS = {
+    "groq": categorize_with_groq,
+    "huggingface": categorize_with_huggingface
+}
+
+
 def _extract_categories_from_text(text: str) -> List[str]:
     """
     Extract categories from plain text responses.
     """
-    valid_categories = [
-        'work', 'personal', 'finance', 'health', 'education', 'shopping', 
-        'travel', 'entertainment', 'social', 'communication', 'scheduling', 
-        'documentation', 'general'
-    ]
-    
-    text_lower = text.lower()
-    found_categories = [cat for cat in valid_categories if cat in text_lower]
+    found_categories = _find_valid_categories(text)
     
     return found_categories if found_categories else ["general"]
 
@@ -896,51 +1802,34 @@ def get_category_confidence(content: str, categories: List[str]) -> Dict[str, fl
     """
     Enhanced confidence scoring for categories based on multiple factors.
     """
+    # Categories without indicators get a flat default, so skip the scan when none are requested
+    if _CONFIDENCE_INDICATORS.keys().isdisjoint(categories):
+        return {category: 0.5 for category in categories}
+    
     confidence_scores = {}
-    content_lower = content.lower()
-    content_length = len(content.split())
-    
-    # Enhanced keyword mapping with weights
-    category_indicators = {
-        "work": {
-            "strong": ["meeting", "deadline", "project", "client", "presentation", "proposal"],
-            "medium": ["office", "colleague", "business", "manager", "team"],
-            "weak": ["work", "job", "career"]
-        },
-        "finance": {
-            "strong": ["payment", "invoice", "budget", "expense", "transaction"],
-            "medium": ["money", "bank", "credit", "debit", "billing"],
-            "weak": ["cost", "price", "financial"]
-        },
-        "health": {
-            "strong": ["doctor", "appointment", "prescription", "medical"],
-            "medium": ["exercise", "gym", "wellness", "therapy"],
-            "weak": ["health", "fitness", "diet"]
-        }
-        # Add more categories as needed
-    }
+    tier_matches = _count_confidence_indicators(content.lower())
+    length_norm = max(1, len(content.split()) / 20)
     
     for category in categories:
-        if category in category_indicators:
-            indicators = category_indicators[category]
-            
-            # Count weighted matches
-            strong_matches = sum(1 for word in indicators["strong"] if word in content_lower)
-            medium_matches = sum(1 for word in indicators["medium"] if word in content_lower)
-            weak_matches = sum(1 for word in indicators["weak"] if word in content_lower)
+        if category in _CONFIDENCE_INDICATORS:
+            if category not in tier_matches:
+                # No indicator hits: weak evidence with a zero score is just its base
+                confidence_scores[category] = _CONFIDENCE_LEVELS[2][1]
+                continue
+            strong_matches, medium_matches, weak_matches = tier_matches[category]
             
-            # Calculate weighted score
+            # Calculate weighted score, normalized by content length
             weighted_score = (strong_matches * 3 + medium_matches * 2 + weak_matches * 1)
+            normalized_score = min(1.0, weighted_score / length_norm)
             
-            # Normalize by content length and apply base confidence
-            normalized_score = min(1.0, weighted_score / max(1, content_length / 20))
-            # More realistic confidence calculation
+            # Evidence level picks the (cap, base) pair: strong, good or weak evidence
             if strong_matches >= 2:
-                confidence = min(0.80, 0.45 + normalized_score * 0.35)  # Strong evidence: max 80%
+                cap, base = _CONFIDENCE_LEVELS[0]
             elif strong_matches >= 1 or medium_matches >= 3:
-                confidence = min(0.70, 0.35 + normalized_score * 0.35)  # Good evidence: max 70%
+                cap, base = _CONFIDENCE_LEVELS[1]
             else:
-                confidence = min(0.60, 0.25 + normalized_score * 0.35)  # Weak evidence: max 60%
+                cap, base = _CONFIDENCE_LEVELS[2]
+            confidence = min(cap, base + normalized_score * 0.35)
             
         else:
             # Default confidence for unknown categories
@@ -951,28 +1840,78 @@ def get_category_confidence(content: str, categories: List[str]) -> Dict[str, fl
     return confidence_scores
 
 
+def _count_confidence_indicators(content_lower: str) -> Dict[str, List[int]]:
+    """
+    Count the distinct strong/medium/weak indicator keywords present per category.
+    """
+    if _CONFIDENCE_AUTOMATON is not None:
+        # One linear pass over the content finds every indicator at once
+        present = {keyword for _, keyword in _CONFIDENCE_AUTOMATON.iter(content_lower)}
+    else:
+        present = {keyword for keyword in _CONFIDENCE_KEYWORDS if keyword in content_lower}
+    
+    tier_matches: Dict[str, List[int]] = {}
+    for keyword in present:
+        for category, tier in _CONFIDENCE_KEYWORDS[keyword]:
+            tier_matches.setdefault(category, [0, 0, 0])[tier] += 1
+    return tier_matches
+
+
 def enhance_categories_with_context(categories: List[str], user_context: Dict[str, Any]) -> List[str]:
     """
     Enhanced categorization with user context, time, and historical patterns.
     """
-    enhanced = categories.copy()
-    current_time = user_context.get("current_time", datetime.now())
+    in_work_window, is_weekend = _time_window(user_context)
+    return _enhance_with_time_window(categories, user_context, in_work_window, is_weekend)
+
+
+def batch_enhance_categories(category_lists: List[List[str]], user_context: Dict[str, Any]) -> List[List[str]]:
+    """
+    Apply enhance_categories_with_context to many category lists sharing one context.
+    The time-window decision is made once for the whole batch.
+    """
+    in_work_window, is_weekend = _time_window(user_context)
+    return [
+        _enhance_with_time_window(categories, user_context, in_work_window, is_weekend)
+        for categories in category_lists
+    ]
+
+
+def _time_window(user_context: Dict[str, Any]) -> Tuple[bool, bool]:
+    """
+    Decide whether the context's time falls in work hours and on a weekend.
+    The clock is only read when the caller did not supply current_time.
+    """
+    current_time = user_context.get("current_time")
+    if current_time is None:
+        current_time = datetime.now()
     
     # Time-based enhancements
     hour = current_time.hour
     day_of_week = current_time.weekday()  # 0=Monday, 6=Sunday
     
     # Work hours context
+    in_work_window = False
     if user_context.get("work_hours"):
         work_start = user_context["work_hours"].get("start", 9)
         work_end = user_context["work_hours"].get("end", 17)
-        
-        if work_start <= hour <= work_end and day_of_week < 5:  # Weekdays
-            if "work" not in enhanced and any(cat in ["communication", "scheduling"] for cat in enhanced):
-                enhanced.append("work")
+        in_work_window = work_start <= hour <= work_end and day_of_week < 5  # Weekdays
+    
+    return in_work_window, day_of_week >= 5
+
+
+def _enhance_with_time_window(categories: List[str], user_context: Dict[str, Any], in_work_window: bool, is_weekend: bool) -> List[str]:
+    """
+    Apply the time, weekend and history rules for an already computed time window.
+    """
+    enhanced = categories.copy()
+    
+    if in_work_window:
+        if "work" not in enhanced and any(cat in ["communication", "scheduling"] for cat in enhanced):
+            enhanced.append("work")
     
     # Weekend context
-    if day_of_week >= 5:  # Weekend
+    if is_weekend:
         if "personal" not in enhanced and "entertainment" in enhanced:
             enhanced.insert(0, "personal")
     
@@ -984,14 +1923,7 @@ def enhance_categories_with_context(categories: List[str], user_context: Dict[st
                 enhanced.append(freq_cat)
     
     # Remove duplicates while preserving order
-    seen = set()
-    result = []
-    for cat in enhanced:
-        if cat not in seen:
-            seen.add(cat)
-            result.append(cat)
-    
-    return result[:5]  # Limit to top 5 categories
+    return list(dict.fromkeys(enhanced))[:5]  # Limit to top 5 categories
 
 
 # Removed duplicate synchronous categorize_with_ollama function  
@@ -1006,6 +1938,7 @@ def enhance_categories_with_context(categories: List[str], user_context: Dict[st
 # Removed duplicate synchronous categorize_with_huggingface function  
 # Using only the async version defined earlier
 
+@_cached_provider_call("openai_chat")
 def categorize_with_openai_chat(content: str, api_key: str) -> List[str]:
     """
     Categorize content using OpenAI's Chat API (GPT-3.5-turbo).
@@ -1054,13 +1987,7 @@ Respond ONLY with category names separated by commas. No explanations."""
             categories = [cat.strip().lower() for cat in categories_text.split(',') if cat.strip()]
             
             # Validate categories are from our allowed list
-            valid_categories = [
-                'work', 'personal', 'finance', 'health', 'education', 'shopping', 
-                'travel', 'entertainment', 'social', 'communication', 'scheduling', 
-                'documentation', 'general', 'uncategorized'
-            ]
-            
-            filtered_categories = [cat for cat in categories if cat in valid_categories]
+            filtered_categories = [cat for cat in categories if cat in _OPENAI_CATEGORIES]
             
             return filtered_categories[:3] if filtered_categories else ["general"]
         else:
@@ -1092,71 +2019,3 @@ def categorize_with_openai(content: str, api_key: Optional[str] = None) -> List[
     
     # Use the new Chat API method
     return categorize_with_openai_chat(content, api_key)
-
-
-def get_category_confidence(content: str, categories: List[str]) -> Dict[str, float]:
-    """
-    Calculate confidence scores for each category.
-    
-    Args:
-        content: Original text content
-        categories: List of assigned categories
-        
-    Returns:
-        Dict mapping categories to confidence scores (0.0 to 1.0)
-    """
-    confidence_scores = {}
-    content_lower = content.lower()
-    
-    for category in categories:
-        # Simple confidence calculation based on keyword density
-        category_keywords = {
-            "work": ["meeting", "deadline", "project", "office", "colleague"],
-            "finance": ["money", "payment", "invoice", "budget", "expense"],
-            "health": ["doctor", "appointment", "medication", "exercise"],
-            # Add more as needed
-        }
-        
-        keywords = category_keywords.get(category, [])
-        if keywords:
-            matches = sum(1 for keyword in keywords if keyword in content_lower)
-            confidence = min(1.0, matches / len(keywords) + 0.3)  # Base confidence of 0.3
-        else:
-            confidence = 0.5  # Default confidence for unknown categories
-            
-        confidence_scores[category] = confidence
-    
-    return confidence_scores
-
-
-def enhance_categories_with_context(categories: List[str], user_context: Dict[str, Any]) -> List[str]:
-    """
-    Enhance categorization with user context and history.
-    
-    Args:
-        categories: Initial categories
-        user_context: User's historical data and preferences
-        
-    Returns:
-        Enhanced category list
-    """
-    enhanced = categories.copy()
-    
-    # Add context-based enhancements
-    if user_context.get("work_hours") and "work" not in enhanced:
-        current_hour = user_context.get("current_hour", 12)
-        work_start = user_context.get("work_hours", {}).get("start", 9)
-        work_end = user_context.get("work_hours", {}).get("end", 17)
-        
-        if work_start <= current_hour <= work_end:
-            enhanced.append("work")
-    
-    # Remove duplicates while preserving order
-    seen = set()
-    result = []
-    for cat in enhanced:
-        if cat not in seen:
-            seen.add(cat)
-            result.append(cat)
-    
-    return result[:5]  # Limit to top 5 categories
@@ -5,6 +5,7 @@ Advanced content classification and categorization functions.
 Open-source contribution for intelligent data organization.
 """
 
+import os
 import re
 import json
 import hashlib
@@ -12,6 +13,17 @@ from typing import Dict, List, Any, Optional, Tuple, Set
 from datetime import datetime, timezone
 from enum import Enum
 from collections import Counter
+from functools import lru_cache
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
 
 
 class ContentCategory(str, Enum):
@@ -46,6 +58,226 @@ class Priority(str, Enum):
     NONE = "none"
 
 
+# Category patterns with weights
+_CATEGORY_PATTERNS = {
+    ContentCategory.WORK: {
+        "keywords": ["meeting", "project", "deadline", "office", "team", "manager", "colleague", 
+                    "conference", "presentation", "report", "budget", "client", "customer"],
+        "domains": ["@company", "@corp", "@inc", "@ltd", "@llc"],
+        "weight": 1.0
+    },
+    ContentCategory.FINANCIAL: {
+        "keywords": ["invoice", "payment", "bill", "bank", "credit", "debit", "transaction", 
+                    "balance", "statement", "tax", "receipt", "refund", "charge"],
+        "domains": ["@bank", "@paypal", "@stripe", "@visa", "@mastercard"],
+        "weight": 1.2
+    },
+    ContentCategory.HEALTH: {
+        "keywords": ["doctor", "appointment", "medical", "health", "prescription", "clinic", 
+                    "hospital", "insurance", "diagnosis", "treatment", "medication"],
+        "domains": ["@health", "@medical", "@hospital", "@clinic"],
+        "weight": 1.1
+    },
+    ContentCategory.TRAVEL: {
+        "keywords": ["flight", "hotel", "booking", "reservation", "trip", "vacation", 
+                    "airline", "airport", "destination", "itinerary", "luggage"],
+        "domains": ["@airline", "@hotel", "@booking", "@expedia", "@airbnb"],
+        "weight": 1.0
+    },
+    ContentCategory.SHOPPING: {
+        "keywords": ["order", "purchase", "shipping", "delivery", "cart", "checkout", 
+                    "product", "item", "sale", "discount", "coupon", "store"],
+        "domains": ["@amazon", "@shop", "@store", "@retail", "@ecommerce"],
+        "weight": 1.0
+    },
+    ContentCategory.EDUCATION: {
+        "keywords": ["course", "class", "student", "teacher", "grade", "assignment", 
+                    "homework", "exam", "university", "college", "school", "learning"],
+        "domains": ["@edu", "@university", "@college", "@school"],
+        "weight": 1.0
+    },
+    ContentCategory.ENTERTAINMENT: {
+        "keywords": ["movie", "music", "game", "show", "concert", "event", "ticket", 
+                    "streaming", "netflix", "spotify", "entertainment", "fun"],
+        "domains": ["@netflix", "@spotify", "@youtube", "@entertainment"],
+        "weight": 0.8
+    },
+    ContentCategory.SOCIAL: {
+        "keywords": ["friend", "family", "party", "birthday", "anniversary", "celebration", 
+                    "social", "gathering", "invitation", "wedding", "dinner"],
+        "domains": ["@facebook", "@twitter", "@instagram", "@social"],
+        "weight": 0.9
+    },
+    ContentCategory.SPAM: {
+        "keywords": ["free", "winner", "prize", "urgent", "limited time", "click here", 
+                    "congratulations", "offer", "deal", "promotion", "lottery"],
+        "domains": [],
+        "weight": 0.7
+    }
+}
+
+# Priority indicators, most urgent first
+_PRIORITY_INDICATORS = {
+    Priority.URGENT: {
+        "keywords": ["urgent", "emergency", "critical", "asap", "immediate", "now", 
+                    "crisis", "alert", "deadline today", "overdue"],
+        "weight": 1.0
+    },
+    Priority.HIGH: {
+        "keywords": ["important", "priority", "deadline", "soon", "tomorrow", 
+                    "high priority", "needs attention", "action required"],
+        "weight": 0.8
+    },
+    Priority.MEDIUM: {
+        "keywords": ["meeting", "appointment", "reminder", "follow up", "review", 
+                    "update", "scheduled"],
+        "weight": 0.6
+    },
+    Priority.LOW: {
+        "keywords": ["fyi", "information", "newsletter", "update", "notification", 
+                    "optional", "when convenient"],
+        "weight": 0.4
+    }
+}
+
+# Email type -> keywords that mark it
+_EMAIL_TYPES = {
+    "newsletter": ["newsletter", "unsubscribe", "update", "digest"],
+    "notification": ["notification", "alert", "reminder", "automated"],
+    "reply": ["re:", "reply", "response"],
+    "forward": ["fwd:", "forward", "forwarded"],
+    "invitation": ["invitation", "invite", "rsvp", "meeting request"],
+    "receipt": ["receipt", "confirmation", "order", "purchase"],
+    "marketing": ["offer", "sale", "promotion", "deal", "discount"],
+    "automated": ["noreply", "no-reply", "donotreply", "automated"]
+}
+
+# Keyword sets per email type, so types with no keyword present are skipped outright
+_EMAIL_TYPE_KEYWORD_SETS = {email_type: frozenset(keywords) for email_type, keywords in _EMAIL_TYPES.items()}
+
+# Emphasis or an explicit prefix that makes content urgent regardless of other indicators
+_URGENT_MARKERS = ("!!!", "urgent:", "emergency:", "critical:")
+
+
+def _keyword_score_table(weight: float, size: int) -> Tuple[float, ...]:
+    """Score for 0..size keyword hits, summed one weight at a time like the original loop"""
+    scores = [0.0]
+    for _ in range(size):
+        scores.append(scores[-1] + weight)
+    return tuple(scores)
+
+
+# Scoring rows in table order: (bucket, keywords, keyword set, weight, score by hit count, ...).
+# The keyword set skips buckets with no keyword present, the score table replaces an
+# accumulation loop, and plain tuples keep enum hashing out of the scoring loops.
+_CATEGORY_RULES = tuple(
+    (category, tuple(patterns["keywords"]), frozenset(patterns["keywords"]), patterns["weight"],
+     _keyword_score_table(patterns["weight"], len(patterns["keywords"])), tuple(patterns["domains"]))
+    for category, patterns in _CATEGORY_PATTERNS.items()
+)
+_PRIORITY_RULES = tuple(
+    (priority, tuple(indicators["keywords"]), frozenset(indicators["keywords"]), indicators["weight"],
+     _keyword_score_table(indicators["weight"], len(indicators["keywords"])))
+    for priority, indicators in _PRIORITY_INDICATORS.items()
+)
+
+# Every keyword above in one automaton, so each text is scanned once for all of them
+_ALL_KEYWORDS = frozenset(
+    [keyword for patterns in _CATEGORY_PATTERNS.values() for keyword in patterns["keywords"]]
+    + [keyword for indicators in _PRIORITY_INDICATORS.values() for keyword in indicators["keywords"]]
+    + [keyword for keywords in _EMAIL_TYPES.values() for keyword in keywords]
+)
+
+_KEYWORD_AUTOMATON = None
+if ahocorasick is not None:
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in _ALL_KEYWORDS:
+        _KEYWORD_AUTOMATON.add_word(_keyword, _keyword)
+    _KEYWORD_AUTOMATON.make_automaton()
+
+
+# Common stop words to filter out of extracted keywords
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'will',
+    'would', 'could', 'should', 'this', 'that', 'these', 'those', 'i', 'you', 'he',
+    'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his',
+    'its', 'our', 'their', 'from', 'up', 'about', 'into', 'over', 'after'
+})
+
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+# Entity patterns
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+# Phone (various formats)
+_PHONE_RE = re.compile(r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b')
+_URL_RE = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+# Dates (simple); kept as separate scans since a month-day match may overlap a numeric date
+_DATE_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'\b(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b',
+    r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',
+    r'\b(?:january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2}\b'
+))
+# Numbers (excluding years and common codes)
+_NUMBER_RE = re.compile(r'\b(?!19\d{2}|20\d{2})\d{3,}\b')
+
+_SENTENCE_END_RE = re.compile(r'[.!?]+')
+
+# Prefilters: every date but a weekday needs a digit, phones and numbers a run of three
+_DIGIT_RE = re.compile(r'\d')
+_DIGIT_RUN_RE = re.compile(r'\d{3}')
+
+
+# Memoized results per (content, subject, sender); inbox rescans repeat the same emails
+_CLASSIFICATION_CACHE_SIZE = 4096
+
+
+def clear_classification_cache() -> None:
+    """Drop memoized keyword, category and priority results"""
+    _extract_keywords_cached.cache_clear()
+    _classify_content_category_cached.cache_clear()
+    _determine_priority_cached.cache_clear()
+
+
+def _find_keywords(text: str) -> Set[str]:
+    """
+    Return the classification keywords that occur anywhere in text.
+    """
+    if _KEYWORD_AUTOMATON is not None:
+        # One left-to-right pass reports every keyword occurrence
+        return {keyword for _, keyword in _KEYWORD_AUTOMATON.iter(text)}
+    return {keyword for keyword in _ALL_KEYWORDS if keyword in text}
+
+
+# Fingerprint of every rule table and pattern; persisted results from other rules are ignored
+_CLASSIFIER_VERSION = hashlib.sha256(repr((
+    _CATEGORY_PATTERNS, _PRIORITY_INDICATORS, _EMAIL_TYPES, sorted(_STOP_WORDS),
+    [regex.pattern for regex in (_EMAIL_RE, _PHONE_RE, _URL_RE, *_DATE_RES, _NUMBER_RE, _PUNCT_RE)]
+)).encode()).hexdigest()
+
+# Opt-in persistent cache for analyze() across runs, e.g. repeated evaluation over the
+# same mailbox. Results include extracted entities, so point it at a private directory.
+_ANALYSIS_CACHE_TTL_SECONDS = 24 * 60 * 60
+_analysis_disk_cache = None
+if diskcache is not None and os.getenv("CLASSIFICATION_CACHE_DIR"):
+    _analysis_disk_cache = diskcache.Cache(os.getenv("CLASSIFICATION_CACHE_DIR"))
+
+
+def _find_keywords_with_prefix(text: str, prefix_end: int) -> Tuple[Set[str], Set[str]]:
+    """
+    Return the keywords in text and those lying wholly within text[:prefix_end].
+    """
+    if _KEYWORD_AUTOMATON is not None:
+        # Matches ending inside the prefix are exactly the prefix's matches
+        present, prefix_present = set(), set()
+        for end, keyword in _KEYWORD_AUTOMATON.iter(text):
+            present.add(keyword)
+            if end < prefix_end:
+                prefix_present.add(keyword)
+        return present, prefix_present
+    return _find_keywords(text), _find_keywords(text[:prefix_end])
+
+
 def extract_keywords(content: str, max_keywords: int = 10) -> List[str]:
     """
     Extract relevant keywords from content for classification.
@@ -64,28 +296,25 @@ def extract_keywords(content: str, max_keywords: int = 10) -> List[str]:
     if not content or not isinstance(content, str):
         return []
     
+    return list(_extract_keywords_cached(content, max_keywords))
+
+
+@lru_cache(maxsize=_CLASSIFICATION_CACHE_SIZE)
+def _extract_keywords_cached(content: str, max_keywords: int) -> Tuple[str, ...]:
+    """Memoized keyword extraction; returns a tuple so the cached entry can't be mutated"""
     # Clean and normalize text
-    text = re.sub(r'[^\w\s]', ' ', content.lower())
+    text = _PUNCT_RE.sub(' ', content.lower())
     words = text.split()
     
-    # Common stop words to filter out
-    stop_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-        'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'will',
-        'would', 'could', 'should', 'this', 'that', 'these', 'those', 'i', 'you', 'he',
-        'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his',
-        'its', 'our', 'their', 'from', 'up', 'about', 'into', 'over', 'after'
-    }
-    
     # Filter meaningful words (length > 2, not stop words, not numbers)
     meaningful_words = [
         word for word in words 
-        if len(word) > 2 and word not in stop_words and not word.isdigit()
+        if len(word) > 2 and word not in _STOP_WORDS and not word.isdigit()
     ]
     
     # Count word frequency and return top keywords
     word_counts = Counter(meaningful_words)
-    return [word for word, _ in word_counts.most_common(max_keywords)]
+    return tuple(word for word, _ in word_counts.most_common(max_keywords))
 
 
 def classify_content_category(content: str, subject: str = "", sender: str = "") -> Dict[str, Any]:
@@ -104,6 +333,14 @@ def classify_content_category(content: str, subject: str = "", sender: str = "")
         >>> classify_content_category("Invoice #123 for services", "Payment Due")
         {"category": "financial", "confidence": 0.9, "keywords": ["invoice", "payment"]}
     """
+    result = _classify_content_category_cached(content, subject, sender)
+    # Copy so callers can't mutate the cached entry
+    return {**result, "keywords": list(result["keywords"])}
+
+
+@lru_cache(maxsize=_CLASSIFICATION_CACHE_SIZE)
+def _classify_content_category_cached(content: str, subject: str, sender: str) -> Dict[str, Any]:
+    """Memoized category classification, repeated emails skip the keyword scan"""
     if not content:
         return {
             "category": ContentCategory.UNKNOWN,
@@ -114,112 +351,82 @@ def classify_content_category(content: str, subject: str = "", sender: str = "")
     
     # Combine all text for analysis
     full_text = f"{subject} {content} {sender}".lower()
-    keywords = extract_keywords(full_text)
-    
-    # Define category patterns with weights
-    category_patterns = {
-        ContentCategory.WORK: {
-            "keywords": ["meeting", "project", "deadline", "office", "team", "manager", "colleague", 
-                        "conference", "presentation", "report", "budget", "client", "customer"],
-            "domains": ["@company", "@corp", "@inc", "@ltd", "@llc"],
-            "weight": 1.0
-        },
-        ContentCategory.FINANCIAL: {
-            "keywords": ["invoice", "payment", "bill", "bank", "credit", "debit", "transaction", 
-                        "balance", "statement", "tax", "receipt", "refund", "charge"],
-            "domains": ["@bank", "@paypal", "@stripe", "@visa", "@mastercard"],
-            "weight": 1.2
-        },
-        ContentCategory.HEALTH: {
-            "keywords": ["doctor", "appointment", "medical", "health", "prescription", "clinic", 
-                        "hospital", "insurance", "diagnosis", "treatment", "medication"],
-            "domains": ["@health", "@medical", "@hospital", "@clinic"],
-            "weight": 1.1
-        },
-        ContentCategory.TRAVEL: {
-            "keywords": ["flight", "hotel", "booking", "reservation", "trip", "vacation", 
-                        "airline", "airport", "destination", "itinerary", "luggage"],
-            "domains": ["@airline", "@hotel", "@booking", "@expedia", "@airbnb"],
-            "weight": 1.0
-        },
-        ContentCategory.SHOPPING: {
-            "keywords": ["order", "purchase", "shipping", "delivery", "cart", "checkout", 
-                        "product", "item", "sale", "discount", "coupon", "store"],
-            "domains": ["@amazon", "@shop", "@store", "@retail", "@ecommerce"],
-            "weight": 1.0
-        },
-        ContentCategory.EDUCATION: {
-            "keywords": ["course", "class", "student", "teacher", "grade", "assignment", 
-                        "homework", "exam", "university", "college", "school", "learning"],
-            "domains": ["@edu", "@university", "@college", "@school"],
-            "weight": 1.0
-        },
-        ContentCategory.ENTERTAINMENT: {
-            "keywords": ["movie", "music", "game", "show", "concert", "event", "ticket", 
-                        "streaming", "netflix", "spotify", "entertainment", "fun"],
-            "domains": ["@netflix", "@spotify", "@youtube", "@entertainment"],
-            "weight": 0.8
-        },
-        ContentCategory.SOCIAL: {
-            "keywords": ["friend", "family", "party", "birthday", "anniversary", "celebration", 
-                        "social", "gathering", "invitation", "wedding", "dinner"],
-            "domains": ["@facebook", "@twitter", "@instagram", "@social"],
-            "weight": 0.9
-        },
-        ContentCategory.SPAM: {
-            "keywords": ["free", "winner", "prize", "urgent", "limited time", "click here", 
-                        "congratulations", "offer", "deal", "promotion", "lottery"],
-            "domains": [],
-            "weight": 0.7
-        }
-    }
-    
-    # Calculate scores for each category
-    category_scores = {}
+    return _categorize_text(full_text, sender.lower(), _find_keywords(full_text))
+
+
+def _categorize_text(full_text: str, sender_lower: str, present: Set[str], keywords: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Score the categories for lowercased text given the keywords present in it.
+    Extracted keywords are only needed for the no-match fallback, so they are
+    computed then unless the caller already has them.
+    """
+    # Score each category, keeping the first best one as we go
+    best_category, best_score, best_keywords = None, 0.0, []
     
-    for category, patterns in category_patterns.items():
-        score = 0.0
-        matched_keywords = []
-        
+    for category, category_keywords, keyword_set, weight, keyword_scores, domains in _CATEGORY_RULES:
         # Check keyword matches
-        for keyword in patterns["keywords"]:
-            if keyword in full_text:
-                score += patterns["weight"]
-                matched_keywords.append(keyword)
+        if present.isdisjoint(keyword_set):
+            matched_keywords = []
+        else:
+            matched_keywords = [keyword for keyword in category_keywords if keyword in present]
+        score = keyword_scores[len(matched_keywords)]
         
         # Check domain matches
-        for domain in patterns["domains"]:
-            if domain in sender.lower():
-                score += patterns["weight"] * 2  # Domain matches are stronger indicators
+        for domain in domains:
+            if domain in sender_lower:
+                score += weight * 2  # Domain matches are stronger indicators
         
-        category_scores[category] = {
-            "score": score,
-            "keywords": matched_keywords
-        }
+        if score > best_score:
+            best_category, best_score, best_keywords = category, score, matched_keywords
     
-    # Find best match
-    if not any(score["score"] > 0 for score in category_scores.values()):
+    if best_category is None:
         return {
             "category": ContentCategory.PERSONAL,  # Default fallback
             "confidence": 0.3,
-            "keywords": keywords[:5],
+            "keywords": (extract_keywords(full_text) if keywords is None else keywords)[:5],
             "reasoning": "No specific patterns matched, defaulting to personal"
         }
     
-    best_category = max(category_scores.keys(), key=lambda k: category_scores[k]["score"])
-    max_score = category_scores[best_category]["score"]
-    
     # Calculate confidence (normalize score)
-    confidence = min(1.0, max_score / 5.0)  # Assuming max reasonable score is 5
+    confidence = min(1.0, best_score / 5.0)  # Assuming max reasonable score is 5
     
     return {
         "category": best_category,
         "confidence": round(confidence, 2),
-        "keywords": category_scores[best_category]["keywords"],
-        "reasoning": f"Matched {len(category_scores[best_category]['keywords'])} relevant keywords"
+        "keywords": best_keywords,
+        "reasoning": f"Matched {len(best_keywords)} relevant keywords"
     }
 
 
+def classify_batch(contents: List[str], subjects: List[str] = None, senders: List[str] = None) -> List[Dict[str, Any]]:
+    """
+    Classify many items at once, in input order.
+    
+    Identical (content, subject, sender) triples in the batch are classified once.
+    
+    Args:
+        contents: Contents to classify
+        subjects: Subject lines aligned with contents (optional)
+        senders: Sender information aligned with contents (optional)
+        
+    Returns:
+        List of classification dicts as returned by classify_content_category
+    """
+    subjects = subjects or [""] * len(contents)
+    senders = senders or [""] * len(contents)
+    
+    results = {}
+    for item in zip(contents, subjects, senders):
+        if item not in results:
+            results[item] = _classify_content_category_cached(*item)
+    
+    # Copy per item so callers can't mutate shared or cached entries
+    return [
+        {**results[item], "keywords": list(results[item]["keywords"])}
+        for item in zip(contents, subjects, senders)
+    ]
+
+
 def determine_priority(content: str, subject: str = "", urgency_keywords: List[str] = None) -> Dict[str, Any]:
     """
     Determine content priority based on urgency indicators.
@@ -236,64 +443,51 @@ def determine_priority(content: str, subject: str = "", urgency_keywords: List[s
         >>> determine_priority("URGENT: System down", "Critical Alert")
         {"priority": "urgent", "confidence": 0.95, "indicators": ["urgent", "critical"]}
     """
-    if urgency_keywords is None:
-        urgency_keywords = []
-    
+    result = _determine_priority_cached(content, subject, tuple(urgency_keywords or ()))
+    # Copy so callers can't mutate the cached entry
+    return {**result, "indicators": list(result["indicators"])}
+
+
+@lru_cache(maxsize=_CLASSIFICATION_CACHE_SIZE)
+def _determine_priority_cached(content: str, subject: str, urgency_keywords: Tuple[str, ...]) -> Dict[str, Any]:
+    """Memoized priority scoring; urgency keywords arrive as a hashable tuple"""
     full_text = f"{subject} {content}".lower()
-    
-    # Define priority indicators
-    priority_indicators = {
-        Priority.URGENT: {
-            "keywords": ["urgent", "emergency", "critical", "asap", "immediate", "now", 
-                        "crisis", "alert", "deadline today", "overdue"],
-            "weight": 1.0
-        },
-        Priority.HIGH: {
-            "keywords": ["important", "priority", "deadline", "soon", "tomorrow", 
-                        "high priority", "needs attention", "action required"],
-            "weight": 0.8
-        },
-        Priority.MEDIUM: {
-            "keywords": ["meeting", "appointment", "reminder", "follow up", "review", 
-                        "update", "scheduled"],
-            "weight": 0.6
-        },
-        Priority.LOW: {
-            "keywords": ["fyi", "information", "newsletter", "update", "notification", 
-                        "optional", "when convenient"],
-            "weight": 0.4
-        }
-    }
-    
-    # Add custom urgency keywords to urgent category
-    if urgency_keywords:
-        priority_indicators[Priority.URGENT]["keywords"].extend(urgency_keywords)
-    
-    # Calculate priority scores
-    priority_scores = {}
-    for priority, indicators in priority_indicators.items():
-        score = 0.0
-        matched_indicators = []
+    return _prioritize_text(full_text, _find_keywords(full_text), urgency_keywords)
+
+
+def _prioritize_text(full_text: str, present: Set[str], urgency_keywords: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    Score the priority levels for lowercased text given the keywords present in it.
+    """
+    # An explicit urgent marker settles the priority, so only the URGENT rule is scored
+    has_urgent_marker = any(marker in full_text for marker in _URGENT_MARKERS)
+    rules = _PRIORITY_RULES[:1] if has_urgent_marker else _PRIORITY_RULES
+    
+    # Score each priority, keeping the first best one as we go
+    best_priority, best_score, best_indicators = None, 0.0, []
+    for priority, priority_keywords, keyword_set, weight, keyword_scores in rules:
+        if present.isdisjoint(keyword_set):
+            matched_indicators = []
+        else:
+            matched_indicators = [keyword for keyword in priority_keywords if keyword in present]
+        score = keyword_scores[len(matched_indicators)]
         
-        for keyword in indicators["keywords"]:
-            if keyword in full_text:
-                score += indicators["weight"]
-                matched_indicators.append(keyword)
+        if priority is Priority.URGENT:
+            # Custom urgency keywords aren't in the automaton, so check them directly
+            for keyword in urgency_keywords:
+                if keyword in full_text:
+                    score += weight
+                    matched_indicators.append(keyword)
+            
+            # Special case for urgent detection
+            if has_urgent_marker:
+                score += 2.0
+                matched_indicators.append("punctuation_emphasis")
         
-        priority_scores[priority] = {
-            "score": score,
-            "indicators": matched_indicators
-        }
-    
-    # Special cases for urgent detection
-    if any(word in full_text for word in ["!!!", "urgent:", "emergency:", "critical:"]):
-        priority_scores[Priority.URGENT]["score"] += 2.0
-        priority_scores[Priority.URGENT]["indicators"].append("punctuation_emphasis")
+        if score > best_score:
+            best_priority, best_score, best_indicators = priority, score, matched_indicators
     
-    # Find highest priority with matches
-    priorities_with_matches = {p: s for p, s in priority_scores.items() if s["score"] > 0}
-    
-    if not priorities_with_matches:
+    if best_priority is None:
         return {
             "priority": Priority.NONE,
             "confidence": 0.5,
@@ -301,17 +495,14 @@ def determine_priority(content: str, subject: str = "", urgency_keywords: List[s
             "reasoning": "No priority indicators found"
         }
     
-    best_priority = max(priorities_with_matches.keys(), key=lambda p: priorities_with_matches[p]["score"])
-    max_score = priorities_with_matches[best_priority]["score"]
-    
     # Calculate confidence
-    confidence = min(1.0, max_score / 3.0)  # Normalize to reasonable scale
+    confidence = min(1.0, best_score / 3.0)  # Normalize to reasonable scale
     
     return {
         "priority": best_priority,
         "confidence": round(confidence, 2),
-        "indicators": priority_scores[best_priority]["indicators"],
-        "reasoning": f"Found {len(priority_scores[best_priority]['indicators'])} priority indicators"
+        "indicators": best_indicators,
+        "reasoning": f"Found {len(best_indicators)} priority indicators"
     }
 
 
@@ -340,36 +531,33 @@ def extract_entities(content: str) -> Dict[str, List[str]]:
         "numbers": []
     }
     
-    # Email pattern
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    entities["emails"] = re.findall(email_pattern, content)
-    
-    # Phone pattern (various formats)
-    phone_pattern = r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b'
-    entities["phones"] = re.findall(phone_pattern, content)
-    
-    # URL pattern
-    url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-    entities["urls"] = re.findall(url_pattern, content)
-    
-    # Date patterns (simple)
-    date_patterns = [
-        r'\b(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b',
-        r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',
-        r'\b(?:january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2}\b'
-    ]
-    
-    for pattern in date_patterns:
-        entities["dates"].extend(re.findall(pattern, content, re.IGNORECASE))
-    
-    # Number pattern (excluding years and common codes)
-    number_pattern = r'\b(?!19\d{2}|20\d{2})\d{3,}\b'
-    entities["numbers"] = re.findall(number_pattern, content)
+    # Cheap necessary conditions skip the patterns that can't match; most
+    # content has no email address, URL or run of digits at all
+    first_digit = _DIGIT_RE.search(content)
+    has_digit_run = first_digit is not None and _DIGIT_RUN_RE.search(content, first_digit.start()) is not None
+    
+    if "@" in content:
+        entities["emails"] = _EMAIL_RE.findall(content)
+    if has_digit_run:
+        entities["phones"] = _PHONE_RE.findall(content)
+    if "http" in content:
+        entities["urls"] = _URL_RE.findall(content)
+    
+    # Weekday names all end in "day"; the other date forms need a digit
+    weekday_re, numeric_date_re, month_day_re = _DATE_RES
+    if "day" in content.lower():
+        entities["dates"].extend(weekday_re.findall(content))
+    if first_digit is not None:
+        entities["dates"].extend(numeric_date_re.findall(content))
+        entities["dates"].extend(month_day_re.findall(content))
+    
+    if has_digit_run:
+        entities["numbers"] = _NUMBER_RE.findall(content)
     
     return entities
 
 
-def classify_email_type(subject: str, sender: str, content: str) -> Dict[str, Any]:
+def classify_email_type(subject: str, sender: str, content: str, *, category_result: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     Classify email type based on sender, subject, and content patterns.
     
@@ -377,6 +565,8 @@ def classify_email_type(subject: str, sender: str, content: str) -> Dict[str, An
         subject: Email subject line
         sender: Email sender address/name
         content: Email content
+        category_result: classify_content_category result for this email, if
+            the caller already has one (optional)
         
     Returns:
         Dict with email type classification
@@ -385,27 +575,30 @@ def classify_email_type(subject: str, sender: str, content: str) -> Dict[str, An
         >>> classify_email_type("Re: Meeting", "boss@company.com", "Let's discuss...")
         {"type": "reply", "category": "work", "is_automated": False}
     """
-    email_types = {
-        "newsletter": ["newsletter", "unsubscribe", "update", "digest"],
-        "notification": ["notification", "alert", "reminder", "automated"],
-        "reply": ["re:", "reply", "response"],
-        "forward": ["fwd:", "forward", "forwarded"],
-        "invitation": ["invitation", "invite", "rsvp", "meeting request"],
-        "receipt": ["receipt", "confirmation", "order", "purchase"],
-        "marketing": ["offer", "sale", "promotion", "deal", "discount"],
-        "automated": ["noreply", "no-reply", "donotreply", "automated"]
-    }
-    
-    subject_lower = subject.lower()
-    sender_lower = sender.lower()
-    content_lower = content.lower()
+    full_text = f"{subject} {sender} {content}".lower()
+    primary_type, is_automated, detected_types = _detect_email_type(_find_keywords(full_text), sender.lower())
     
-    full_text = f"{subject_lower} {sender_lower} {content_lower}"
+    # Get category classification unless the caller already did
+    if category_result is None:
+        category_result = classify_content_category(content, subject, sender)
     
+    return {
+        "type": primary_type,
+        "category": category_result["category"],
+        "is_automated": is_automated,
+        "detected_types": detected_types,
+        "confidence": category_result["confidence"]
+    }
+
+
+def _detect_email_type(present: Set[str], sender_lower: str) -> Tuple[str, bool, List[str]]:
+    """
+    Return (primary type, is automated, detected types) given the keywords present.
+    """
     # Detect email type
     detected_types = []
-    for email_type, keywords in email_types.items():
-        if any(keyword in full_text for keyword in keywords):
+    for email_type, keywords in _EMAIL_TYPE_KEYWORD_SETS.items():
+        if not present.isdisjoint(keywords):
             detected_types.append(email_type)
     
     # Determine primary type
@@ -425,15 +618,86 @@ def classify_email_type(subject: str, sender: str, content: str) -> Dict[str, An
         primary_type = "personal"
         is_automated = False
     
-    # Get category classification
-    category_result = classify_content_category(content, subject, sender)
+    return primary_type, is_automated, detected_types
+
+
+def analyze(content: str, subject: str = "", sender: str = "", urgency_keywords: List[str] = None) -> Dict[str, Any]:
+    """
+    Classify an email's category, priority and type and extract its entities and keywords in one go.
+    
+    Gives the same results as calling classify_content_category, determine_priority,
+    classify_email_type, extract_entities and extract_keywords separately, but each
+    part is lowercased once and the category and priority share one keyword scan.
+    
+    Args:
+        content: Email content
+        subject: Email subject line (optional)
+        sender: Email sender address/name (optional)
+        urgency_keywords: Custom urgency keywords (optional)
+        
+    Returns:
+        Dict with category, priority, email_type, entities and keywords results
+        
+    Example:
+        >>> analyze("Invoice attached, payment due tomorrow", "Re: Billing", "billing@bank.com")["priority"]["priority"]
+        "high"
+    """
+    if _analysis_disk_cache is None:
+        return _analyze(content, subject, sender, urgency_keywords)
+    
+    key = _analysis_cache_key(content, subject, sender, urgency_keywords)
+    result = _analysis_disk_cache.get(key)
+    if result is None:
+        result = _analyze(content, subject, sender, urgency_keywords)
+        _analysis_disk_cache.set(key, result, expire=_ANALYSIS_CACHE_TTL_SECONDS)
+    return result
+
+
+def _analysis_cache_key(content: str, subject: str, sender: str, urgency_keywords: Optional[List[str]]) -> str:
+    """Persistent cache key; includes the rule version so edited keyword tables miss"""
+    digest = hashlib.sha256(_CLASSIFIER_VERSION.encode())
+    for part in (subject, sender, content, *(urgency_keywords or ())):
+        # Length-prefix each part so ('ab', 'c') and ('a', 'bc') differ
+        encoded = part.encode("utf-8", "surrogatepass")
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+def _analyze(content: str, subject: str, sender: str, urgency_keywords: Optional[List[str]]) -> Dict[str, Any]:
+    """Uncached body of analyze()"""
+    subject_lower = subject.lower()
+    content_lower = content.lower()
+    sender_lower = sender.lower()
+    
+    # The priority text (subject + content) is a prefix of the category text
+    full_text = f"{subject_lower} {content_lower} {sender_lower}"
+    priority_end = len(subject_lower) + 1 + len(content_lower)
+    present, priority_present = _find_keywords_with_prefix(full_text, priority_end)
+    
+    keywords = extract_keywords(full_text)
+    if content:
+        category_result = _categorize_text(full_text, sender_lower, present, keywords)
+    else:
+        category_result = _classify_content_category_cached(content, subject, sender)
+    priority_result = _prioritize_text(full_text[:priority_end], priority_present, tuple(urgency_keywords or ()))
+    
+    # Email types read subject, sender, content in that order, so matches across part boundaries differ
+    email_text = f"{subject_lower} {sender_lower} {content_lower}"
+    primary_type, is_automated, detected_types = _detect_email_type(_find_keywords(email_text), sender_lower)
     
     return {
-        "type": primary_type,
-        "category": category_result["category"],
-        "is_automated": is_automated,
-        "detected_types": detected_types,
-        "confidence": category_result["confidence"]
+        "category": {**category_result, "keywords": list(category_result["keywords"])},
+        "priority": priority_result,
+        "email_type": {
+            "type": primary_type,
+            "category": category_result["category"],
+            "is_automated": is_automated,
+            "detected_types": detected_types,
+            "confidence": category_result["confidence"]
+        },
+        "entities": extract_entities(content),
+        "keywords": keywords
     }
 
 
@@ -455,19 +719,26 @@ def generate_content_summary(content: str, max_length: int = 150) -> str:
     if not content or len(content) <= max_length:
         return content
     
-    # Simple extractive summarization
-    sentences = re.split(r'[.!?]+', content)
-    sentences = [s.strip() for s in sentences if s.strip()]
+    # Simple extractive summarization: find the first non-empty sentence
+    # without splitting the rest of the content
+    start = 0
+    for boundary in _SENTENCE_END_RE.finditer(content):
+        first_sentence = content[start:boundary.start()].strip()
+        if first_sentence:
+            break
+        start = boundary.end()
+    else:
+        first_sentence = content[start:].strip()
     
-    if not sentences:
+    if not first_sentence:
         return content[:max_length] + "..."
     
-    # Prioritize first and last sentences, or use first sentence if short enough
-    if len(sentences[0]) <= max_length:
-        return sentences[0]
+    # Use first sentence if short enough
+    if len(first_sentence) <= max_length:
+        return first_sentence
     
     # If first sentence is too long, truncate it
-    return sentences[0][:max_length-3] + "..."
+    return first_sentence[:max_length-3] + "..."
 
 
 if __name__ == "__main__":
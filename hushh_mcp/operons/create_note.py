@@ -5,8 +5,81 @@ import uuid
 import time
 import json
 import re
+import copy
 from datetime import datetime
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Predefined tag patterns
+_TAG_PATTERNS = {
+    "meeting": ["meeting", "call", "conference", "discussion"],
+    "idea": ["idea", "concept", "thought", "brainstorm"],
+    "todo": ["todo", "task", "action", "need to", "must do"],
+    "personal": ["personal", "private", "family", "friend"],
+    "work": ["work", "project", "business", "office", "client"],
+    "research": ["research", "study", "analysis", "investigate"],
+    "finance": ["money", "budget", "expense", "income", "financial"],
+    "health": ["health", "medical", "doctor", "exercise", "wellness"],
+    "travel": ["travel", "trip", "vacation", "flight", "hotel"],
+    "learning": ["learn", "course", "tutorial", "education", "skill"]
+}
+# Capitalized words never promoted to tags
+_IGNORED_TAG_WORDS = frozenset(["the", "and", "but", "or", "so", "yet"])
+
+# Common English words for the language heuristic
+_ENGLISH_WORDS = frozenset(['the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'this', 'that'])
+
+# Tone indicators
+_POSITIVE_WORDS = frozenset(['great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'good', 'happy', 'excited'])
+_NEGATIVE_WORDS = frozenset(['bad', 'terrible', 'awful', 'horrible', 'sad', 'angry', 'frustrated', 'disappointed'])
+_URGENT_WORDS = frozenset(['urgent', 'asap', 'immediately', 'emergency', 'critical', 'important'])
+
+# Urgency indicators
+_HIGH_URGENCY_WORDS = frozenset(['urgent', 'asap', 'immediately', 'emergency', 'critical', 'deadline today'])
+_MEDIUM_URGENCY_WORDS = frozenset(['important', 'soon', 'deadline', 'priority', 'quick'])
+
+# Keywords match as substrings, so one automaton pass finds all of them
+_NOTE_KEYWORDS = frozenset(
+    [keyword for keywords in _TAG_PATTERNS.values() for keyword in keywords]
+) | _POSITIVE_WORDS | _NEGATIVE_WORDS | _URGENT_WORDS | _HIGH_URGENCY_WORDS | _MEDIUM_URGENCY_WORDS
+
+_NOTE_KEYWORD_AUTOMATON = None
+if ahocorasick is not None:
+    _NOTE_KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in _NOTE_KEYWORDS:
+        _NOTE_KEYWORD_AUTOMATON.add_word(_keyword, _keyword)
+    _NOTE_KEYWORD_AUTOMATON.make_automaton()
+
+_SENTENCE_END_RE = re.compile(r'[.!?]+')
+_CAPITALIZED_WORD_RE = re.compile(r'\b[A-Z][a-z]+\b')
+
+# Metadata patterns
+_LINK_RE = re.compile(r'https?://')
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RE = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')
+_DATE_RE = re.compile(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b')
+_TIME_RE = re.compile(r'\b\d{1,2}:\d{2}(?:\s?[AaPp][Mm])?\b')
+_MONEY_RE = re.compile(r'\$\d+')
+# Prefilter: phone numbers, dates and times all need a digit
+_DIGIT_RE = re.compile(r'\d')
+
+_URL_RE = re.compile(r'https?://[^\s]+')
+
+# Markdown indicators as one alternation: line-start headers, bullet points,
+# numbered lists and quotes share a single anchor, then inline code, code
+# blocks and links
+_MARKDOWN_RE = re.compile(
+    r'^(?:#+\s|\*\s|\d+\.\s|>)'
+    r'|`[^`]+`|```|\[.*\]\(.*\)',
+    re.MULTILINE
+)
+# Every indicator except a numbered list needs one of these characters
+_MARKDOWN_MARKERS = ('#', '*', '>', '`', '[')
+_NUMBERED_LIST_RE = re.compile(r'^\d+\.\s', re.MULTILINE)
+
 
 def generate_structured_note(
     content: str,
@@ -46,6 +119,9 @@ def generate_structured_note(
     # Structure the content
     structured_content = structure_content(content)
     
+    # Created and updated times start out identical
+    timestamp = time.time_ns() // 1_000_000
+    
     # Create note object
     note = {
         "note_id": note_id,
@@ -55,8 +131,8 @@ def generate_structured_note(
         "tags": tags,
         "category": category,
         "metadata": metadata,
-        "created_at": int(time.time() * 1000),
-        "updated_at": int(time.time() * 1000),
+        "created_at": timestamp,
+        "updated_at": timestamp,
         "word_count": len(content.split()),
         "char_count": len(content),
         "estimated_read_time": calculate_read_time(content),
@@ -70,6 +146,61 @@ def generate_structured_note(
     return note
 
 
+def generate_structured_notes_batch(contents: List[str], category: str = "general") -> List[Dict[str, Any]]:
+    """
+    Generate structured notes for many contents at once, in input order.
+    
+    Titles and tags are auto-generated. Identical contents in the batch are
+    analyzed once, and every note still gets its own ID.
+    
+    Args:
+        contents: Note contents to import
+        category: Category applied to every note
+        
+    Returns:
+        List of note dicts as returned by generate_structured_note
+    """
+    timestamp = time.time_ns() // 1_000_000
+    analyses = {}
+    notes = []
+    
+    for content in contents:
+        if content in analyses:
+            # Copy repeats so notes never share nested lists or dicts
+            analysis = copy.deepcopy(analyses[content])
+        else:
+            analysis = analyses[content] = {
+                "title": auto_generate_title(content),
+                "structured_content": structure_content(content),
+                "tags": auto_generate_tags(content),
+                "metadata": extract_note_metadata(content),
+                "word_count": len(content.split()),
+                "estimated_read_time": calculate_read_time(content),
+                "format": "markdown" if is_markdown_content(content) else "plain_text"
+            }
+        
+        note = {
+            "note_id": f"note_{uuid.uuid4().hex[:8]}",
+            "title": analysis["title"],
+            "content": content,
+            "structured_content": analysis["structured_content"],
+            "tags": analysis["tags"],
+            "category": category,
+            "metadata": analysis["metadata"],
+            "created_at": timestamp,
+            "updated_at": timestamp,
+            "word_count": analysis["word_count"],
+            "char_count": len(content),
+            "estimated_read_time": analysis["estimated_read_time"],
+            "format": analysis["format"]
+        }
+        store_note(note)
+        notes.append(note)
+    
+    print(f"📝 Structured notes created: {len(notes)} ({len(analyses)} unique)")
+    return notes
+
+
 def auto_generate_title(content: str, max_length: int = 50) -> str:
     """
     Auto-generate a title from content.
@@ -77,91 +208,92 @@ def auto_generate_title(content: str, max_length: int = 50) -> str:
     if not content.strip():
         return "Untitled Note"
     
-    # Try to find an obvious title (first line if it looks like a title)
-    lines = content.strip().split('\n')
-    first_line = lines[0].strip()
+    # Try to find an obvious title (first line if it looks like a title),
+    # without splitting the rest of the content into lines
+    first_line, newline, _ = content.strip().partition('\n')
+    first_line = first_line.strip()
     
     # Check if first line looks like a title
     if (len(first_line) < 100 and 
         not first_line.endswith('.') and 
-        len(lines) > 1):
+        newline):
         return first_line[:max_length]
     
-    # Extract first sentence
-    sentences = re.split(r'[.!?]+', content)
-    if sentences:
-        first_sentence = sentences[0].strip()
-        if len(first_sentence) <= max_length:
-            return first_sentence
+    # Extract first sentence, stopping at the first boundary
+    boundary = _SENTENCE_END_RE.search(content)
+    first_sentence = (content[:boundary.start()] if boundary else content).strip()
+    if len(first_sentence) <= max_length:
+        return first_sentence
+    else:
+        # Truncate to word boundary: keep the leading words that, each counted with
+        # one separating space, fit within max_length
+        words = ' '.join(first_sentence.split())
+        if len(words) < max_length:
+            cut = len(words)
         else:
-            # Truncate to word boundary
-            words = first_sentence.split()
-            title_words = []
-            char_count = 0
-            
-            for word in words:
-                if char_count + len(word) + 1 > max_length:
-                    break
-                title_words.append(word)
-                char_count += len(word) + 1
-            
-            return ' '.join(title_words) + '...' if title_words else "Note"
-    
-    return "Note"
+            cut = words.rfind(' ', 0, max(max_length, 0))
+        
+        return words[:cut] + '...' if cut > 0 else "Note"
 
 
 def auto_generate_tags(content: str, max_tags: int = 5) -> List[str]:
     """
     Auto-generate tags from content.
     """
-    tags = []
-    content_lower = content.lower()
-    
-    # Predefined tag patterns
-    tag_patterns = {
-        "meeting": ["meeting", "call", "conference", "discussion"],
-        "idea": ["idea", "concept", "thought", "brainstorm"],
-        "todo": ["todo", "task", "action", "need to", "must do"],
-        "personal": ["personal", "private", "family", "friend"],
-        "work": ["work", "project", "business", "office", "client"],
-        "research": ["research", "study", "analysis", "investigate"],
-        "finance": ["money", "budget", "expense", "income", "financial"],
-        "health": ["health", "medical", "doctor", "exercise", "wellness"],
-        "travel": ["travel", "trip", "vacation", "flight", "hotel"],
-        "learning": ["learn", "course", "tutorial", "education", "skill"]
-    }
+    present = _find_note_keywords(content.lower())
     
     # Check for pattern matches
-    for tag, keywords in tag_patterns.items():
-        if any(keyword in content_lower for keyword in keywords):
-            tags.append(tag)
-    
-    # Extract potential tags from content (capitalized words)
-    capitalized_words = re.findall(r'\b[A-Z][a-z]+\b', content)
-    for word in capitalized_words:
-        if (word.lower() not in ["the", "and", "but", "or", "so", "yet"] and
-            len(word) > 2 and
-            word.lower() not in [t.lower() for t in tags]):
-            tags.append(word.lower())
+    tags = [
+        tag for tag, keywords in _TAG_PATTERNS.items()
+        if any(keyword in present for keyword in keywords)
+    ]
     
     # Limit number of tags
+    if 0 <= max_tags <= len(tags):
+        return tags[:max_tags]
+    
+    # Extract potential tags from content (capitalized words), stopping once the limit is reached
+    seen = set(tags)
+    for match in _CAPITALIZED_WORD_RE.finditer(content):
+        word = match.group().lower()
+        if word not in _IGNORED_TAG_WORDS and len(word) > 2 and word not in seen:
+            tags.append(word)
+            seen.add(word)
+            if len(tags) == max_tags:
+                break
+    
     return tags[:max_tags]
 
 
+def _find_note_keywords(content_lower: str) -> set:
+    """
+    Return the note keywords that occur anywhere in lowercased content.
+    """
+    if _NOTE_KEYWORD_AUTOMATON is not None:
+        return {keyword for _, keyword in _NOTE_KEYWORD_AUTOMATON.iter(content_lower)}
+    return {keyword for keyword in _NOTE_KEYWORDS if keyword in content_lower}
+
+
 def extract_note_metadata(content: str) -> Dict[str, Any]:
     """
     Extract metadata from note content.
     """
+    # Tone and urgency share a single keyword pass
+    present = _find_note_keywords(content.lower())
+    
+    # Cheap necessary-condition checks skip full pattern scans on plain prose
+    has_digits = _DIGIT_RE.search(content) is not None
+    
     metadata = {
-        "has_links": bool(re.search(r'https?://', content)),
-        "has_emails": bool(re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', content)),
-        "has_phone_numbers": bool(re.search(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', content)),
-        "has_dates": bool(re.search(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b', content)),
-        "has_times": bool(re.search(r'\b\d{1,2}:\d{2}(?:\s?[AaPp][Mm])?\b', content)),
-        "has_money": bool(re.search(r'\$\d+', content)),
+        "has_links": bool(_LINK_RE.search(content)),
+        "has_emails": '@' in content and bool(_EMAIL_RE.search(content)),
+        "has_phone_numbers": has_digits and bool(_PHONE_RE.search(content)),
+        "has_dates": has_digits and bool(_DATE_RE.search(content)),
+        "has_times": has_digits and ':' in content and bool(_TIME_RE.search(content)),
+        "has_money": '$' in content and bool(_MONEY_RE.search(content)),
         "language": detect_language(content),
-        "tone": detect_tone(content),
-        "urgency": detect_urgency(content)
+        "tone": _tone_from_keywords(present),
+        "urgency": _urgency_from_keywords(present)
     }
     
     return metadata
@@ -171,65 +303,72 @@ def structure_content(content: str) -> Dict[str, Any]:
     """
     Structure content into logical sections.
     """
-    structured = {
-        "sections": [],
-        "bullet_points": [],
-        "numbered_lists": [],
-        "quotes": [],
-        "code_blocks": [],
-        "links": []
-    }
+    sections = []
+    bullet_points = []
+    numbered_lists = []
+    quotes = []
+    code_blocks = []
     
-    lines = content.split('\n')
-    current_section = None
+    # Lines following a header go straight into that section's content list
+    section_lines = None
     
-    for line in lines:
+    for line in content.split('\n'):
         line = line.strip()
         if not line:
             continue
         
         # Detect section headers
-        if line.startswith('#') or (len(line) < 50 and ':' in line):
-            if current_section:
-                structured["sections"].append(current_section)
-            current_section = {
+        if line[0] == '#' or (len(line) < 50 and ':' in line):
+            section_lines = []
+            sections.append({
                 "header": line,
-                "content": []
-            }
+                "content": section_lines
+            })
         
         # Detect bullet points
         elif line.startswith(('-', '*', '•')):
-            structured["bullet_points"].append(line[1:].strip())
-            if current_section:
-                current_section["content"].append(line)
+            bullet_points.append(line[1:].strip())
+            if section_lines is not None:
+                section_lines.append(line)
         
         # Detect numbered lists
-        elif re.match(r'^\d+\.', line):
-            structured["numbered_lists"].append(line)
-            if current_section:
-                current_section["content"].append(line)
+        elif _is_numbered(line):
+            numbered_lists.append(line)
+            if section_lines is not None:
+                section_lines.append(line)
         
         # Detect quotes
-        elif line.startswith('>'):
-            structured["quotes"].append(line[1:].strip())
+        elif line[0] == '>':
+            quotes.append(line[1:].strip())
         
         # Detect code blocks
-        elif line.startswith('```') or line.startswith('    '):
-            structured["code_blocks"].append(line)
+        elif line.startswith(('```', '    ')):
+            code_blocks.append(line)
         
-        else:
-            if current_section:
-                current_section["content"].append(line)
-    
-    # Add last section
-    if current_section:
-        structured["sections"].append(current_section)
+        elif section_lines is not None:
+            section_lines.append(line)
     
-    # Extract links
-    links = re.findall(r'https?://[^\s]+', content)
-    structured["links"] = links
+    return {
+        "sections": sections,
+        "bullet_points": bullet_points,
+        "numbered_lists": numbered_lists,
+        "quotes": quotes,
+        "code_blocks": code_blocks,
+        # Extract links
+        "links": _URL_RE.findall(content)
+    }
+
+
+def _is_numbered(line: str) -> bool:
+    """
+    Check whether a non-empty line starts with digits and a period, like "12.".
+    """
+    # Most lines don't start with a digit, so bail out before splitting
+    if not line[0].isdecimal():
+        return False
     
-    return structured
+    number, dot, _ = line.partition('.')
+    return bool(dot) and number.isdecimal()
 
 
 def calculate_read_time(content: str, words_per_minute: int = 200) -> int:
@@ -245,21 +384,11 @@ def is_markdown_content(content: str) -> bool:
     """
     Detect if content is in Markdown format.
     """
-    markdown_indicators = [
-        r'^#+\s',  # Headers
-        r'^\*\s',  # Bullet points
-        r'^\d+\.\s',  # Numbered lists
-        r'`[^`]+`',  # Inline code
-        r'```',  # Code blocks
-        r'\[.*\]\(.*\)',  # Links
-        r'^\>',  # Quotes
-    ]
+    if any(marker in content for marker in _MARKDOWN_MARKERS):
+        return _MARKDOWN_RE.search(content) is not None
     
-    for pattern in markdown_indicators:
-        if re.search(pattern, content, re.MULTILINE):
-            return True
-    
-    return False
+    # Plain prose can still only be markdown through a numbered list
+    return _NUMBERED_LIST_RE.search(content) is not None
 
 
 def detect_language(content: str) -> str:
@@ -270,10 +399,9 @@ def detect_language(content: str) -> str:
     # like langdetect or TextBlob
     
     # Simple heuristic based on common words
-    english_words = ['the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'this', 'that']
     content_words = content.lower().split()
     
-    english_score = sum(1 for word in content_words if word in english_words)
+    english_score = sum(1 for word in content_words if word in _ENGLISH_WORDS)
     
     if len(content_words) > 0 and (english_score / len(content_words)) > 0.1:
         return "english"
@@ -285,21 +413,17 @@ def detect_tone(content: str) -> str:
     """
     Detect tone of the content.
     """
-    content_lower = content.lower()
-    
-    # Positive tone indicators
-    positive_words = ['great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'good', 'happy', 'excited']
-    positive_score = sum(1 for word in positive_words if word in content_lower)
-    
-    # Negative tone indicators
-    negative_words = ['bad', 'terrible', 'awful', 'horrible', 'sad', 'angry', 'frustrated', 'disappointed']
-    negative_score = sum(1 for word in negative_words if word in content_lower)
-    
-    # Urgent tone indicators
-    urgent_words = ['urgent', 'asap', 'immediately', 'emergency', 'critical', 'important']
-    urgent_score = sum(1 for word in urgent_words if word in content_lower)
+    return _tone_from_keywords(_find_note_keywords(content.lower()))
+
+
+def _tone_from_keywords(present: set) -> str:
+    """
+    Pick the tone from the note keywords found in the content.
+    """
+    positive_score = len(present & _POSITIVE_WORDS)
+    negative_score = len(present & _NEGATIVE_WORDS)
     
-    if urgent_score > 0:
+    if not present.isdisjoint(_URGENT_WORDS):
         return "urgent"
     elif positive_score > negative_score:
         return "positive"
@@ -313,14 +437,16 @@ def detect_urgency(content: str) -> str:
     """
     Detect urgency level of the content.
     """
-    content_lower = content.lower()
-    
-    high_urgency = ['urgent', 'asap', 'immediately', 'emergency', 'critical', 'deadline today']
-    medium_urgency = ['important', 'soon', 'deadline', 'priority', 'quick']
-    
-    if any(word in content_lower for word in high_urgency):
+    return _urgency_from_keywords(_find_note_keywords(content.lower()))
+
+
+def _urgency_from_keywords(present: set) -> str:
+    """
+    Pick the urgency level from the note keywords found in the content.
+    """
+    if not present.isdisjoint(_HIGH_URGENCY_WORDS):
         return "high"
-    elif any(word in content_lower for word in medium_urgency):
+    elif not present.isdisjoint(_MEDIUM_URGENCY_WORDS):
         return "medium"
     else:
         return "low"
@@ -351,10 +477,15 @@ def update_note(note_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
     # Apply updates
     updated_note = existing_note.copy()
     updated_note.update(updates)
-    updated_note["updated_at"] = int(time.time() * 1000)
-    
-    # Re-process if content changed
-    if "content" in updates:
+    updated_note["updated_at"] = time.time_ns() // 1_000_000
+    
+    # Re-process if content changed; passing the stored content back unchanged
+    # keeps the fields already derived from it
+    content_unchanged = (
+        updates.get("content") == existing_note.get("content")
+        and all(field in existing_note for field in ("tags", "metadata", "structured_content"))
+    )
+    if "content" in updates and not content_unchanged:
         updated_note["tags"] = auto_generate_tags(updates["content"])
         updated_note["metadata"] = extract_note_metadata(updates["content"])
         updated_note["structured_content"] = structure_content(updates["content"])
@@ -375,5 +506,5 @@ def get_note_by_id(note_id: str) -> Optional[Dict[str, Any]]:
         "note_id": note_id,
         "title": "Sample Note",
         "content": "Sample content",
-        "created_at": int(time.time() * 1000)
+        "created_at": time.time_ns() // 1_000_000
     }
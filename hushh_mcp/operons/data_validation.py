@@ -6,10 +6,49 @@ Open-source contribution to the Hushh MCP ecosystem.
 """
 
 import re
+import time
 import hashlib
 from typing import List, Dict, Any, Optional, Union
 from datetime import datetime, timedelta
 
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+# Dot-separated lowercase, e.g. "vault.read.email"
+_SCOPE_RE = re.compile(r'^[a-z]+(\.[a-z_]+)*$')
+# Standard MCP scopes, used when a caller doesn't supply its own list
+_DEFAULT_ALLOWED_SCOPES = frozenset([
+    "vault.read.email",
+    "vault.read.calendar",
+    "vault.write.email",
+    "vault.write.calendar",
+    "vault.delete.email",
+    "vault.delete.calendar",
+    "agent.process.email",
+    "agent.process.calendar",
+    "agent.categorize.content",
+    "custom.data.access",
+    "custom.data.export",
+    "custom.data.delete"
+])
+
+_AGENT_ID_RE = re.compile(r'^agent_[a-z0-9_]+$')
+_USER_ID_RE = re.compile(r'^user_[a-zA-Z0-9_]+$')
+_NUMERIC_ID_RE = re.compile(r'^[0-9]+$')
+_CATEGORY_NAME_RE = re.compile(r'^[a-z]{1,20}$')
+
+_HTML_TAG_RE = re.compile(r'<[^>]*>')
+# Deletion table for characters that could reopen markup or break out of quotes
+_DANGEROUS_CHARS_TABLE = str.maketrans('', '', '<>"\'')
+
+# Potential security issues in free-text fields: <script>, javascript:,
+# data:text/html, vbscript:, onload= and onerror=, fused into one scan. The
+# leading character class lets the engine skip ahead to candidate positions
+# instead of trying every alternative at every offset.
+_SUSPICIOUS_RE = re.compile(
+    r'[jvd<o](?:(?<=j)avascript:|(?<=v)bscript:|(?<=d)ata:text/html'
+    r'|(?<=<)script[^>]*>|(?<=o)n(?:load|error)\s*=)',
+    re.IGNORECASE
+)
+
 
 def validate_email_format(email: str) -> bool:
     """
@@ -30,8 +69,7 @@ def validate_email_format(email: str) -> bool:
     if not email or not isinstance(email, str):
         return False
     
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email.strip()))
+    return bool(_EMAIL_RE.match(email.strip()))
 
 
 def validate_consent_scope(scope: str, allowed_scopes: List[str] = None) -> bool:
@@ -54,27 +92,14 @@ def validate_consent_scope(scope: str, allowed_scopes: List[str] = None) -> bool
     if not scope or not isinstance(scope, str):
         return False
     
+    # Default scopes are all well formed, so membership alone decides
+    if allowed_scopes is None:
+        return scope in _DEFAULT_ALLOWED_SCOPES
+    
     # Check format: should be dot-separated lowercase
-    if not re.match(r'^[a-z]+(\.[a-z_]+)*$', scope):
+    if not _SCOPE_RE.match(scope):
         return False
     
-    # Default allowed scopes if none provided
-    if allowed_scopes is None:
-        allowed_scopes = [
-            "vault.read.email",
-            "vault.read.calendar", 
-            "vault.write.email",
-            "vault.write.calendar",
-            "vault.delete.email",
-            "vault.delete.calendar",
-            "agent.process.email",
-            "agent.process.calendar",
-            "agent.categorize.content",
-            "custom.data.access",
-            "custom.data.export",
-            "custom.data.delete"
-        ]
-    
     return scope in allowed_scopes
 
 
@@ -98,8 +123,7 @@ def validate_agent_id(agent_id: str) -> bool:
         return False
     
     # Should start with "agent_" and contain only lowercase letters, numbers, underscores
-    pattern = r'^agent_[a-z0-9_]+$'
-    return bool(re.match(pattern, agent_id))
+    return bool(_AGENT_ID_RE.match(agent_id))
 
 
 def validate_user_id(user_id: str) -> bool:
@@ -122,10 +146,7 @@ def validate_user_id(user_id: str) -> bool:
         return False
     
     # Accept either "user_" prefixed IDs or numeric IDs (like Google OAuth)
-    user_pattern = r'^user_[a-zA-Z0-9_]+$'
-    numeric_pattern = r'^[0-9]+$'
-    
-    return bool(re.match(user_pattern, user_id) or re.match(numeric_pattern, user_id))
+    return bool(_USER_ID_RE.match(user_id) or _NUMERIC_ID_RE.match(user_id))
 
 
 def validate_timestamp(timestamp: Union[str, int, float], max_age_days: int = 30) -> bool:
@@ -168,6 +189,18 @@ def validate_timestamp(timestamp: Union[str, int, float], max_age_days: int = 30
         return False
 
 
+def _validate_timestamp_ms(timestamp_ms: int, max_age_days: int = 30) -> bool:
+    """
+    Age check for epoch-millisecond integers without building datetimes.
+    
+    Mirrors validate_timestamp, where abs(age.days) <= max_age_days lets a
+    timestamp lie up to max_age_days + 1 days in the past but only
+    max_age_days days in the future, because timedelta days round down.
+    """
+    age_ms = time.time_ns() // 1_000_000 - timestamp_ms
+    return -max_age_days * 86_400_000 <= age_ms < (max_age_days + 1) * 86_400_000
+
+
 def sanitize_content_for_storage(content: str, max_length: int = 1000) -> str:
     """
     Sanitize content for secure storage in vault.
@@ -187,10 +220,11 @@ def sanitize_content_for_storage(content: str, max_length: int = 1000) -> str:
         return ""
     
     # Remove HTML/XML tags
-    content = re.sub(r'<[^>]*>', '', content)
+    if '<' in content:
+        content = _HTML_TAG_RE.sub('', content)
     
     # Remove potentially dangerous characters
-    content = re.sub(r'[<>"\']', '', content)
+    content = content.translate(_DANGEROUS_CHARS_TABLE)
     
     # Remove excessive whitespace
     content = ' '.join(content.split())
@@ -220,8 +254,11 @@ def hash_for_storage(data: str, salt: str = "") -> str:
     if not isinstance(data, str):
         data = str(data)
     
-    combined = data + salt
-    return hashlib.sha256(combined.encode('utf-8')).hexdigest()
+    # Feed data and salt separately instead of concatenating a copy of a large payload
+    digest = hashlib.sha256(data.encode('utf-8'))
+    if salt:
+        digest.update(salt.encode('utf-8'))
+    return digest.hexdigest()
 
 
 def validate_data_export_format(export_data: Dict[str, Any]) -> bool:
@@ -280,8 +317,7 @@ def validate_category_name(category: str) -> bool:
         return False
     
     # Should be lowercase, letters only, max 20 characters
-    pattern = r'^[a-z]{1,20}$'
-    return bool(re.match(pattern, category))
+    return bool(_CATEGORY_NAME_RE.match(category))
 
 
 def validate_confidence_score(score: Union[int, float]) -> bool:
@@ -342,50 +378,46 @@ def validate_data_integrity(data: Dict[str, Any]) -> Dict[str, Any]:
         issues.append("ID must be a string")
         score -= 0.2
     
-    # Check for content fields
+    # Check for content fields, validating content quality in the same pass
     content_fields = ["subject", "content", "title", "description", "body"]
-    has_content = any(data.get(field) for field in content_fields)
+    has_content = False
+    content_parts = []
     
+    for field in content_fields:
+        content = data.get(field, "")
+        text = str(content)
+        content_parts.append(text)
+        if content:
+            has_content = True
+            if len(text.strip()) < 3:
+                issues.append(f"{field} is too short")
+                score -= 0.1
+            elif len(text) > 10000:
+                issues.append(f"{field} is too long")
+                score -= 0.1
+    
+    # No field had content, so no quality issue was recorded ahead of this one
     if not has_content:
         issues.append("No content fields found")
         score -= 0.4
     
-    # Validate content quality
-    for field in content_fields:
-        if field in data:
-            content = data[field]
-            if content:
-                if len(str(content).strip()) < 3:
-                    issues.append(f"{field} is too short")
-                    score -= 0.1
-                elif len(str(content)) > 10000:
-                    issues.append(f"{field} is too long")
-                    score -= 0.1
-    
-    # Check for suspicious content patterns
-    all_content = " ".join(str(data.get(field, "")) for field in content_fields)
-    if all_content:
-        # Check for potential security issues
-        suspicious_patterns = [
-            r'<script[^>]*>',
-            r'javascript:',
-            r'data:text/html',
-            r'vbscript:',
-            r'onload\s*=',
-            r'onerror\s*='
-        ]
-        
-        for pattern in suspicious_patterns:
-            if re.search(pattern, all_content, re.IGNORECASE):
-                issues.append("Suspicious content pattern detected")
-                score -= 0.5
-                break
+    # Check for suspicious content patterns across every field, empty ones included
+    all_content = " ".join(content_parts)
+    if _SUSPICIOUS_RE.search(all_content):
+        issues.append("Suspicious content pattern detected")
+        score -= 0.5
     
     # Validate timestamp fields
     timestamp_fields = ["timestamp", "received_at", "created_at", "processed_at"]
     for field in timestamp_fields:
-        if field in data and data[field]:
-            if not validate_timestamp(data[field]):
+        value = data.get(field)
+        if value:
+            # Integer epoch milliseconds, as notes and processed items carry, skip datetime parsing
+            if type(value) is int and value > 1e12:
+                valid = _validate_timestamp_ms(value)
+            else:
+                valid = validate_timestamp(value)
+            if not valid:
                 issues.append(f"Invalid timestamp in {field}")
                 score -= 0.2
     
@@ -4,6 +4,47 @@ from typing import List, Dict, Any
 import re
 from datetime import datetime
 
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RE = re.compile(r'\b(?:\+?1[-.\s]?)?(?:\(?[0-9]{3}\)?[-.\s]?)?[0-9]{3}[-.\s]?[0-9]{4}\b')
+
+# Date extraction (various formats)
+_DATE_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',  # MM/DD/YYYY or MM-DD-YYYY
+    r'\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b',    # YYYY/MM/DD or YYYY-MM-DD
+    r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}\b',  # Month DD, YYYY
+    r'\b\d{1,2} (?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{4}\b'     # DD Month YYYY
+))
+
+_TIME_RE = re.compile(r'\b\d{1,2}:\d{2}(?::\d{2})?(?:\s?[AaPp][Mm])?\b')
+
+# Money extraction
+_MONEY_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'\$\d{1,3}(?:,\d{3})*(?:\.\d{2})?',  # $1,000.00
+    r'\b\d{1,3}(?:,\d{3})*(?:\.\d{2})?\s*(?:dollars?|USD|usd)\b',  # 1000 dollars
+    r'\b(?:USD|usd|\$)\s*\d{1,3}(?:,\d{3})*(?:\.\d{2})?\b'  # USD 1000
+))
+
+_URL_RE = re.compile(r'https?://(?:[-\w.])+(?:[:\d]+)?(?:/(?:[\w/_.])*(?:\?(?:[\w&=%.])*)?(?:#(?:[\w.])*)?)?')
+
+# Simple address extraction (US format)
+_ADDRESS_RE = re.compile(
+    r'\b\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl)\b',
+    re.IGNORECASE
+)
+
+# Capitalized word pairs that might be names; a simple heuristic with false positives
+_NAME_RE = re.compile(r'\b[A-Z][a-z]+ [A-Z][a-z]+\b')
+
+# Common company suffixes
+_COMPANY_RES = tuple(re.compile(pattern) for pattern in (
+    r'\b[A-Z][A-Za-z\s]+(?:Inc\.?|Corp\.?|LLC|Ltd\.?|Co\.?)\b',
+    r'\b[A-Z][A-Za-z\s]+(?:Corporation|Company|Incorporated|Limited)\b'
+))
+
+# Event times and dates within a sentence
+_EVENT_TIME_RE = re.compile(r'\b\d{1,2}:\d{2}(?:\s?[AaPp][Mm])?\b')
+_EVENT_DATE_RE = re.compile(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b')
+
 
 def extract_entities(content: str) -> Dict[str, List[str]]:
     """
@@ -32,45 +73,27 @@ def extract_entities(content: str) -> Dict[str, List[str]]:
         return entities
     
     # Email extraction
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    entities["emails"] = re.findall(email_pattern, content)
+    entities["emails"] = _EMAIL_RE.findall(content)
     
     # Phone number extraction
-    phone_pattern = r'\b(?:\+?1[-.\s]?)?(?:\(?[0-9]{3}\)?[-.\s]?)?[0-9]{3}[-.\s]?[0-9]{4}\b'
-    entities["phones"] = re.findall(phone_pattern, content)
+    entities["phones"] = _PHONE_RE.findall(content)
     
     # Date extraction (various formats)
-    date_patterns = [
-        r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',  # MM/DD/YYYY or MM-DD-YYYY
-        r'\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b',    # YYYY/MM/DD or YYYY-MM-DD
-        r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}\b',  # Month DD, YYYY
-        r'\b\d{1,2} (?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{4}\b'     # DD Month YYYY
-    ]
-    
-    for pattern in date_patterns:
-        entities["dates"].extend(re.findall(pattern, content, re.IGNORECASE))
+    for pattern in _DATE_RES:
+        entities["dates"].extend(pattern.findall(content))
     
     # Time extraction
-    time_pattern = r'\b\d{1,2}:\d{2}(?::\d{2})?(?:\s?[AaPp][Mm])?\b'
-    entities["times"] = re.findall(time_pattern, content)
+    entities["times"] = _TIME_RE.findall(content)
     
     # Money extraction
-    money_patterns = [
-        r'\$\d{1,3}(?:,\d{3})*(?:\.\d{2})?',  # $1,000.00
-        r'\b\d{1,3}(?:,\d{3})*(?:\.\d{2})?\s*(?:dollars?|USD|usd)\b',  # 1000 dollars
-        r'\b(?:USD|usd|\$)\s*\d{1,3}(?:,\d{3})*(?:\.\d{2})?\b'  # USD 1000
-    ]
-    
-    for pattern in money_patterns:
-        entities["money"].extend(re.findall(pattern, content, re.IGNORECASE))
+    for pattern in _MONEY_RES:
+        entities["money"].extend(pattern.findall(content))
     
     # URL extraction
-    url_pattern = r'https?://(?:[-\w.])+(?:[:\d]+)?(?:/(?:[\w/_.])*(?:\?(?:[\w&=%.])*)?(?:#(?:[\w.])*)?)?'
-    entities["urls"] = re.findall(url_pattern, content)
+    entities["urls"] = _URL_RE.findall(content)
     
     # Simple address extraction (US format)
-    address_pattern = r'\b\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl)\b'
-    entities["addresses"] = re.findall(address_pattern, content, re.IGNORECASE)
+    entities["addresses"] = _ADDRESS_RE.findall(content)
     
     # Name extraction (simple heuristic)
     entities["names"] = extract_person_names(content)
@@ -91,10 +114,7 @@ def extract_person_names(content: str) -> List[str]:
     """
     names = []
     
-    # Pattern for capitalized words that might be names
-    # This is a simple heuristic and may have false positives
-    name_pattern = r'\b[A-Z][a-z]+ [A-Z][a-z]+\b'
-    potential_names = re.findall(name_pattern, content)
+    potential_names = _NAME_RE.findall(content)
     
     # Filter out common false positives
     common_false_positives = {
@@ -117,13 +137,8 @@ def extract_company_names(content: str) -> List[str]:
     companies = []
     
     # Common company suffixes
-    company_patterns = [
-        r'\b[A-Z][A-Za-z\s]+(?:Inc\.?|Corp\.?|LLC|Ltd\.?|Co\.?)\b',
-        r'\b[A-Z][A-Za-z\s]+(?:Corporation|Company|Incorporated|Limited)\b'
-    ]
-    
-    for pattern in company_patterns:
-        companies.extend(re.findall(pattern, content))
+    for pattern in _COMPANY_RES:
+        companies.extend(pattern.findall(content))
     
     # Well-known company names (could be expanded)
     known_companies = [
@@ -153,8 +168,8 @@ def extract_calendar_events(content: str) -> List[Dict[str, Any]]:
         sentence = sentence.strip()
         if any(keyword in sentence.lower() for keyword in event_keywords):
             # Extract time and date from the sentence
-            times = re.findall(r'\b\d{1,2}:\d{2}(?:\s?[AaPp][Mm])?\b', sentence)
-            dates = re.findall(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b', sentence)
+            times = _EVENT_TIME_RE.findall(sentence)
+            dates = _EVENT_DATE_RE.findall(sentence)
             
             if times or dates:
                 events.append({
@@ -49,7 +49,7 @@ from hushh_mcp.vault.storage import VaultStorage
 from hushh_mcp.vault.persistent_storage import persistent_storage
 
 # Enhanced operons with LLM integration
-from hushh_mcp.operons.categorize_content import categorize_with_free_llm
+from hushh_mcp.operons.categorize_content import categorize_with_free_llm, close_http_session, get_cache_stats, start_tokenizer_load
 from hushh_mcp.operons.content_classification import classify_content_category, determine_priority
 from hushh_mcp.operons.privacy_audit import assess_data_sensitivity, DataType
 from hushh_mcp.operons.data_validation import validate_data_integrity
@@ -58,7 +58,8 @@ from hushh_mcp.operons.scheduling_intelligence import analyze_scheduling_pattern
 # Real Google integrations
 from hushh_mcp.integrations.gmail_client import (
     create_gmail_client_from_token,
-    create_calendar_client_from_token
+    create_calendar_client_from_token,
+    shutdown_process_pool
 )
 
 # Setup logging
@@ -119,6 +120,24 @@ audit_agent = AuditLoggerAgent()
 # Global state for real-time progress tracking
 processing_status = {}
 
+
+@app.on_event("startup")
+async def warm_categorization_tokenizer():
+    """Start loading the LLM input tokenizer in the background; startup never waits on the download"""
+    start_tokenizer_load()
+
+
+@app.on_event("shutdown")
+async def close_categorization_session():
+    """Release the pooled LLM provider connections and email workers, and report cache effectiveness on shutdown"""
+    stats = get_cache_stats()
+    provider_calls = stats["provider_hits"] + stats["provider_misses"]
+    if provider_calls:
+        logger.info(f"📊 LLM provider cache: {stats['provider_hits']}/{provider_calls} hits ({stats['provider_hits'] / provider_calls:.0%})")
+    await close_http_session()
+    # Off the event loop: joining the email decoding workers blocks
+    await asyncio.get_running_loop().run_in_executor(None, shutdown_process_pool)
+
 # ==================== Core Processing Functions ====================
 
 # Google OAuth configuration with proper scopes for Gmail and Calendar
@@ -440,12 +459,16 @@ async def process_emails_with_enhanced_ai(user_id: str, days: int, task_id: str)
                     'message': 'All emails in date range already processed',
                     'processed_categories': list(set(existing_categories))
                 }
+                await gmail_client.close()
                 return
             
             logger.info(f"📅 Processing {len(new_dates_to_process)} new dates: {new_dates_to_process}")
             logger.info(f"📅 Fetching emails from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
             
-            emails = await gmail_client.fetch_emails(days_back=days)  # Fetch ALL emails without limit
+            try:
+                emails = await gmail_client.fetch_emails(days_back=days)  # Fetch ALL emails without limit
+            finally:
+                await gmail_client.close()
             
             # Filter emails by actual date range and skip already processed emails
             filtered_emails = []
@@ -922,11 +945,13 @@ async def process_calendar_with_enhanced_ai(user_id: str, days_back: int, days_f
             logger.info(f"📅 Fetching calendar events from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
             
             calendar_client = await create_calendar_client_from_token(user_session["access_token"])
-            events = await calendar_client.fetch_calendar_events(
-                days_back=days_back, 
-                days_forward=days_forward, 
-                max_results=min((days_back + days_forward) * 5, 250)
-            )
+            try:
+                events = await calendar_client.fetch_calendar_events(
+                    days_back=days_back, 
+                    days_forward=days_forward
+                )
+            finally:
+                await calendar_client.close()
             
             # Filter events by actual date range (additional safety)
             filtered_events = []
@@ -0,0 +1,364 @@
+# Test Suite for Categorize Content Operon
+# Tests rule-based categorization, caching and module hygiene
+
+import ast
+import asyncio
+import gc
+import inspect
+import json
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+import hushh_mcp.operons.categorize_content as categorize_content
+from hushh_mcp.operons.categorize_content import (
+    _analyze_content_themes,
+    _cached_provider_call,
+    _hf_zero_shot,
+    _race_providers,
+    batch_enhance_categories,
+    categorize_batch,
+    _cache_result,
+    _categorize_with_enhanced_rules,
+    _get_cached_result,
+    categorize_with_free_llm,
+    clear_categorization_cache,
+    get_cache_stats,
+    get_category_confidence,
+    enhance_categories_with_context
+)
+
+
+class TestCategorizeContentOperon:
+    """Test suite for the categorize content operon"""
+
+    def setup_method(self):
+        """Start every test with an empty result cache"""
+        clear_categorization_cache()
+
+    def test_functions_defined_once(self):
+        """Every function is defined once so no copy silently shadows another"""
+        tree = ast.parse(inspect.getsource(categorize_content))
+        names = Counter(
+            node.name for node in tree.body
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        )
+
+        assert [name for name, count in names.items() if count > 1] == []
+
+    def test_category_confidence_uses_weighted_indicators(self):
+        """Test strong indicators outweigh unknown categories"""
+        scores = get_category_confidence("Project meeting with the client about the deadline", ["work", "travel"])
+
+        assert 0.45 < scores["work"] <= 0.80
+        assert scores["travel"] == 0.5
+
+    def test_rules_categorize_finance(self):
+        """Test keyword and pattern matching picks the finance category"""
+        result = _categorize_with_enhanced_rules("Payment of $45.99 is due on Friday. Invoice attached for billing.")
+
+        assert result["category"] == "finance"
+        assert result["processing_method"] == "enhanced_rules"
+        assert 0 < result["confidence"] <= 0.85
+        assert len(result["categories"]) <= 3
+
+    def test_rules_structure_fallback(self):
+        """Test content without keywords falls back to structure analysis"""
+        result = _categorize_with_enhanced_rules("hello there", "calendar")
+
+        assert result["processing_method"] == "structure_analysis"
+        assert result["category"] == "communication"
+
+    def test_theme_analysis(self):
+        """Test theme and entity detection"""
+        analysis = _analyze_content_themes("Jane Roe from Google sent the invoice on Monday")
+
+        assert "time_sensitive" in analysis["themes"]
+        assert "financial" in analysis["themes"]
+        assert "Google" in analysis["entities"]
+
+    def test_cache_evicts_least_recently_used(self, monkeypatch):
+        """Test the cache evicts the oldest entry instead of clearing everything"""
+        monkeypatch.setattr(categorize_content, "_cache_max_size", 2)
+
+        _cache_result("first content", "email", {"category": "a"})
+        _cache_result("second content", "email", {"category": "b"})
+        assert _get_cached_result("first content", "email") == {"category": "a"}
+
+        _cache_result("third content", "email", {"category": "c"})
+
+        assert _get_cached_result("first content", "email") == {"category": "a"}
+        assert _get_cached_result("second content", "email") is None
+        assert _get_cached_result("third content", "email") == {"category": "c"}
+
+    def test_cache_stats_track_hits_misses_and_evictions(self, monkeypatch):
+        """Test cache counters reflect lookups and evictions"""
+        monkeypatch.setattr(categorize_content, "_cache_max_size", 1)
+
+        assert _get_cached_result("first content", "email") is None
+        _cache_result("first content", "email", {"category": "a"})
+        _get_cached_result("first content", "email")
+        _cache_result("second content", "email", {"category": "b"})
+
+        stats = get_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["evictions"] == 1
+        assert stats["size"] == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_ollama_falls_back_to_rules(self, monkeypatch):
+        """Test a slow Ollama call is abandoned in favour of the rule-based result"""
+        async def ollama_available():
+            return True
+
+        async def slow_ollama(*args, **kwargs):
+            await asyncio.sleep(5)
+
+        monkeypatch.setattr(categorize_content, "_check_ollama_available", ollama_available)
+        monkeypatch.setattr(categorize_content, "categorize_with_ollama", slow_ollama)
+        monkeypatch.setattr(categorize_content, "OLLAMA_TIMEOUT_SECONDS", 0.05)
+
+        result = await categorize_with_free_llm("Invoice attached for billing.")
+
+        assert result["category"] == "finance"
+        assert result["processing_method"] == "enhanced_rules"
+
+    @pytest.mark.asyncio
+    async def test_strong_indicators_skip_llm_providers(self, monkeypatch):
+        """Test content with several strong indicators is answered without any provider call"""
+        async def unexpected_probe():
+            raise AssertionError("providers should not be consulted")
+
+        monkeypatch.setattr(categorize_content, "_check_ollama_available", unexpected_probe)
+
+        result = await categorize_with_free_llm("Payment of $45.99 is due. Invoice attached for billing.")
+
+        assert result["category"] == "finance"
+        assert result["processing_method"] == "rules_fastpath"
+        assert result["confidence"] >= categorize_content.RULE_FASTPATH_CONFIDENCE
+
+    @pytest.mark.asyncio
+    async def test_existing_categories_bypass_rule_fastpath(self, monkeypatch):
+        """Test existing categories bypass the rule fastpath and its cached answer for the same content"""
+        prompted = []
+
+        async def ollama_available():
+            return True
+
+        async def fake_ollama(content, content_type, model, existing_categories):
+            prompted.append(existing_categories)
+            return {"category": "billing", "confidence": 0.9, "processing_method": "ollama_llama3.2"}
+
+        monkeypatch.setattr(categorize_content, "_check_ollama_available", ollama_available)
+        monkeypatch.setattr(categorize_content, "categorize_with_ollama", fake_ollama)
+
+        content = "Payment of $45.99 is due. Invoice attached for billing."
+        fastpath = await categorize_with_free_llm(content)
+        result = await categorize_with_free_llm(content, existing_categories=["billing"])
+        cached = await categorize_with_free_llm(content, existing_categories=["billing"])
+
+        assert fastpath["processing_method"] == "rules_fastpath"
+        assert result["category"] == "billing"
+        assert cached["processing_method"] == "ollama_llama3.2_cached"
+        assert prompted == [["billing"]]
+
+    @pytest.mark.asyncio
+    async def test_provider_cache_collapses_duplicate_calls(self):
+        """Test identical provider calls share one request and later calls hit the cache"""
+        calls = []
+
+        @_cached_provider_call("fake")
+        async def fake_provider(content, api_key, content_type="email"):
+            calls.append(content)
+            await asyncio.sleep(0.01)
+            return {"category": "work", "processing_method": "fake_llm"}
+
+        results = await asyncio.gather(
+            fake_provider("same text", "key-1"),
+            fake_provider("same text", "key-2")
+        )
+        cached = await fake_provider("same text", "key-1")
+        await fake_provider("other text", "key-1")
+
+        assert calls == ["same text", "other text"]
+        assert results[0] == results[1] == cached == {"category": "work", "processing_method": "fake_llm"}
+
+    @pytest.mark.asyncio
+    async def test_provider_cache_hits_do_not_share_nested_lists(self):
+        """Test mutating the categories of a returned result leaves the cached entry intact"""
+        @_cached_provider_call("fake")
+        async def fake_provider(content, api_key, content_type="email"):
+            return {"category": "work", "categories": ["work"], "processing_method": "fake_llm"}
+
+        first = await fake_provider("same text", "key")
+        first["categories"].append("personal")
+        second = await fake_provider("same text", "key")
+        second["categories"].append("finance")
+        third = await fake_provider("same text", "key")
+
+        assert third["categories"] == ["work"]
+
+    @pytest.mark.asyncio
+    async def test_hf_batch_task_is_held_until_done(self, monkeypatch):
+        """Test concurrent zero-shot inputs share one POST whose task stays referenced while in flight"""
+        posted = []
+
+        async def fake_post(url, headers, body, timeout):
+            posted.append(json.loads(body)["inputs"])
+            await asyncio.sleep(0.01)
+            gc.collect()
+            return 200, json.dumps([{"labels": [text], "scores": [1.0]} for text in posted[-1]]).encode()
+
+        monkeypatch.setattr(categorize_content, "_post_cloud_json", fake_post)
+
+        results = asyncio.gather(_hf_zero_shot("first", "key"), _hf_zero_shot("second", "key"))
+        await asyncio.sleep(categorize_content._HF_BATCH_WINDOW * 2)
+        assert len(categorize_content._hf_batch_tasks) == 1
+
+        assert [result["labels"] for result in await results] == [["first"], ["second"]]
+        assert posted == [["first", "second"]]
+        assert not categorize_content._hf_batch_tasks
+
+    @pytest.mark.asyncio
+    async def test_failed_local_model_falls_back_to_api_once(self, monkeypatch):
+        """Test a local model that fails to load is tried once and the API answers instead"""
+        loads = []
+        api_calls = []
+
+        def broken_model(name):
+            loads.append(name)
+            raise OSError("model download failed")
+
+        async def fake_api(text, api_key):
+            api_calls.append(text)
+            return {"labels": ["travel and vacation"], "scores": [0.9]}
+
+        monkeypatch.setattr(categorize_content, "SentenceTransformer", broken_model)
+        monkeypatch.setattr(categorize_content, "_local_zero_shot", None)
+        monkeypatch.setattr(categorize_content, "_hf_zero_shot", fake_api)
+        monkeypatch.setattr(categorize_content, "_USE_HTTP2", True)
+
+        first = await categorize_content.categorize_with_huggingface("Flight to Rome", "key")
+        second = await categorize_content.categorize_with_huggingface("Hotel in Paris", "key")
+
+        assert first["category"] == second["category"] == "travel"
+        assert first["processing_method"] == "huggingface_zero_shot"
+        assert api_calls == ["Flight to Rome", "Hotel in Paris"]
+        assert len(loads) == 1
+
+    @pytest.mark.asyncio
+    async def test_tokenizer_loads_once_off_the_event_loop(self, monkeypatch):
+        """Test truncation never loads the tokenizer and a configured one loads once in a worker thread"""
+        loads = []
+        release = threading.Event()
+
+        class FakeTokenizer:
+            @staticmethod
+            def from_pretrained(name):
+                loads.append(threading.current_thread() is threading.main_thread())
+                release.wait(5)
+                raise OSError("download failed")
+
+        monkeypatch.setattr(categorize_content, "Tokenizer", FakeTokenizer)
+        monkeypatch.setattr(categorize_content, "_tokenizer", None)
+        monkeypatch.setattr(categorize_content, "_tokenizer_load", None)
+        monkeypatch.setattr(categorize_content, "_TOKENIZER_NAME", None)
+
+        assert categorize_content._truncate_to_tokens("some text", 1) == "some text"
+        assert categorize_content.start_tokenizer_load() is None
+
+        monkeypatch.setattr(categorize_content, "_TOKENIZER_NAME", "example/tokenizer")
+        pending = categorize_content.start_tokenizer_load()
+        assert categorize_content.start_tokenizer_load() is pending
+        release.set()
+        await pending
+
+        assert categorize_content.start_tokenizer_load() is None
+        assert loads == [False]
+        assert categorize_content._tokenizer is False
+
+    @pytest.mark.asyncio
+    async def test_race_returns_first_llm_answer(self):
+        """Test the hedged race skips rule fallbacks and does not wait for slower providers"""
+        async def rules_fallback():
+            return {"category": "general", "processing_method": "enhanced_rules"}
+
+        async def fast_llm():
+            await asyncio.sleep(0.01)
+            return {"category": "work", "processing_method": "fast_llm"}
+
+        async def slow_llm():
+            await asyncio.sleep(5)
+            return {"category": "finance", "processing_method": "slow_llm"}
+
+        started = time.monotonic()
+        result = await _race_providers([rules_fallback(), fast_llm(), slow_llm()])
+
+        assert result["processing_method"] == "fast_llm"
+        assert time.monotonic() - started < 1
+
+    def test_context_enhancement_uses_supplied_time(self):
+        """Test work-hour and weekend rules follow the supplied current_time"""
+        weekday_noon = {"current_time": datetime(2024, 1, 10, 12), "work_hours": {"start": 9, "end": 17}}
+        saturday = {"current_time": datetime(2024, 1, 13, 12), "work_hours": {"start": 9, "end": 17}}
+
+        assert enhance_categories_with_context(["communication"], weekday_noon) == ["communication", "work"]
+        assert enhance_categories_with_context(["entertainment"], saturday) == ["personal", "entertainment"]
+        assert batch_enhance_categories([["scheduling"], ["finance"]], weekday_noon) == [["scheduling", "work"], ["finance"]]
+
+    @pytest.mark.asyncio
+    async def test_categorize_batch_bounds_concurrency(self, monkeypatch):
+        """Test batch fan-out keeps order, caps in-flight calls and reports failures per item"""
+        in_flight = []
+
+        async def fake_groq(content, api_key, content_type):
+            in_flight.append(content)
+            assert len(in_flight) <= 2
+            await asyncio.sleep(0.01)
+            in_flight.remove(content)
+            if content == "bad":
+                raise RuntimeError("provider down")
+            return {"category": content}
+
+        monkeypatch.setitem(categorize_content._BATCH_PROVIDERS, "groq", fake_groq)
+
+        results = await categorize_batch(["a", "bad", "c"], "key", concurrency=2)
+
+        assert results[0] == {"category": "a"}
+        assert isinstance(results[1], RuntimeError)
+        assert results[2] == {"category": "c"}
+
+    @pytest.mark.asyncio
+    async def test_provider_cache_ignores_boilerplate(self):
+        """Test near-duplicates differing only in footers and quoted replies share a cache entry"""
+        calls = []
+
+        @_cached_provider_call("fake")
+        async def fake_provider(content, api_key, content_type="email"):
+            calls.append(content)
+            return {"category": "work", "processing_method": "fake_llm"}
+
+        await fake_provider("Please review the report.\n\nSent from my iPhone", "key")
+        await fake_provider("Please   review the report.\nOn Mon, Jan 1, Bob wrote:\n> earlier thread", "key")
+
+        assert calls == ["Please review the report.\n\nSent from my iPhone"]
+        assert get_cache_stats()["provider_hits"] == 1
+
+    @pytest.mark.parametrize("content", [
+        "The refund was sent from my bank account on Friday, please confirm the invoice amount.",
+        "Hi team,\nOn Monday the client wrote: we need the proposal by Friday.\nPlease prepare slides and budget.",
+        "Meeting notes\n--\nitem one\nitem two"
+    ])
+    def test_canonical_content_keeps_prose_that_resembles_boilerplate(self, content):
+        """Test only whole boilerplate lines are stripped when building provider cache keys"""
+        assert categorize_content._canonicalize_content(content) == " ".join(content.split())
+
+    def test_canonical_content_strips_boilerplate_lines(self):
+        """Test signature blocks, quoted replies and footers drop out of the cache key"""
+        content = "Lunch at noon?\nSent from my iPhone\nOn Mon, Jan 1, Bob wrote:\n> sure\n> see you\n-- \nBob\nACME"
+
+        assert categorize_content._canonicalize_content(content) == "Lunch at noon?"
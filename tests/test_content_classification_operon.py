@@ -0,0 +1,129 @@
+# Test Suite for Content Classification Operon
+# Tests keyword-based category, priority and email type classification
+
+import hushh_mcp.operons.content_classification as content_classification
+from hushh_mcp.operons.content_classification import (
+    ContentCategory,
+    Priority,
+    analyze,
+    classify_batch,
+    classify_content_category,
+    classify_email_type,
+    clear_classification_cache,
+    determine_priority,
+    extract_entities,
+    extract_keywords
+)
+
+
+class TestContentClassificationOperon:
+    """Test suite for the content classification operon"""
+
+    def setup_method(self):
+        """Start every test with empty memoized results"""
+        clear_classification_cache()
+
+    def test_classify_financial_content(self):
+        """Test keyword and sender domain matches pick the financial category"""
+        result = classify_content_category("Your invoice and payment receipt", "Statement ready", "billing@bank.com")
+
+        assert result["category"] == ContentCategory.FINANCIAL
+        assert result["keywords"] == ["invoice", "payment", "bill", "bank", "statement", "receipt"]
+        assert result["confidence"] == 1.0
+
+    def test_classify_without_matches_defaults_to_personal(self):
+        """Test content without any pattern falls back to personal"""
+        result = classify_content_category("hello there", "hi")
+
+        assert result["category"] == ContentCategory.PERSONAL
+        assert result["confidence"] == 0.3
+
+    def test_classify_batch_keeps_order_and_shares_duplicates(self):
+        """Test batch results follow input order and duplicate items are classified once"""
+        contents = ["Flight and hotel booking", "Invoice for payment", "Flight and hotel booking"]
+
+        results = classify_batch(contents, senders=["", "billing@bank.com", ""])
+
+        assert [result["category"] for result in results] == [
+            ContentCategory.TRAVEL, ContentCategory.FINANCIAL, ContentCategory.TRAVEL
+        ]
+        assert results[0] == results[2] and results[0]["keywords"] is not results[2]["keywords"]
+        assert content_classification._classify_content_category_cached.cache_info().misses == 2
+
+    def test_priority_counts_custom_urgency_keywords(self):
+        """Test custom urgency keywords score alongside the built-in indicators"""
+        result = determine_priority("The server is on fire", "Alert", urgency_keywords=["fire"])
+
+        assert result["priority"] == Priority.URGENT
+        assert result["indicators"] == ["alert", "fire"]
+
+    def test_urgent_marker_overrides_other_priorities(self):
+        """Test an explicit urgent prefix wins even when high-priority indicators outnumber it"""
+        result = determine_priority("Important: priority deadline tomorrow, reply soon", "Urgent: budget")
+
+        assert result["priority"] == Priority.URGENT
+        assert result["indicators"] == ["urgent", "punctuation_emphasis"]
+        assert result["confidence"] == 1.0
+
+    def test_email_type_detection(self):
+        """Test reply markers and no-reply senders drive the email type"""
+        reply = classify_email_type("Re: Project meeting", "boss@company.com", "Sounds good")
+        automated = classify_email_type("Your order", "noreply@shop.com", "Thanks for your purchase")
+
+        assert reply["type"] == "reply"
+        assert reply["is_automated"] is False
+        assert automated["type"] == "automated"
+        assert automated["is_automated"] is True
+        assert "receipt" in automated["detected_types"]
+
+    def test_analyze_matches_individual_functions(self):
+        """Test the fused analysis agrees with each classification function"""
+        subject = "Urgent: Fwd: Project deadline today"
+        sender = "Manager <noreply@company.com>"
+        content = "Please review the budget report. Call 555-123-4567 or see https://example.com by Friday"
+
+        result = analyze(content, subject, sender, urgency_keywords=["budget"])
+
+        assert result["category"] == classify_content_category(content, subject, sender)
+        assert result["priority"] == determine_priority(content, subject, ["budget"])
+        assert result["email_type"] == classify_email_type(subject, sender, content)
+        assert result["entities"] == extract_entities(content)
+        assert result["keywords"] == extract_keywords(f"{subject} {content} {sender}")
+
+    def test_memoized_results_are_copies(self):
+        """Test callers mutating a result don't corrupt the memoized entry"""
+        first = classify_content_category("Project meeting with the client", "Status")
+        first["keywords"].append("tampered")
+        first["category"] = ContentCategory.SPAM
+        extract_keywords("quarterly sales review").append("tampered")
+
+        second = classify_content_category("Project meeting with the client", "Status")
+
+        assert second["category"] == ContentCategory.WORK
+        assert "tampered" not in second["keywords"]
+        assert extract_keywords("quarterly sales review") == ["quarterly", "sales", "review"]
+        assert content_classification._classify_content_category_cached.cache_info().hits == 1
+
+    def test_email_type_reuses_supplied_category(self, monkeypatch):
+        """Test a category result passed in is used instead of classifying again"""
+        category_result = classify_content_category("Flight and hotel booking", "Trip")
+
+        def unexpected_classification(*args):
+            raise AssertionError("category should not be recomputed")
+
+        monkeypatch.setattr(content_classification, "classify_content_category", unexpected_classification)
+
+        result = classify_email_type("Trip", "", "Flight and hotel booking", category_result=category_result)
+
+        assert result["category"] == ContentCategory.TRAVEL
+        assert result["confidence"] == category_result["confidence"]
+
+    def test_substring_scan_matches_automaton(self, monkeypatch):
+        """Test the fallback substring scan finds the same keywords as the automaton"""
+        text = "urgent: re: deadline today for the project meeting request, noreply update"
+        expected = content_classification._find_keywords(text)
+
+        monkeypatch.setattr(content_classification, "_KEYWORD_AUTOMATON", None)
+
+        assert content_classification._find_keywords(text) == expected
+        assert {"urgent", "deadline today", "deadline", "meeting request", "noreply", "re:"} <= expected
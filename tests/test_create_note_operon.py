@@ -0,0 +1,137 @@
+# Test Suite for Create Note Operon
+# Tests title, tag, metadata and structure generation for notes
+
+import pytest
+
+import hushh_mcp.operons.create_note as create_note
+from hushh_mcp.operons.create_note import (
+    auto_generate_tags,
+    auto_generate_title,
+    detect_tone,
+    detect_urgency,
+    extract_note_metadata,
+    generate_structured_note,
+    generate_structured_notes_batch,
+    is_markdown_content,
+    structure_content,
+    update_note
+)
+
+
+class TestCreateNoteOperon:
+    """Test suite for the create note operon"""
+
+    def test_metadata_detects_contact_details(self):
+        """Test links, emails, phone numbers, dates, times and amounts are flagged"""
+        metadata = extract_note_metadata(
+            "Call 555-123-4567 at 10:30 AM on 12/25/2024 about the $100 invoice, "
+            "mail bob@example.com or see https://example.com"
+        )
+
+        assert metadata["has_links"] is True
+        assert metadata["has_emails"] is True
+        assert metadata["has_phone_numbers"] is True
+        assert metadata["has_dates"] is True
+        assert metadata["has_times"] is True
+        assert metadata["has_money"] is True
+
+    def test_metadata_plain_prose(self):
+        """Test prose without contact details sets no detection flags"""
+        metadata = extract_note_metadata("This is a great idea for the project and the team")
+
+        assert not any(value for key, value in metadata.items() if key.startswith("has_"))
+        assert metadata["language"] == "english"
+        assert metadata["tone"] == "positive"
+        assert metadata["urgency"] == "low"
+
+    @pytest.mark.parametrize("content, expected", [
+        ("notes\n## Agenda", True),
+        ("* first item", True),
+        ("intro\n12. twelfth step", True),
+        ("run `make test` first", True),
+        ("see [docs](https://example.com)", True),
+        ("> quoted reply", True),
+        ("plain text with a # hash, 3.5 stars and a > sign", False),
+        ("*bold* but no space", False)
+    ])
+    def test_markdown_detection(self, content, expected):
+        """Test markdown indicators are recognized anywhere in the content"""
+        assert is_markdown_content(content) is expected
+
+    def test_structure_content_sorts_lines(self):
+        """Test headers, bullets, numbered steps and quotes land in their own buckets"""
+        structured = structure_content(
+            "Agenda:\n- budget review\n1. approve plan\n2024 was busy\n> keep it short\nsee https://example.com/a"
+        )
+
+        assert structured["bullet_points"] == ["budget review"]
+        assert structured["numbered_lists"] == ["1. approve plan"]
+        assert structured["quotes"] == ["keep it short"]
+        assert structured["links"] == ["https://example.com/a"]
+        assert structured["sections"] == [{
+            "header": "Agenda:",
+            "content": ["- budget review", "1. approve plan", "2024 was busy"]
+        }, {
+            "header": "see https://example.com/a",
+            "content": []
+        }]
+
+    def test_tags_match_keywords_inside_words(self, monkeypatch):
+        """Test tag keywords match as substrings, with or without the keyword automaton"""
+        content = "Meetings about homework with Alice and Bob. The Budget is tight, Alice agrees"
+        expected = ["meeting", "work", "finance", "meetings", "alice"]
+
+        assert auto_generate_tags(content) == expected
+
+        monkeypatch.setattr(create_note, "_NOTE_KEYWORD_AUTOMATON", None)
+
+        assert auto_generate_tags(content) == expected
+        assert auto_generate_tags(content, max_tags=2) == ["meeting", "work"]
+
+    def test_tone_and_urgency_share_keyword_scan(self):
+        """Test metadata tone and urgency agree with the standalone detectors"""
+        content = "Great news, but the deadline today is important"
+        metadata = extract_note_metadata(content)
+
+        assert metadata["tone"] == detect_tone(content) == "urgent"
+        assert metadata["urgency"] == detect_urgency(content) == "high"
+        assert detect_urgency("the deadline moved to next week") == "medium"
+
+    def test_batch_matches_single_note_generation(self):
+        """Test batch notes match one-at-a-time notes and repeats share no nested state"""
+        contents = ["Project sync\n- budget review", "Call Bob at 10:30", "Project sync\n- budget review"]
+
+        batch = generate_structured_notes_batch(contents, category="work")
+        single = [generate_structured_note(content, category="work") for content in contents]
+
+        volatile = ("note_id", "created_at", "updated_at")
+        assert [{k: v for k, v in note.items() if k not in volatile} for note in batch] == [
+            {k: v for k, v in note.items() if k not in volatile} for note in single
+        ]
+        assert len({note["note_id"] for note in batch}) == 3
+        assert batch[0]["structured_content"] is not batch[2]["structured_content"]
+
+    def test_update_with_unchanged_content_keeps_derived_fields(self, monkeypatch):
+        """Test resubmitting the stored content skips re-deriving tags, metadata and structure"""
+        note = generate_structured_note("Project sync\n- budget review", category="work")
+        monkeypatch.setattr(create_note, "get_note_by_id", lambda note_id: dict(note))
+
+        def unexpected_derivation(content):
+            raise AssertionError("content should not be re-processed")
+
+        monkeypatch.setattr(create_note, "extract_note_metadata", unexpected_derivation)
+
+        updated = update_note(note["note_id"], {"title": "Renamed", "content": note["content"]})
+
+        assert updated["title"] == "Renamed"
+        assert updated["tags"] == note["tags"]
+        assert updated["metadata"] == note["metadata"]
+
+    def test_title_from_first_line_or_sentence(self):
+        """Test titles come from a short first line, else the first sentence cut at a word boundary"""
+        assert auto_generate_title("Weekly sync\nDiscussed the roadmap.") == "Weekly sync"
+        assert auto_generate_title("Ship it! Then celebrate.") == "Ship it"
+        assert auto_generate_title(
+            "We reviewed every open ticket in the backlog together today. Next steps follow."
+        ) == "We reviewed every open ticket in the backlog..."
+        assert auto_generate_title("   ") == "Untitled Note"
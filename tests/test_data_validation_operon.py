@@ -0,0 +1,66 @@
+# Test Suite for Data Validation Operon
+# Tests format validators and data integrity scoring
+
+import time
+
+import pytest
+
+from hushh_mcp.operons.data_validation import (
+    sanitize_content_for_storage,
+    validate_consent_scope,
+    validate_data_integrity
+)
+
+
+class TestDataValidationOperon:
+    """Test suite for the data validation operon"""
+
+    @pytest.mark.parametrize("content", [
+        "<SCRIPT src='x.js'>",
+        "click JavaScript:alert(1)",
+        "data:text/html;base64,AAAA",
+        "VBScript:msgbox",
+        "<img onload = run()>",
+        "<img OnError=run()>"
+    ])
+    def test_suspicious_content_is_flagged(self, content):
+        """Test each suspicious pattern is caught regardless of case"""
+        result = validate_data_integrity({"id": "email_1", "content": content})
+
+        assert result["issues"] == ["Suspicious content pattern detected"]
+        assert result["score"] == 0.5
+
+    def test_clean_content_is_valid(self):
+        """Test ordinary content passes without issues"""
+        result = validate_data_integrity({"id": "email_1", "subject": "Script review", "content": "Load the data online"})
+
+        assert result["is_valid"] is True
+        assert result["issues"] == []
+        assert result["score"] == 1.0
+
+    def test_sanitize_strips_markup_quotes_and_whitespace(self):
+        """Test tags, stray markup characters and whitespace runs are removed before truncation"""
+        content = "<script>alert('xss')</script>Hello   \"World\"\n 1 < 2 > 0"
+
+        assert sanitize_content_for_storage(content) == "alert(xss)Hello World 1 0"
+        assert sanitize_content_for_storage(content, max_length=10) == "alert(xss)..."
+        assert sanitize_content_for_storage("plain  text") == "plain text"
+
+    def test_consent_scope_defaults_and_custom_lists(self):
+        """Test scopes are checked against the standard set or a caller's own list"""
+        assert validate_consent_scope("vault.read.email") is True
+        assert validate_consent_scope("vault.read.email\n") is False
+        assert validate_consent_scope("malicious.scope") is False
+        assert validate_consent_scope("custom.scope", ["custom.scope"]) is True
+        assert validate_consent_scope("Custom.Scope", ["Custom.Scope"]) is False
+
+    def test_millisecond_timestamps_follow_datetime_age_rules(self):
+        """Test integer millisecond timestamps get the same age window as parsed ones"""
+        day_ms = 86_400_000
+        now_ms = int(time.time() * 1000)
+
+        for offset in (0, -30 * day_ms - 5000, 30 * day_ms + 5000, -31 * day_ms - 5000, 10 ** 30):
+            data = {"id": "email_1", "content": "Hello world", "received_at": now_ms + offset}
+            expected_valid = offset in (0, -30 * day_ms - 5000)
+
+            assert validate_data_integrity(data)["is_valid"] is expected_valid